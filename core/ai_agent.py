@@ -1,36 +1,622 @@
+import contextlib
+import contextvars
 import json
-import ollama
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def ask_agent(model, prompt, options=None):
-    res = ollama.generate(model=model, prompt=prompt, options=options or {})
-    return res["response"].strip()
+from . import cancel, tracing
+from .backends import create_backend
+from .config import load_config
+from .json_stream import TopLevelObjectScanner
+from .llm_cache import ResponseCache, cache_key
+from .metrics import call_stats
 
-def ask_agent_json(model, prompt, retries=2):
-    for _ in range(retries + 1):
-        resp = ollama.generate(model=model, prompt=prompt)["response"].strip()
+_backend = None
+_executor = None
+_cache = None
+_lock = threading.Lock()
+# État de chargement des modèles côté Ollama : "cold" | "warming" | "ready" | "error"
+_model_status = {}
+_model_last_ok = {}
+# Appels LLM en cours, hors travail de fond facultatif (voir pending_calls())
+_pending = 0
+_idle = threading.Condition(_lock)
+_optional = contextvars.ContextVar("llm_optional", default=False)
+# Pas de nouveau warm-up si le modèle a répondu il y a moins de WARM_SKIP_S secondes
+WARM_SKIP_S = 60
+# Compteurs des appels JSON (voir json_stats())
+_json_counts = {"calls": 0, "attempts": 0, "parse_failures": 0, "schema_failures": 0, "failed_calls": 0}
+
+
+def get_backend():
+    """Backend LLM partagé (pool Ollama ou stub), décrit par la clé "backend" de data/config.json."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = create_backend(load_config())
+        return _backend
+
+
+def set_backend(backend):
+    """Remplace le backend (ex: StubBackend pour jouer ou mesurer hors ligne)."""
+    global _backend
+    with _lock:
+        _backend = backend
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, int(load_config()["llm_concurrency"])),
+                thread_name_prefix="llm",
+            )
+        return _executor
+
+
+def set_concurrency(max_workers):
+    """Change le nombre d'appels LLM simultanés (les appels en cours se terminent normalement)."""
+    global _executor
+    with _lock:
+        old, _executor = _executor, ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="llm"
+        )
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def get_cache():
+    """Cache des réponses (taille, fichier SQLite et seuil de température dans data/config.json)."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            cfg = load_config()
+            _cache = ResponseCache(
+                max_entries=cfg["llm_cache_size"],
+                path=cfg["llm_cache_path"] or None,
+                max_temperature=cfg["llm_cache_max_temperature"],
+            )
+        return _cache
+
+
+def set_cache(cache):
+    """Remplace le cache des réponses (ex: ResponseCache en mémoire seule pour une simulation)."""
+    global _cache
+    with _lock:
+        _cache = cache
+
+
+def cache_stats():
+    return get_cache().stats()
+
+
+def _track(delta):
+    global _pending
+    if _optional.get():
+        return
+    with _idle:
+        _pending += delta
+        if _pending == 0:
+            _idle.notify_all()
+
+
+def pending_calls():
+    """Nombre d'appels LLM en cours, sans compter le travail de fond facultatif."""
+    return _pending
+
+
+@contextlib.contextmanager
+def optional():
+    """
+    Appels de fond facultatifs (spéculation, pool d'affaires) : ils ne comptent pas
+    dans pending_calls(), sinon ils s'attendraient les uns les autres.
+    """
+    reset = _optional.set(True)
+    try:
+        yield
+    finally:
+        _optional.reset(reset)
+
+
+def _wake_idle():
+    with _idle:
+        _idle.notify_all()
+
+
+def wait_idle(token=None):
+    """
+    Attend qu'aucun appel LLM ne soit en cours (tour, analyse, résumé) avant un travail
+    facultatif. Lève Cancelled si `token` est annulé pendant l'attente.
+    """
+    detach = token.on_cancel(_wake_idle) if token is not None else (lambda: None)
+    try:
+        with _idle:
+            while _pending > 0 and not (token is not None and token.cancelled):
+                _idle.wait()
+    finally:
+        detach()
+    if token is not None:
+        token.check()
+
+
+def _cache_key_for(model, prompt, options, context, cache, fmt=None, **extra):
+    if not cache:
+        return None
+    c = get_cache()
+    if not c.cacheable(options):
+        c.skip()
+        return None
+    return cache_key(model, prompt, options, context=context, format=fmt, **extra)
+
+
+def _generate(model, prompt, options=None, context=None, cache=True, fmt=None, on_stats=None):
+    """
+    Point de passage unique des appels non streamés : {"response", "context"}.
+    on_stats(stats) reçoit les compteurs de l'appel (voir core/metrics.py).
+    """
+    t0 = time.perf_counter()
+    key = _cache_key_for(model, prompt, options, context, cache, fmt)
+    if key is not None:
+        hit = get_cache().get(key)
+        if hit is not None:
+            if on_stats is not None:
+                on_stats(call_stats({}, time.perf_counter() - t0, cached=True))
+            return hit
+    _track(1)
+    try:
+        with tracing.span("llm.generate", "llm", prompt_chars=len(prompt)) as sp:
+            res = get_backend().generate(
+                model=model,
+                prompt=prompt,
+                options=options or {},
+                context=context,
+                format=fmt,
+                keep_alive=load_config()["keep_alive"],
+                cancel=cancel.current(),
+            )
+            sp.set(eval_count=res.get("eval_count"), prompt_eval_count=res.get("prompt_eval_count"))
+    finally:
+        _track(-1)
+    _mark_ready(model)
+    if on_stats is not None:
+        on_stats(call_stats(res, time.perf_counter() - t0))
+    out = {"response": res["response"], "context": res.get("context")}
+    if key is not None:
+        get_cache().put(key, out)
+    return out
+
+
+def _generate_stream(model, prompt, options=None, context=None, cache=True, fmt=None, on_stats=None):
+    """
+    Version streamée de _generate : produit les morceaux bruts d'Ollama.
+    Sur un hit du cache, la réponse complète arrive en un seul morceau.
+    """
+    t0 = time.perf_counter()
+    # Générateur : pas de bloc with, la tranche est fermée à la fin du flux
+    started = tracing.clock()
+    key = _cache_key_for(model, prompt, options, context, cache, fmt)
+    if key is not None:
+        hit = get_cache().get(key)
+        if hit is not None:
+            tracing.complete("llm.generate_stream", "llm", started, prompt_chars=len(prompt), cached=True)
+            if on_stats is not None:
+                on_stats(call_stats({}, time.perf_counter() - t0, cached=True))
+            yield {"response": hit["response"], "done": True, "context": hit["context"]}
+            return
+    parts = []
+    _track(1)
+    try:
+        for part in get_backend().generate(
+            model=model,
+            prompt=prompt,
+            options=options or {},
+            context=context,
+            stream=True,
+            format=fmt,
+            keep_alive=load_config()["keep_alive"],
+            cancel=cancel.current(),
+        ):
+            _mark_ready(model)
+            parts.append(part.get("response", ""))
+            if part.get("done"):
+                tracing.complete(
+                    "llm.generate_stream", "llm", started,
+                    prompt_chars=len(prompt), eval_count=part.get("eval_count"),
+                )
+                if on_stats is not None:
+                    on_stats(call_stats(part, time.perf_counter() - t0))
+                if key is not None:
+                    get_cache().put(key, {"response": "".join(parts), "context": part.get("context")})
+            yield part
+    finally:
+        _track(-1)
+
+
+def _mark_ready(model):
+    _model_status[model] = "ready"
+    _model_last_ok[model] = time.monotonic()
+
+
+def model_status(model):
+    return _model_status.get(model, "cold")
+
+
+def warm_up(model):
+    """
+    Charge le modèle dans Ollama en arrière-plan (prompt vide, avec keep_alive) pour que
+    la première vraie question ne paie pas le chargement. Ne bloque jamais.
+    """
+    with _lock:
+        status = _model_status.get(model, "cold")
+        if status == "warming":
+            return
+        if status == "ready" and time.monotonic() - _model_last_ok.get(model, 0) < WARM_SKIP_S:
+            return  # vient de répondre : forcément encore chargé
+        if status != "ready":
+            _model_status[model] = "warming"
+
+    def run():
+        try:
+            get_backend().generate(
+                model=model, prompt="", keep_alive=load_config()["keep_alive"]
+            )
+            _mark_ready(model)
+        except Exception as e:
+            _model_status[model] = "error"
+            print("Erreur warm-up:", e)
+
+    threading.Thread(target=run, name="llm-warmup", daemon=True).start()
+
+
+def ask_agent(model, prompt, options=None, cache=True):
+    return _generate(model, prompt, options, cache=cache)["response"].strip()
+
+
+def ask_agent_stream(model, prompt, options=None, cache=True):
+    """Comme ask_agent, mais produit les morceaux de texte au fur et à mesure de la génération."""
+    started = False
+    for part in _generate_stream(model, prompt, options, cache=cache):
+        chunk = part.get("response", "")
+        if not started:
+            # même nettoyage que ask_agent pour le début de la réponse
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        if chunk:
+            yield chunk
+
+
+def _fan_out(calls):
+    """
+    Lance toutes les fonctions (sans argument) en même temps et renvoie leurs résultats
+    dans le même ordre. On attend toujours la fin de tous les appels ; si l'un d'eux
+    échoue, on relève l'erreur du premier appel en échec (ordre des appels, pas d'arrivée).
+    Chaque appel s'exécute dans une copie du contexte de l'appelant : il y retrouve
+    le jeton d'annulation du tour (core/cancel.py).
+    """
+    ex = _get_executor()
+    futures = [
+        ex.submit(contextvars.copy_context().run, tracing.propagate(call, "llm.call"))
+        for call in calls
+    ]
+    results, errors = [], []
+    for fut in futures:
         try:
-            return json.loads(resp)
-        except Exception:
-            start, end = resp.find("{"), resp.rfind("}")
-            if start != -1 and end != -1:
-                try:
-                    return json.loads(resp[start:end+1])
-                except Exception:
-                    pass
+            results.append(fut.result())
+        except Exception as e:
+            results.append(None)
+            errors.append(e)
+    if errors:
+        raise errors[0]
+    return results
+
+
+class ChatSession:
+    """
+    Conversation persistante avec le modèle (un suspect, le détective IA...).
+    On garde le tableau `context` renvoyé par Ollama : chaque tour n'envoie que le
+    nouveau message, les tours précédents ne sont pas ré-évalués.
+
+    Le contexte grandit à chaque tour : au-delà de max_context jetons, la session
+    repart de zéro avec reseed(message), un prompt complet construit sur un
+    historique de taille bornée (voir core/history.py).
+    """
+
+    def __init__(self, model, system_prompt, options=None, on_stats=None,
+                 max_context=None, reseed=None):
+        self.model = model
+        self.system_prompt = system_prompt
+        self.options = options or {}
+        self.on_stats = on_stats  # compteurs de chaque appel (core/metrics.py)
+        self.max_context = max_context
+        self.reseed = reseed
+        self.reseeds = 0
+        self.context = None
+        self.turns = 0
+
+    def reset(self, system_prompt=None):
+        if system_prompt is not None:
+            self.system_prompt = system_prompt
+        self.context = None
+        self.turns = 0
+
+    def snapshot(self):
+        return (self.context, self.turns)
+
+    def restore(self, snap):
+        self.context, self.turns = snap
+
+    def fork(self, on_stats=None):
+        """Copie indépendante au même point de la conversation (réponses spéculatives)."""
+        other = ChatSession(
+            self.model, self.system_prompt, self.options, on_stats=on_stats,
+            max_context=self.max_context, reseed=self.reseed,
+        )
+        other.context, other.turns = self.context, self.turns
+        return other
+
+    def _prompt(self, message):
+        if (
+            self.reseed is not None
+            and self.max_context
+            and self.context is not None
+            and len(self.context) > self.max_context
+        ):
+            # restore() remet l'ancien contexte si l'appel échoue
+            self.context = None
+            self.reseeds += 1
+            return self.reseed(message)
+        # Le premier tour porte les consignes, les suivants seulement le message
+        if self.context is None:
+            return f"{self.system_prompt}\n\n{message}"
+        return message
+
+    def ask(self, message):
+        res = _generate(
+            self.model, self._prompt(message), self.options, self.context, on_stats=self.on_stats
+        )
+        self.context = res.get("context")
+        self.turns += 1
+        return res["response"].strip()
+
+    def ask_stream(self, message):
+        """Comme ask(), morceau par morceau ; le contexte est mis à jour à la fin du flux."""
+        started = False
+        context = None
+        for part in _generate_stream(
+            self.model, self._prompt(message), self.options, self.context, on_stats=self.on_stats
+        ):
+            if part.get("done"):
+                context = part.get("context")
+            chunk = part.get("response", "")
+            if not started:
+                chunk = chunk.lstrip()
+                started = bool(chunk)
+            if chunk:
+                yield chunk
+        self.context = context
+        self.turns += 1
+
+    def ask_streamed(self, message, on_chunk):
+        parts = []
+        for chunk in self.ask_stream(message):
+            parts.append(chunk)
+            on_chunk(chunk)
+        return "".join(parts).strip()
+
+
+def ask_sessions_parallel(sessions, message, on_chunk=None, ready=None):
+    """
+    Envoie le même message à plusieurs sessions en même temps (réponses dans l'ordre des sessions).
+    Si un appel échoue, toutes les sessions reviennent à leur état d'avant le tour.
+    ready : une fonction (ou None) par session, qui renvoie une réponse déjà prête ou
+    None (voir core/speculation.py) ; la session n'est interrogée que sans réponse prête.
+    """
+    snaps = [s.snapshot() for s in sessions]
+    ready = ready or [None] * len(sessions)
+
+    def call(i, s):
+        answer = ready[i]() if ready[i] is not None else None
+        if answer is not None:
+            if on_chunk is not None:
+                on_chunk(i, answer)
+            return answer
+        if on_chunk is None:
+            return s.ask(message)
+        return s.ask_streamed(message, lambda c: on_chunk(i, c))
+
+    calls = [lambda i=i, s=s: call(i, s) for i, s in enumerate(sessions)]
+    try:
+        return _fan_out(calls)
+    except Exception:
+        for s, snap in zip(sessions, snaps):
+            s.restore(snap)
+        raise
+
+
+def _parse_json(resp):
+    try:
+        return json.loads(resp)
+    except Exception:
+        start, end = resp.find("{"), resp.rfind("}")
+        if start != -1 and end != -1:
+            try:
+                return json.loads(resp[start:end+1])
+            except Exception:
+                pass
+    return None
+
+
+def _count_json(**deltas):
+    with _lock:
+        for k, v in deltas.items():
+            _json_counts[k] += v
+
+
+def json_stats():
+    """Taux de nouvelles tentatives et d'échecs de parsing des appels JSON."""
+    with _lock:
+        c = dict(_json_counts)
+    c["retry_rate"] = (c["attempts"] - c["calls"]) / c["calls"] if c["calls"] else 0.0
+    failures = c["parse_failures"] + c["schema_failures"]
+    c["parse_failure_rate"] = failures / c["attempts"] if c["attempts"] else 0.0
+    return c
+
+
+def _json_attempt(model, prompt, schema, on_partial, on_stats=None, options=None):
+    """Une génération JSON ; streamée si on_partial est fourni. Renvoie le texte brut."""
+    with tracing.span("llm.json_attempt", "llm", streamed=on_partial is not None):
+        if on_partial is None:
+            return _generate(model, prompt, options, cache=False, fmt=schema, on_stats=on_stats)["response"].strip()
+        scanner = TopLevelObjectScanner(on_partial)
+        for part in _generate_stream(model, prompt, options, cache=False, fmt=schema, on_stats=on_stats):
+            scanner.feed(part.get("response", ""))
+        return scanner.text.strip()
+
+
+def _validated_partial(on_partial, schema):
+    """
+    on_partial qui ne transmet que les objets conformes à leur sous-schéma : la réponse
+    complète n'est validée qu'à la fin, un objet partiel mal formé irait sinon à l'écran.
+    """
+    import jsonschema
+
+    properties = schema.get("properties") or {}
+
+    def check(key, value):
+        sub = properties.get(key)
+        if sub is not None:
+            try:
+                jsonschema.validate(value, sub)
+            except jsonschema.ValidationError:
+                return
+        on_partial(key, value)
+
+    return check
+
+
+@tracing.traced("llm.ask_agent_json", "llm")
+def ask_agent_json(model, prompt, retries=2, cache=True, schema=None, on_partial=None, on_stats=None,
+                   options=None):
+    """
+    Génération JSON. Avec un schéma, Ollama contraint la sortie (paramètre `format`) et
+    la réponse est validée avec jsonschema ; les nouvelles tentatives ne servent plus
+    qu'en secours. on_partial(clé, objet) reçoit chaque objet de premier niveau dès
+    qu'il est complet (ex: les scores de "suspect1" avant la fin de la réponse), une
+    fois validé contre son sous-schéma.
+    """
+    # On ne met en cache que le JSON valide : les nouvelles tentatives doivent
+    # vraiment régénérer, pas relire une réponse illisible. Même politique que les
+    # appels texte (options, température) ; kind sépare les deux espaces de clés.
+    key = _cache_key_for(model, prompt, options, None, cache, fmt=schema, kind="json")
+    if key is not None:
+        hit = get_cache().get(key)
+        if hit is not None:
+            if on_stats is not None:
+                on_stats(call_stats({}, 0.0, cached=True))
+            if on_partial is not None:
+                for k, v in hit.items():
+                    if isinstance(v, dict):
+                        on_partial(k, v)
+            return hit
+    if schema is not None:
+        import jsonschema  # import lourd, fait au premier appel JSON et pas au démarrage
+        if on_partial is not None:
+            on_partial = _validated_partial(on_partial, schema)
+    _count_json(calls=1)
+    for _ in range(retries + 1):
+        _count_json(attempts=1)
+        resp = _json_attempt(model, prompt, schema, on_partial, on_stats, options)
+        if schema is None:
+            data = _parse_json(resp)
+        else:
+            try:
+                data = json.loads(resp)
+            except ValueError:
+                data = None
+        if data is None:
+            _count_json(parse_failures=1)
+            continue
+        if schema is not None:
+            try:
+                jsonschema.validate(data, schema)
+            except jsonschema.ValidationError:
+                _count_json(schema_failures=1)
+                continue
+        if key is not None:
+            get_cache().put(key, data)
+        return data
+    _count_json(failed_calls=1)
     return None
 
+
+ANALYSIS_SHAPE = {
+    "fr": '{"suspect1":{"score":int,"motifs":["..."]},"suspect2":{"score":int,"motifs":["..."]},"incoherences":["..."]}',
+    "en": '{"suspect1":{"score":int,"motives":["..."]},"suspect2":{"score":int,"motives":["..."]},"inconsistencies":["..."]}',
+}
+
+
+def analysis_schema(lang):
+    """Schéma JSON de la réponse d'analyse (mêmes clés que ANALYSIS_SHAPE)."""
+    reasons = "motifs" if lang == "fr" else "motives"
+    issues = "incoherences" if lang == "fr" else "inconsistencies"
+    suspect = {
+        "type": "object",
+        "properties": {
+            "score": {"type": "integer", "minimum": 0, "maximum": 100},
+            reasons: {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["score", reasons],
+    }
+    return {
+        "type": "object",
+        "properties": {
+            "suspect1": suspect,
+            "suspect2": suspect,
+            issues: {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["suspect1", "suspect2", issues],
+    }
+
+
 def detective_analysis_prompt(lang, history):
+    """history : texte du dialogue, ou History (core/history.py) pour un dialogue borné."""
+    history = history.for_prompt() if hasattr(history, "for_prompt") else history
     if lang == "fr":
         return (
             "Tu es un détective. Analyse le dialogue ci-dessous et renvoie un JSON compact :\n"
-            '{"suspect1":{"score":int,"motifs":["..."]},"suspect2":{"score":int,"motifs":["..."]},"incoherences":["..."]}\n'
+            f"{ANALYSIS_SHAPE['fr']}\n"
             "score: 0=innocent, 100=très suspect.\n"
             f"Dialogue:\n{history}\nRéponds UNIQUEMENT en JSON."
         )
     else:
         return (
             "You are a detective. Analyze dialogue below and return compact JSON:\n"
-            '{"suspect1":{"score":int,"motives":["..."]},"suspect2":{"score":int,"motives":["..."]},"inconsistencies":["..."]}\n'
+            f"{ANALYSIS_SHAPE['en']}\n"
             "score: 0=innocent, 100=highly suspicious.\n"
             f"Dialogue:\n{history}\nReply ONLY in JSON."
         )
+
+
+def detective_incremental_prompt(lang, previous, new_dialogue):
+    """Mise à jour d'une analyse : scores précédents + seulement la suite du dialogue."""
+    if not previous:
+        return detective_analysis_prompt(lang, new_dialogue)
+    prev = json.dumps(previous, ensure_ascii=False)
+    if lang == "fr":
+        return (
+            f"Tu es un détective. Ton analyse précédente :\n{prev}\n"
+            "Mets-la à jour avec la suite du dialogue ci-dessous et renvoie le JSON complet :\n"
+            f"{ANALYSIS_SHAPE['fr']}\n"
+            "score: 0=innocent, 100=très suspect.\n"
+            f"Suite du dialogue:\n{new_dialogue}\nRéponds UNIQUEMENT en JSON."
+        )
+    else:
+        return (
+            f"You are a detective. Your previous analysis:\n{prev}\n"
+            "Update it with the rest of the dialogue below and return the full JSON:\n"
+            f"{ANALYSIS_SHAPE['en']}\n"
+            "score: 0=innocent, 100=highly suspicious.\n"
+            f"Rest of the dialogue:\n{new_dialogue}\nReply ONLY in JSON."
+        )
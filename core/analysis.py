@@ -0,0 +1,173 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import cancel, tracing
+from .ai_agent import analysis_schema, ask_agent_json, detective_incremental_prompt
+from .config import load_config
+from .history import as_prompt_text, estimate_tokens
+
+# Pool séparé : les analyses ne prennent pas la place des réponses des suspects
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, int(load_config()["analysis_concurrency"])),
+                thread_name_prefix="analysis",
+            )
+        return _executor
+
+
+def set_analysis_concurrency(max_workers):
+    """Nombre d'analyses simultanées (1 suffit pour un joueur, plus pour server.py)."""
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="analysis"
+        )
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+class IncrementalAnalysis:
+    """
+    Analyse de suspicion tenue à jour en arrière-plan, hors du chemin critique du tour.
+
+    Chaque rafraîchissement n'envoie au modèle que les scores déjà acceptés et les
+    échanges Q/R pas encore pris en compte. Une analyse dépassée par un tour plus
+    récent est interrompue (ou son résultat jeté) : le nouveau calcul reprend ses échanges.
+    """
+
+    def __init__(self, model, lang="en", on_stats=None, history=None):
+        self.model = model
+        self.lang = lang
+        self.on_stats = on_stats  # compteurs de chaque appel (core/metrics.py)
+        # History de la partie (core/history.py) : remplace les échanges bruts quand il
+        # n'y a pas encore de scores ou qu'ils dépasseraient le budget du prompt
+        self.history = history
+        self.scores = None
+        self._pairs = []
+        self._folded = 0  # nombre d'échanges déjà intégrés dans self.scores
+        self._generation = 0
+        self._token = None  # annule l'analyse en cours quand elle est dépassée
+        self._lock = threading.Lock()
+
+    def reset(self, lang=None):
+        with self._lock:
+            if lang is not None:
+                self.lang = lang
+            self._generation += 1
+            self._supersede()
+            self.scores = None
+            self._pairs = []
+            self._folded = 0
+
+    def _supersede(self):
+        # Appelé sous self._lock : la génération en cours ne servira plus, on coupe le flux
+        if self._token is not None:
+            self._token.cancel()
+        self._token = cancel.CancelToken()
+
+    def cancel(self):
+        """Abandonne l'analyse en cours sans oublier les échanges (son résultat est jeté)."""
+        with self._lock:
+            self._generation += 1
+            self._supersede()
+
+    def add(self, exchange):
+        with self._lock:
+            self._pairs.append(exchange)
+
+    def discard(self, exchange):
+        """Retire le dernier échange (tour annulé, qui sera rejoué) ; l'analyse en cours est abandonnée."""
+        with self._lock:
+            self._generation += 1
+            self._supersede()
+            if self._pairs and self._pairs[-1] == exchange:
+                self._pairs.pop()
+                if self._folded > len(self._pairs):
+                    # déjà compté dans les scores : la prochaine analyse repart de l'historique
+                    self.scores = None
+                    self._folded = 0
+
+    def wait(self, future):
+        """
+        Résultat d'un refresh(), en attendant. Si le tour en cours (core/cancel.py) est
+        annulé pendant l'attente, l'analyse l'est aussi et Cancelled est levée.
+        """
+        turn = cancel.current()
+        if turn is None:
+            return future.result()
+        detach = turn.on_cancel(self.cancel)
+        try:
+            data = future.result()
+        finally:
+            detach()
+        turn.check()
+        return data
+
+    def refresh(self, on_result=None):
+        """
+        Lance la mise à jour en arrière-plan et renvoie un Future (résultat JSON, ou None
+        si l'analyse a échoué ou a été dépassée). on_result(data) n'est appelé que pour
+        un résultat encore à jour.
+        """
+        with self._lock:
+            self._generation += 1
+            self._supersede()
+            dialogue = "\n".join(self._pairs[self._folded:])
+            if self.history is not None and (
+                self.scores is None or estimate_tokens(dialogue) > self.history.budget
+            ):
+                dialogue = self.history  # rendu borné, dans le thread d'analyse
+            job = (self._generation, self._token, self.scores, dialogue, len(self._pairs))
+        return _get_executor().submit(
+            tracing.propagate(self._run, "analysis.refresh", "analysis"), job, on_result
+        )
+
+    def _run(self, job, on_result):
+        gen, token, previous, new_dialogue, upto = job
+        if gen != self._generation:
+            return None  # dépassé avant même de démarrer
+        prompt = detective_incremental_prompt(self.lang, previous, as_prompt_text(new_dialogue))
+        delivered = []
+        partial = {}
+
+        def on_partial(key, value):
+            # Les scores des deux suspects sont utilisables avant la fin de la réponse
+            partial[key] = value
+            if (
+                not delivered
+                and "suspect1" in partial
+                and "suspect2" in partial
+                and gen == self._generation
+            ):
+                delivered.append(True)
+                on_result(dict(partial))
+
+        try:
+            with cancel.scope(token):
+                data = ask_agent_json(
+                    self.model,
+                    prompt,
+                    schema=analysis_schema(self.lang),
+                    on_partial=on_partial if on_result is not None else None,
+                    on_stats=self.on_stats,
+                )
+        except cancel.Cancelled:
+            return None
+        with self._lock:
+            if gen != self._generation:
+                return None
+            if isinstance(data, dict) and "suspect1" in data:
+                self.scores = data
+                self._folded = upto
+            else:
+                data = None
+        if data is not None and on_result is not None and not delivered:
+            on_result(data)
+        return data
@@ -0,0 +1,250 @@
+import json
+import os
+import time
+
+from .log_store import get_store
+
+# Dimensions sur lesquelles on peut filtrer / regrouper les parties
+DIMENSIONS = ("mode", "difficulty", "lang", "context", "cards")
+_SEP = "\x1f"
+
+
+def game_facts(record):
+    """
+    Ramène une partie du journal à ses dimensions + résultat.
+    player_win : le joueur gagne (détective qui trouve, suspect qui trompe l'IA).
+    """
+    mode = record.get("mode", "?")
+    if mode == "detective":
+        win = bool(record.get("success"))
+        questions = record.get("questions")
+    else:
+        win = not record.get("ai_correct", True)
+        questions = record.get("suspect_questions")
+    cards = record.get("cards_used")
+    return {
+        "mode": mode,
+        "difficulty": record.get("difficulty", "?"),
+        "lang": record.get("lang", "?"),
+        "context": record.get("context", "?"),
+        "cards": ("+".join(sorted(cards)) or "none") if cards is not None else "n/a",
+        "player_win": win,
+        "questions": questions,
+    }
+
+
+class Analytics:
+    """
+    Statistiques sur le journal des parties (core/log_store.py).
+
+    Le journal n'est lu qu'une fois : chaque refresh() ne parcourt que les parties
+    ajoutées depuis le précédent. On maintient, dans logs/analytics_index.json :
+      - des agrégats par combinaison de dimensions (parties, victoires, questions),
+        qui répondent à n'importe quel filtre sans relire le journal ;
+      - des index secondaires dimension → valeur → positions des parties, pour
+        retrouver les parties elles-mêmes.
+    """
+
+    VERSION = 1
+
+    def __init__(self, folder="logs", index_path=None):
+        self.store = get_store(folder)
+        self.index_path = index_path or os.path.join(folder, "analytics_index.json")
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.position = None  # (segment, offset) du dernier octet indexé
+        self.cells = {}
+        self.postings = {d: {} for d in DIMENSIONS}
+        self.total = 0
+
+    def _load(self):
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.VERSION:
+            return
+        pos = data.get("position")
+        # Index périmé si le segment a disparu ou rétréci : on repart de zéro
+        if pos and (not os.path.isfile(pos[0]) or os.path.getsize(pos[0]) < pos[1]):
+            return
+        self.position = tuple(pos) if pos else None
+        self.cells = data["cells"]
+        self.postings = data["postings"]
+        self.total = data["total"]
+
+    def save(self):
+        tmp = self.index_path + ".tmp"
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.VERSION,
+                "position": self.position,
+                "cells": self.cells,
+                "postings": self.postings,
+                "total": self.total,
+            }, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    # -----------------------
+    # Indexation
+    # -----------------------
+
+    def refresh(self):
+        """
+        Indexe les parties ajoutées depuis la dernière fois ; renvoie leur nombre.
+        Lecture seule : les anciens logs/game_*.json n'entrent dans le journal que
+        par la commande import-legacy.
+        """
+        self.store.flush()
+        added = 0
+        for segment, begin, end, record in self.store.iter_records(self.position):
+            self._index(segment, begin, record)
+            self.position = (segment, end)
+            added += 1
+        if added:
+            self.save()
+        return added
+
+    def rebuild(self):
+        self._reset()
+        return self.refresh()
+
+    def _index(self, segment, offset, record):
+        facts = game_facts(record)
+        key = _SEP.join(str(facts[d]) for d in DIMENSIONS)
+        cell = self.cells.setdefault(key, {"games": 0, "wins": 0, "questions": {}})
+        cell["games"] += 1
+        cell["wins"] += int(facts["player_win"])
+        if facts["questions"] is not None:
+            q = str(facts["questions"])
+            cell["questions"][q] = cell["questions"].get(q, 0) + 1
+        loc = [os.path.basename(segment), offset]
+        for d in DIMENSIONS:
+            self.postings[d].setdefault(str(facts[d]), []).append(loc)
+        self.total += 1
+
+    # -----------------------
+    # Requêtes
+    # -----------------------
+
+    def _matching_cells(self, filters):
+        wanted = [(i, str(filters[d])) for i, d in enumerate(DIMENSIONS) if filters.get(d) is not None]
+        for key, cell in self.cells.items():
+            values = key.split(_SEP)
+            if all(values[i] == v for i, v in wanted):
+                yield values, cell
+
+    def rate(self, **filters):
+        games = wins = 0
+        for _, cell in self._matching_cells(filters):
+            games += cell["games"]
+            wins += cell["wins"]
+        return {"games": games, "wins": wins, "rate": wins / games if games else None}
+
+    def breakdown(self, dimension, **filters):
+        """Taux de victoire du joueur pour chaque valeur d'une dimension."""
+        i = DIMENSIONS.index(dimension)
+        out = {}
+        for values, cell in self._matching_cells(filters):
+            agg = out.setdefault(values[i], {"games": 0, "wins": 0})
+            agg["games"] += cell["games"]
+            agg["wins"] += cell["wins"]
+        for agg in out.values():
+            agg["rate"] = agg["wins"] / agg["games"]
+        return out
+
+    def questions(self, **filters):
+        """Distribution du nombre de questions avant l'accusation / le verdict."""
+        dist = {}
+        for _, cell in self._matching_cells(filters):
+            for q, n in cell["questions"].items():
+                dist[int(q)] = dist.get(int(q), 0) + n
+        return dict(sorted(dist.items()))
+
+    def games(self, limit=20, **filters):
+        """Parties correspondant aux filtres, relues directement grâce aux index."""
+        sets = [
+            {tuple(loc) for loc in self.postings[d].get(str(v), [])}
+            for d, v in filters.items() if v is not None
+        ]
+        if sets:
+            locs = sorted(set.intersection(*sets))
+        else:
+            locs = sorted({tuple(loc) for posting in self.postings["mode"].values() for loc in posting})
+        return [self.store.read_at(seg, off) for seg, off in locs[-limit:]]
+
+    def update_score(self, path="score.json"):
+        """Met score.json à jour : victoires du joueur contre victoires de l'IA."""
+        totals = self.rate()
+        score = {"player": totals["wins"], "ai": totals["games"] - totals["wins"]}
+        current = None
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    current = json.load(f)
+            except (OSError, ValueError):
+                pass
+        if current != score:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(score, f, indent=2)
+        return score
+
+
+def _fmt_rate(r):
+    return f"{r['wins']}/{r['games']} ({r['rate'] * 100:.1f}%)" if r["games"] else "aucune partie"
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Statistiques des parties (journal logs/)")
+    ap.add_argument("command", nargs="?", default="summary",
+                    choices=["summary", "rate", "breakdown", "questions", "games", "rebuild",
+                             "import-legacy"])
+    ap.add_argument("--by", choices=DIMENSIONS, default="difficulty", help="dimension pour breakdown")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--folder", default="logs")
+    ap.add_argument("--score", default="score.json")
+    for d in DIMENSIONS:
+        ap.add_argument(f"--{d}")
+    args = ap.parse_args(argv)
+    filters = {d: getattr(args, d) for d in DIMENSIONS if getattr(args, d) is not None}
+
+    t0 = time.perf_counter()
+    an = Analytics(args.folder)
+    if args.command == "import-legacy":
+        # anciens logs/game_*.json : import idempotent, les parties déjà là sont sautées
+        print(f"{an.store.import_legacy()} partie(s) importée(s)")
+    added = an.rebuild() if args.command == "rebuild" else an.refresh()
+    an.update_score(args.score)
+    t1 = time.perf_counter()
+
+    if args.command in ("summary", "rebuild", "import-legacy"):
+        print(f"{an.total} partie(s) indexée(s), {added} nouvelle(s)")
+        only = filters.pop("mode", None)  # summary est déjà découpé par mode
+        for mode in (only,) if only else ("detective", "suspect"):
+            print(f"\n[{mode}] victoires du joueur : {_fmt_rate(an.rate(mode=mode, **filters))}")
+            for value, r in sorted(an.breakdown("difficulty", mode=mode, **filters).items()):
+                print(f"  {value:<10} {_fmt_rate(r)}")
+    elif args.command == "rate":
+        print(_fmt_rate(an.rate(**filters)))
+    elif args.command == "breakdown":
+        for value, r in sorted(an.breakdown(args.by, **filters).items()):
+            print(f"{value[:70]:<70} {_fmt_rate(r)}")
+    elif args.command == "questions":
+        for q, n in an.questions(**filters).items():
+            print(f"{q:>3} questions : {n}")
+    elif args.command == "games":
+        for g in an.games(limit=args.limit, **filters):
+            print(json.dumps({k: g.get(k) for k in ("id", "mode", "difficulty", "lang", "questions", "success", "ai_correct")}, ensure_ascii=False))
+    print(f"\n({(time.perf_counter() - t1) * 1000:.2f} ms de requête, {(t1 - t0) * 1000:.1f} ms d'indexation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Annulation coopérative des appels LLM.
+
+Un CancelToken est rendu courant avec `with scope(token):` ; les appels LLM lancés
+dans ce bloc (y compris dans les threads de _fan_out) le passent au backend, qui
+ferme la connexion HTTP quand le jeton est annulé : la génération s'arrête aussi
+côté Ollama. L'appel interrompu lève Cancelled.
+"""
+import contextlib
+import contextvars
+import threading
+
+
+class Cancelled(Exception):
+    """L'appel a été annulé (tour dépassé, partie relancée)."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception as e:
+                print("Erreur annulation:", e)
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, seconds):
+        """Comme time.sleep, mais lève Cancelled dès que le jeton est annulé."""
+        if self._event.wait(seconds):
+            raise Cancelled()
+
+    def on_cancel(self, fn):
+        """fn() sera appelée à l'annulation (tout de suite si c'est déjà fait) ; renvoie de quoi la retirer."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return lambda: self._remove(fn)
+        fn()
+        return lambda: None
+
+    def _remove(self, fn):
+        with self._lock:
+            if fn in self._callbacks:
+                self._callbacks.remove(fn)
+
+
+_current = contextvars.ContextVar("cancel_token", default=None)
+
+
+def current():
+    """Jeton du tour en cours (None hors d'un scope)."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def scope(token):
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check():
+    token = _current.get()
+    if token is not None:
+        token.check()
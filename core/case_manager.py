@@ -1,9 +1,33 @@
 import random
 
+from . import content
+from .history import as_prompt_text
+
+
 def generate_case(lang="fr"):
+    """
+    Affaire toute prête, sans appel LLM : secours quand le pool (core/case_pool.py) est
+    vide. Tirée de data/cases_<lang>.jsonl s'il existe (avec son contexte si la ligne
+    en donne un), sinon l'affaire de la bibliothèque.
+    """
     suspects = ["suspect1", "suspect2"]
     culprit = random.choice(suspects)
 
+    import jsonschema  # import lourd, seulement quand une affaire est tirée
+
+    try:
+        case = content.cases(lang).sample()
+        if case is not None:
+            jsonschema.validate(case, CASE_SCHEMA)
+            return {
+                "culprit": culprit,
+                "context": case.get("context"),
+                "alibis": case["alibis"],
+                "evidence": case["evidence"],
+            }
+    except (ValueError, jsonschema.ValidationError) as e:
+        print("Erreur affaire:", e)
+
     alibis_en = {
         "suspect1": "At home watching TV from 20:00 to 23:00",
         "suspect2": "At the library from 20:30 to 22:00"
@@ -31,7 +55,64 @@ def generate_case(lang="fr"):
     }
 
 
-def build_suspect_prompt(lang, suspect_role, case, history, detective_question, who_tag):
+# Affaire générée par le modèle (voir core/case_pool.py) : le coupable est tiré au
+# moment de jouer, les deux alibis sont donc écrits de la même façon
+CASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "alibis": {
+            "type": "object",
+            "properties": {
+                "suspect1": {"type": "string", "minLength": 8},
+                "suspect2": {"type": "string", "minLength": 8},
+            },
+            "required": ["suspect1", "suspect2"],
+        },
+        "evidence": {
+            "type": "object",
+            "properties": {
+                "murder_time": {"type": "string", "pattern": "^[0-2]?[0-9][:h][0-5][0-9]$"},
+                "location": {"type": "string", "minLength": 3},
+                "found_item": {"type": "string", "minLength": 3},
+            },
+            "required": ["murder_time", "location", "found_item"],
+        },
+    },
+    "required": ["alibis", "evidence"],
+}
+
+CASE_DIFFICULTY_HINTS = {
+    "fr": {
+        "easy": "Les alibis ont des failles évidentes et l'indice désigne clairement un lieu précis.",
+        "normal": "Les alibis se recoupent en partie ; l'indice est utile sans être décisif.",
+        "hard": "Les alibis sont solides et se chevauchent ; l'indice est subtil et ambigu.",
+    },
+    "en": {
+        "easy": "The alibis have obvious holes and the clue clearly points to a specific place.",
+        "normal": "The alibis partly overlap; the clue is useful without being decisive.",
+        "hard": "The alibis are solid and overlap; the clue is subtle and ambiguous.",
+    },
+}
+
+
+def case_prompt(lang, context, difficulty):
+    hint = CASE_DIFFICULTY_HINTS[lang].get(difficulty, CASE_DIFFICULTY_HINTS[lang]["normal"])
+    if lang == "fr":
+        return (
+            f"Invente les faits d'une enquête policière. Contexte : {context}\n"
+            "Donne l'alibi de chacun des deux suspects (lieu et horaires, une phrase), "
+            "l'heure du crime (HH:MM), le lieu exact et un indice matériel retrouvé sur place. "
+            f"{hint}\nRéponds uniquement en JSON, en français."
+        )
+    return (
+        f"Invent the facts of a police investigation. Context: {context}\n"
+        "Give the alibi of each of the two suspects (place and times, one sentence), "
+        "the time of the crime (HH:MM), the exact location and a physical clue found there. "
+        f"{hint}\nReply only in JSON, in English."
+    )
+
+
+def _suspect_header(lang, suspect_role, case, who_tag):
     tr = case["alibis"][who_tag]
     ev = case["evidence"]
 
@@ -63,4 +144,17 @@ def build_suspect_prompt(lang, suspect_role, case, history, detective_question,
         lang_tail = "Reply in concise English."
 
     header = criminal_hdr if (suspect_role == "suspect_criminal") else innocent_hdr
+    return header, lang_tail
+
+
+def build_suspect_prompt(lang, suspect_role, case, history, detective_question, who_tag):
+    """Prompt complet d'un suspect ; history peut être un History (core/history.py), borné."""
+    header, lang_tail = _suspect_header(lang, suspect_role, case, who_tag)
+    history = as_prompt_text(history)
     return f"{header}\n\nConversation:\n{history}\n\nDetective: {detective_question}\n{lang_tail}"
+
+
+def suspect_system_prompt(lang, suspect_role, case, who_tag):
+    """Consignes d'une session de suspect (ChatSession) : rôle + faits, sans l'historique."""
+    header, lang_tail = _suspect_header(lang, suspect_role, case, who_tag)
+    return f"{header}\n{lang_tail}"
@@ -0,0 +1,279 @@
+import json
+import os
+import random
+import threading
+from collections import deque
+
+from . import cancel
+from .ai_agent import ask_agent_json, optional, wait_idle
+from .case_manager import CASE_SCHEMA, case_prompt
+from .config import load_config
+
+DIFFICULTIES = ("easy", "normal", "hard")
+# Des affaires variées : assez chaud pour ne pas réécrire deux fois la même
+CASE_OPTIONS = {"temperature": 0.9, "num_predict": 300}
+# Après un échec (modèle injoignable, JSON invalide), pause avant de réessayer
+RETRY_S = 30
+
+
+def _bucket(lang, difficulty):
+    return f"{lang}/{difficulty}"
+
+
+class CasePool:
+    """
+    Affaires générées à l'avance par le modèle, une file par (langue, difficulté).
+
+    pop() prend une affaire prête en O(1), sans appel LLM, et tire le coupable ; si la
+    file est vide il renvoie None (l'appelant se rabat sur generate_case). Un seul
+    thread producteur remplit en arrière-plan : une file passée sous low_watermark
+    est complétée jusqu'à high_watermark, la plus vide d'abord, et chaque affaire
+    est validée avec CASE_SCHEMA. Une génération ne part qu'avec le backend au repos
+    (ai_agent.wait_idle) : elle ne ralentit jamais un tour de jeu. Le pool est gardé dans data/case_pool.json, il
+    survit donc aux redémarrages.
+    """
+
+    def __init__(self, model=None, path=None, low_watermark=None, high_watermark=None):
+        cfg = load_config().get("case_pool") or {}
+        self.model = model or load_config()["model"]
+        self.path = cfg.get("path", "data/case_pool.json") if path is None else path
+        self.low = cfg.get("low_watermark", 2) if low_watermark is None else low_watermark
+        high = cfg.get("high_watermark", 5) if high_watermark is None else high_watermark
+        self.high = max(self.low, high)
+        self.generated = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+        self._queues = {}  # "lang/difficulté" → deque d'affaires
+        self._contexts = {}  # langue → pack de contextes
+        self._wanted = set()  # files que le producteur entretient
+        self._refilling = set()  # files en cours de remplissage jusqu'à high_watermark
+        self._dirty = False
+        self._closed = False
+        self._thread = None
+        self._loaded = False  # data/case_pool.json relu au premier usage, pas à la construction
+        self._token = cancel.CancelToken()  # close() coupe l'attente et la génération en cours
+        self._cond = threading.Condition()
+
+    # -----------------------
+    # Consommation
+    # -----------------------
+
+    def prefetch(self, lang, contexts):
+        """
+        Déclare la langue jouée : ses files seront remplies pendant que le joueur choisit.
+        contexts est un pack de core/content.py (len, sample).
+        """
+        with self._cond:
+            self._load()
+            self._contexts[lang] = contexts
+            for d in DIFFICULTIES:
+                self._wanted.add(_bucket(lang, d))
+            self._start()
+            self._cond.notify()
+
+    def pop(self, lang, difficulty):
+        """Affaire prête (avec "context" et "culprit"), ou None si la file est vide."""
+        key = _bucket(lang, difficulty)
+        with self._cond:
+            self._load()
+            q = self._queues.get(key)
+            case = q.popleft() if q else None
+            self._wanted.add(key)
+            if case is not None:
+                self.hits += 1
+                self._dirty = True
+            else:
+                self.misses += 1
+            self._start()
+            self._cond.notify()
+        if case is None:
+            return None
+        return dict(case, culprit=random.choice(["suspect1", "suspect2"]))
+
+    def size(self, lang=None, difficulty=None):
+        with self._cond:
+            self._load()
+            return sum(
+                len(q) for key, q in self._queues.items()
+                if (lang is None or key.startswith(lang + "/"))
+                and (difficulty is None or key.endswith("/" + difficulty))
+            )
+
+    def stats(self):
+        with self._cond:
+            self._load()
+            sizes = {key: len(q) for key, q in sorted(self._queues.items())}
+        return {
+            "sizes": sizes, "generated": self.generated, "failures": self.failures,
+            "hits": self.hits, "misses": self.misses,
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        self._token.cancel()
+        if thread is not None:
+            thread.join(timeout=2)
+        self._save_if_dirty()
+
+    # -----------------------
+    # Production
+    # -----------------------
+
+    def _start(self):
+        # appelé sous self._cond
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._produce, name="case-pool", daemon=True)
+            self._thread.start()
+
+    def _next_job(self):
+        """File la plus vide à compléter (None si tout est au-dessus de low_watermark)."""
+        need = []
+        for key in self._wanted:
+            lang, difficulty = key.split("/")
+            if lang not in self._contexts:
+                continue
+            n = len(self._queues.get(key, ()))
+            refilling = key in self._refilling
+            if n < self.low or (refilling and n < self.high):
+                need.append((n, key, lang, difficulty))
+        if not need:
+            return None
+        n, key, lang, difficulty = min(need)
+        self._refilling.add(key)
+        return key, lang, difficulty
+
+    def _produce(self):
+        while True:
+            self._save_if_dirty()
+            with self._cond:
+                job = self._next_job()
+                if job is None and not self._closed:
+                    self._refilling.clear()
+                    self._cond.wait(timeout=5)
+                    continue
+                if self._closed:
+                    return
+                key, lang, difficulty = job
+                context = self._pick_context(key, lang)
+            try:
+                wait_idle(self._token)  # les tours du joueur passent d'abord
+                case = self._generate(lang, difficulty, context)
+            except cancel.Cancelled:
+                return
+            with self._cond:
+                if case is None:
+                    self._cond.wait(timeout=RETRY_S)
+                    continue
+                self._queues.setdefault(key, deque()).append(case)
+                self._dirty = True
+                if len(self._queues[key]) >= self.high:
+                    self._refilling.discard(key)
+
+    def _pick_context(self, key, lang):
+        # contexte tiré au hasard dans le pack (core/content.py), en évitant ceux déjà
+        # dans la file : des affaires variées, sans parcourir un gros pack
+        used = {case["context"] for case in self._queues.get(key, ())}
+        pack = self._contexts[lang]
+        context = pack.sample()
+        for _ in range(8):
+            if context not in used:
+                break
+            context = pack.sample()
+        return context
+
+    def _generate(self, lang, difficulty, context):
+        try:
+            with cancel.scope(self._token), optional():
+                data = ask_agent_json(
+                    self.model,
+                    case_prompt(lang, context, difficulty),
+                    cache=False,
+                    schema=CASE_SCHEMA,
+                    options=dict(CASE_OPTIONS, seed=random.randrange(1 << 30)),
+                )
+        except cancel.Cancelled:
+            raise
+        except Exception as e:
+            print("Erreur génération d'affaire:", e)
+            data = None
+        if data is None:
+            with self._cond:
+                self.failures += 1
+            return None
+        with self._cond:
+            self.generated += 1
+        return {
+            "context": context,
+            "alibis": {k: data["alibis"][k].strip() for k in ("suspect1", "suspect2")},
+            "evidence": {k: str(data["evidence"][k]).strip() for k in ("murder_time", "location", "found_item")},
+        }
+
+    # -----------------------
+    # Persistance
+    # -----------------------
+
+    def _load(self):
+        # appelé sous self._cond
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.isfile(self.path):
+            return
+        import jsonschema  # import lourd : seulement s'il y a un pool à relire
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Erreur pool d'affaires:", e)
+            return
+        for key, cases in (raw.get("queues") or {}).items():
+            q = deque()
+            for case in cases[: self.high]:
+                try:
+                    jsonschema.validate(case, CASE_SCHEMA)
+                except jsonschema.ValidationError:
+                    continue
+                if isinstance(case.get("context"), str):
+                    q.append(case)
+            self._queues[key] = q
+
+    def _save_if_dirty(self):
+        # appelé par le thread producteur : pop() ne touche jamais au disque
+        with self._cond:
+            if not self._dirty or not self.path:
+                return
+            self._dirty = False
+            data = {"queues": {key: list(q) for key, q in self._queues.items()}}
+        tmp = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print("Erreur pool d'affaires:", e)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_case_pool():
+    """Pool partagé, ou None si "case_pool.enabled" est faux dans data/config.json."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and (load_config().get("case_pool") or {}).get("enabled", True):
+            _pool = CasePool()
+        return _pool
+
+
+def set_case_pool(pool):
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, pool
+    if old is not None and old is not pool:
+        old.close()
@@ -0,0 +1,96 @@
+import json
+import os
+
+DEFAULTS = {
+    "model": "gemma3:latest",
+    "default_language": "fr",
+    "default_difficulty": "normal",
+    "max_questions": 10,
+    "accuse_min_question": 3,
+    "enable_logging": True,
+    "use_cards": True,
+    "theme": "interrogation",
+    # Afficher les statistiques LLM (jetons/s, taille des prompts) dans la GUI ; F2 bascule
+    "show_stats": False,
+    # Appels LLM simultanés (2 = les deux suspects en même temps)
+    "llm_concurrency": 2,
+    # Délai max (secondes) d'un appel LLM
+    "llm_timeout": 120,
+    # Backend LLM : "ollama" (pool d'hôtes, vide = OLLAMA_HOST ou localhost) ou "stub"
+    # (hors ligne, réponses toutes prêtes). DETECTIVE_BACKEND=stub force le stub.
+    "backend": {
+        "type": "ollama",
+        "hosts": [],
+        "connections_per_host": 4,
+        "health_interval": 15,
+        "stub_first_token_ms": 0,
+        "stub_token_ms": 0,
+    },
+    # Analyses de suspicion simultanées (pool séparé, voir core/analysis.py)
+    "analysis_concurrency": 1,
+    # Cache des réponses : taille du LRU, fichier SQLite (vide = mémoire seule),
+    # température au-delà de laquelle on ne met pas en cache
+    "llm_cache_size": 256,
+    "llm_cache_path": "data/llm_cache.sqlite",
+    "llm_cache_max_temperature": 0.8,
+    # Historique dans les prompts : dernières répliques gardées mot pour mot, les plus
+    # anciennes résumées, le tout dans un budget de jetons (voir core/history.py)
+    "history_keep_turns": 6,
+    "history_budget_tokens": 500,
+    # Taille (jetons) du contexte d'une session au-delà de laquelle elle repart
+    # d'un prompt construit sur l'historique borné
+    "session_max_context": 1536,
+    # Affaires générées à l'avance par le modèle (core/case_pool.py) : une file par
+    # langue et difficulté, complétée jusqu'à high_watermark dès qu'elle passe sous
+    # low_watermark. enabled=false : affaire fixe, sans génération.
+    "case_pool": {
+        "enabled": True,
+        "path": "data/case_pool.json",
+        "low_watermark": 2,
+        "high_watermark": 5,
+    },
+    # Réponses des suspects aux cartes piege/preuve préparées en arrière-plan dès le
+    # début de la partie (core/speculation.py), servies telles quelles si encore valables
+    "speculate_cards": True,
+    # Analyse locale des incohérences (core/contradictions.py) : l'analyse LLM n'est
+    # demandée que si l'écart de suspicion entre les suspects est sous min_margin
+    "local_analysis": {"enabled": True, "min_margin": 3.0},
+    # Sons de la GUI : driver "pygame" ou "null" (aucun son ; DETECTIVE_AUDIO=null le force),
+    # délai minimal entre deux lectures d'un même son
+    "audio": {"driver": "pygame", "volume": 1.0, "throttle_ms": 250},
+    # Durée pendant laquelle Ollama garde le modèle chargé après un appel
+    "keep_alive": "30m",
+}
+
+_cache = {}
+
+
+def _merge(defaults, overrides):
+    """Copie de defaults complétée par overrides ; les sections (dicts) sont fusionnées clé par clé."""
+    out = {k: _merge(v, {}) if isinstance(v, dict) else v for k, v in defaults.items()}
+    for k, v in overrides.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def load_config(path="data/config.json"):
+    """
+    Lit data/config.json (une seule fois) et complète avec les valeurs par défaut,
+    y compris dans les sections : {"backend": {"type": "stub"}} garde les autres
+    réglages par défaut du backend.
+    """
+    if path in _cache:
+        return _cache[path]
+    overrides = {}
+    if os.path.isfile(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Erreur config:", e)
+    cfg = _merge(DEFAULTS, overrides)
+    _cache[path] = cfg
+    return cfg
@@ -0,0 +1,208 @@
+"""
+Contenus du jeu lus dans data/ : contextes (context_<lang>.txt, un par ligne),
+affaires toutes prêtes (cases_<lang>.jsonl, une par ligne) et rôles (roles_<lang>.json).
+
+Les fichiers ligne à ligne ne sont jamais lus en entier : au premier accès on
+construit un index des débuts de ligne, gardé à côté du fichier (<fichier>.idx) et
+refait quand le fichier change (mtime, taille). Ensuite pack[i] et pack.sample()
+ne lisent qu'une ligne, quelle que soit la taille du fichier.
+"""
+import json
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+
+DATA_DIR = "data"
+_MAGIC = b"DTIDX001"
+_HEADER = struct.Struct("<8sQQQ")  # magique, mtime_ns, taille, nombre de lignes
+_SWAP = sys.byteorder != "little"  # l'index est écrit en petit-boutiste
+
+# Secours si data/context_<lang>.txt manque
+FALLBACK_CONTEXTS = {
+    "fr": [
+        "Un meurtre a eu lieu dans une vieille bibliothèque. Le détective doit découvrir qui ment.",
+        "Un cambriolage a eu lieu dans un musée. Deux suspects sont interrogés.",
+        "Un empoisonnement a eu lieu lors d’un dîner mondain. Qui est le coupable ?",
+        "Un vol de bijoux a été signalé dans un hôtel de luxe. Deux suspects sont entendus.",
+        "Un incendie criminel a détruit une maison. Le détective enquête sur les deux survivants suspects.",
+    ],
+    "en": [
+        "A murder has taken place in an old library. The detective must find out who is lying.",
+        "A burglary was committed in a museum. Two suspects are being questioned.",
+        "A poisoning occurred during a dinner party. Who is guilty?",
+        "A jewel theft has been reported in a luxury hotel. Two suspects are under interrogation.",
+        "An arson destroyed a house. The detective investigates the two surviving suspects.",
+    ],
+}
+
+
+class ListPack:
+    """Même interface que LinePack, sur une liste en mémoire."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def sample(self, rng=random):
+        return rng.choice(self.items) if self.items else None
+
+
+class LinePack:
+    """
+    Fichier à une entrée par ligne (lignes vides ignorées), indexé par décalages.
+    parse transforme la ligne lue (ex: json.loads pour du JSONL).
+    """
+
+    def __init__(self, path, parse=None):
+        self.path = path
+        self.parse = parse
+        self.index_path = path + ".idx"
+        self.builds = 0
+        self._offsets = None
+        self._stamp = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ensure())
+
+    def __getitem__(self, i):
+        with self._lock:
+            offsets = self._ensure()
+            if i < 0:
+                i += len(offsets)
+            if not 0 <= i < len(offsets):
+                raise IndexError(i)
+            self._file.seek(offsets[i])
+            line = self._file.readline()
+        text = line.decode("utf-8").strip()
+        return self.parse(text) if self.parse else text
+
+    def sample(self, rng=random):
+        n = len(self)
+        return self[rng.randrange(n)] if n else None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+            self._offsets = None
+            self._stamp = None
+
+    # --- index ---
+
+    def _ensure(self):
+        # appelé sous self._lock ; un stat par accès pour voir si le fichier a changé
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._offsets, self._stamp = array("Q"), None
+            return self._offsets
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._stamp:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, "rb")
+            offsets = self._read_index(stamp)
+            self._offsets = offsets if offsets is not None else self._build_index(stamp)
+            self._stamp = stamp
+        return self._offsets
+
+    def _read_index(self, stamp):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, mtime_ns, size, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or (mtime_ns, size) != stamp:
+                    return None
+                offsets = array("Q")
+                offsets.frombytes(f.read(count * offsets.itemsize))
+        except (OSError, struct.error, ValueError):
+            return None
+        if len(offsets) != count:
+            return None
+        if _SWAP:
+            offsets.byteswap()
+        return offsets
+
+    def _build_index(self, stamp):
+        offsets = array("Q")
+        pos = 0
+        self._file.seek(0)
+        for line in self._file:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line)
+        self.builds += 1
+        data = offsets
+        if _SWAP:
+            data = array("Q", offsets)
+            data.byteswap()
+        tmp = f"{self.index_path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, stamp[0], stamp[1], len(offsets)))
+                f.write(data.tobytes())
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            print("Erreur index:", e)  # dossier en lecture seule : index gardé en mémoire
+        return offsets
+
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+
+def _line_pack(name, parse=None):
+    path = os.path.join(DATA_DIR, name)
+    with _packs_lock:
+        if path not in _packs:
+            _packs[path] = LinePack(path, parse)
+        return _packs[path]
+
+
+def contexts(lang):
+    """Contextes d'enquête de la langue (data/context_<lang>.txt, sinon la liste de secours)."""
+    pack = _line_pack(f"context_{lang}.txt")
+    if len(pack):
+        return pack
+    return ListPack(FALLBACK_CONTEXTS.get(lang, FALLBACK_CONTEXTS["en"]))
+
+
+def cases(lang):
+    """Affaires écrites à la main (data/cases_<lang>.jsonl) ; pack vide si le fichier manque."""
+    return _line_pack(f"cases_{lang}.jsonl", json.loads)
+
+
+_roles = {}
+
+
+def roles(lang):
+    """Consignes par rôle (data/roles_<lang>.json), relues si le fichier change."""
+    path = os.path.join(DATA_DIR, f"roles_{lang}.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    with _packs_lock:
+        hit = _roles.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print("Erreur rôles:", e)
+        data = {}
+    with _packs_lock:
+        _roles[path] = (mtime, data)
+    return data
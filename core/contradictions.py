@@ -0,0 +1,334 @@
+"""
+Détection locale des incohérences des suspects, sans appel LLM.
+
+Pour chaque suspect on tient une table de faits, mise à jour à chaque tour avec sa
+seule nouvelle réponse : heures et lieux qu'il donne, comparés à son alibi, au lieu
+du crime, à l'indice retrouvé et à ses réponses précédentes. Les motifs (heures,
+lieux, esquives) sont compilés une fois par langue ; un tour coûte quelques dizaines
+de microsecondes.
+
+analysis() renvoie le même JSON que l'analyse LLM (core/analysis.py), avec en plus
+"source": "local" et une confiance entre 0 et 1 : l'écart de poids entre les deux
+suspects rapporté à min_margin, réduit tant que le suspect en tête n'a pas MIN_SIGNALS
+signaux indépendants. En dessous de 1, l'appelant demande l'analyse au modèle.
+"""
+import re
+import unicodedata
+
+from .config import load_config
+
+# Poids de chaque règle dans la suspicion
+WEIGHTS = {
+    "alibi_time": 1.0,  # heure donnée hors de la plage de son alibi
+    "alibi_place": 1.5,  # lieu donné absent de son alibi
+    "changed_place": 2.0,  # lieux d'un tour sans rapport avec ceux des tours précédents
+    "crime_scene": 1.0,  # se place sur le lieu du crime
+    "found_item": 1.5,  # parle de l'indice sans qu'on l'ait mentionné
+    "evasive": 0.5,  # « je ne me souviens pas », « pourquoi mentirais-je »...
+}
+# Incohérences affichées, par règle
+ISSUES = {
+    "fr": {
+        "alibi_time": "{who} parle de {time}, hors de la plage de son alibi ({window}).",
+        "alibi_place": "{who} évoque « {place} », absent de son alibi.",
+        "changed_place": "{who} change de version : « {before} » puis « {now} ».",
+        "crime_scene": "{who} se place sur le lieu du crime (« {place} »).",
+        "found_item": "{who} parle de « {word} » sans qu'on l'ait évoqué.",
+        "evasive": "{who} élude la question.",
+    },
+    "en": {
+        "alibi_time": "{who} mentions {time}, outside their alibi ({window}).",
+        "alibi_place": "{who} brings up “{place}”, which is not in their alibi.",
+        "changed_place": "{who} changes their story: “{before}” then “{now}”.",
+        "crime_scene": "{who} places themselves at the crime scene (“{place}”).",
+        "found_item": "{who} brings up “{word}” unprompted.",
+        "evasive": "{who} dodges the question.",
+    },
+}
+# Signal : une famille de règles dans un tour. Un même lieu inattendu déclenche
+# jusqu'à trois règles de lieu, mais ne compte que pour un signal.
+SIGNALS = {
+    "alibi_time": "time", "alibi_place": "place", "changed_place": "place",
+    "crime_scene": "place", "found_item": "item", "evasive": "evasive",
+}
+MIN_SIGNALS = 2  # signaux indépendants avant de se passer du modèle
+MAX_EVASIVE = 3  # esquives comptées au plus, par suspect
+TOLERANCE_MIN = 15  # marge (minutes) autour de la plage de l'alibi
+
+# Lieux reconnus : identifiant → (formes anglaises, formes françaises) ; la première
+# forme sert à l'affichage. Les formes sont des fragments de regex, sans accents.
+PLACES = {
+    "home": (("home", "house", "my place", "my flat", "apartment"),
+             ("chez moi", "maison", "domicile", "appartement")),
+    "friend": (("a friend's", "my friend's", "friends' place"),
+               (r"chez (?:un|une|des|mon|ma|mes) amie?s?",)),
+    "library": (("library",), ("bibliotheque",)),
+    "cinema": (("cinema", "movies", "movie theater", "theater", "theatre"), ("cinema", "theatre")),
+    "office": (("office",), ("bureau",)),
+    "bar": (("bar", "pub"), ("bar",)),
+    "cafe": (("cafe", "coffee shop"), ("cafe",)),
+    "restaurant": (("restaurant",), ("restaurant",)),
+    "hotel": (("hotel",), ("hotel",)),
+    "room": (("room", "bedroom"), ("chambre",)),
+    "lounge": (("living room", "lounge", "salon"), ("salon",)),
+    "dining_room": (("dining room",), ("salle a manger",)),
+    "kitchen": (("kitchen",), ("cuisine",)),
+    "corridor": (("corridor", "hallway"), ("couloir",)),
+    "cellar": (("cellar", "basement"), ("cave", "sous-sol")),
+    "workshop": (("workshop", "studio"), ("atelier",)),
+    "garage": (("garage",), ("garage",)),
+    "museum": (("museum",), ("musee",)),
+    "storeroom": (("storeroom", "storage room"), ("reserve", "entrepot")),
+    "lab": (("laboratory", "lab"), ("laboratoire", "labo")),
+    "garden": (("garden", "yard"), ("jardin",)),
+    "park": (("park",), ("parc",)),
+    "street": (("street",), ("rue",)),
+    "station": (("station",), ("gare",)),
+    "car": (("car",), ("voiture",)),
+    "shop": (("shop", "store"), ("magasin", "boutique")),
+    "church": (("church",), ("eglise",)),
+    "gym": (("gym",), ("salle de sport",)),
+    "hospital": (("hospital",), ("hopital",)),
+}
+PLACE_NAMES = {
+    "en": {k: v[0][0] for k, v in PLACES.items()},
+    "fr": dict({k: v[1][0] for k, v in PLACES.items()}, friend="chez un ami", library="bibliothèque",
+               cinema="cinéma", cafe="café", dining_room="salle à manger", museum="musée",
+               storeroom="réserve", church="église", hospital="hôpital", lab="laboratoire",
+               cellar="cave"),
+}
+
+_NUMBERS = {
+    "en": ("one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+           "eleven", "twelve"),
+    "fr": ("une", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf", "dix",
+           "onze", "douze"),
+}
+_HM = r"(?P<h>[01]?\d|2[0-3])\s*[:h.]\s*(?P<m>[0-5]\d)(?:\s*(?P<ap>[ap])\.?m\b\.?)?"
+_TIME = {
+    "en": re.compile(
+        _HM
+        + r"|\b(?P<h2>1[0-2]|0?[1-9])\s*(?P<ap2>[ap])\.?m\b"
+        + r"|\b(?:around|about|at|by|after|before|from|to|until|till|since)\s+"
+        + r"(?:(?P<h3>1[0-2]|0?[1-9])\b(?!\s*[:h.]\s*\d)|(?P<w>" + "|".join(_NUMBERS["en"]) + r")\b)"
+        + r"|\b(?P<w2>" + "|".join(_NUMBERS["en"]) + r")\s+o'?clock\b"
+        + r"|\b(?P<named>midnight|noon)\b"
+    ),
+    "fr": re.compile(
+        _HM
+        + r"|\b(?P<h2>[01]?\d|2[0-3])\s*(?:h|heures?)\b"
+        + r"|\b(?P<w>" + "|".join(_NUMBERS["fr"]) + r")\s+heures?\b"
+        + r"|\b(?P<named>minuit|midi)\b"
+    ),
+}
+_NAMED = {"midnight": 24 * 60, "minuit": 24 * 60, "noon": 12 * 60, "midi": 12 * 60}
+_UNTIL = {"en": re.compile(r"\b(?:until|till)\b"), "fr": re.compile(r"\bjusqu")}
+_FROM = {"en": re.compile(r"\b(?:from|since)\b"), "fr": re.compile(r"\b(?:depuis|partir)\b")}
+_NEGATION = {
+    "en": re.compile(r"\b(?:not|never|no|nowhere)\b|n't\b"),
+    "fr": re.compile(r"\bn'|\b(?:ne|pas|jamais|nulle part)\b"),
+}
+_EVASIVE = {
+    "en": re.compile(
+        r"(?:don't|do not|can't|cannot) (?:really )?(?:remember|recall|say)|no idea|not sure"
+        r"|why would i (?:lie|do)|nothing to hide|no comment|i refuse"
+    ),
+    "fr": re.compile(
+        r"ne (?:me )?(?:souviens|rappelle|sais) (?:plus|pas)|aucune idee|pas sur"
+        r"|pourquoi (?:je )?mentirai|rien a cacher|sans commentaire|je refuse"
+    ),
+}
+_CLAUSE = re.compile(r"[.;!?,]|\s(?:but|then|mais|puis)\s")
+_WORD = re.compile(r"[a-z]{3,}")
+_STOPWORDS = {
+    "en": frozenset("the and with from that this some for was were into onto near his her their "
+                    "its our your traces trace stained piece pieces small large old new".split()),
+    "fr": frozenset("les des une avec dans sur pour par qui que est sont aux son ses leur "
+                    "trace traces tache taches morceau petit petite grand grande vieux vieille".split()),
+}
+
+
+def _fold(text):
+    """Minuscules, sans accents, apostrophes droites."""
+    text = unicodedata.normalize("NFKD", (text or "").lower().replace("’", "'"))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _compile_places(lang):
+    i = 0 if lang == "en" else 1
+    alts = [
+        f"(?P<{key}>" + "|".join(sorted(forms[i], key=len, reverse=True)) + ")"
+        for key, forms in PLACES.items()
+    ]
+    return re.compile(r"\b(?:" + "|".join(alts) + r")\b")
+
+
+_PLACE_RE = {lang: _compile_places(lang) for lang in ("en", "fr")}
+
+
+def _hhmm(minutes):
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+class _Facts:
+    """Table de faits d'un suspect."""
+
+    def __init__(self, window, places):
+        self.window = window  # (début, fin) de l'alibi en minutes, bornes None si inconnues
+        self.alibi_places = places
+        self.claimed = set()  # lieux donnés aux tours précédents
+        self.weight = 0.0
+        self.issues = []
+        self.seen = set()  # (règle, détail) déjà comptés
+        self.signals = set()  # (famille de règles, tour) : voir SIGNALS
+        self.evasive = 0
+
+
+class ContradictionDetector:
+    """Suspicion calculée localement, tour par tour, pour les deux suspects d'une affaire."""
+
+    def __init__(self, lang, case, min_margin=None):
+        self.lang = lang if lang in _TIME else "en"
+        cfg = load_config().get("local_analysis") or {}
+        self.min_margin = cfg.get("min_margin", 3.0) if min_margin is None else min_margin
+        ev = case["evidence"]
+        self.murder_time = self._times(_fold(ev.get("murder_time")), None)
+        self.murder_time = self.murder_time[0] if self.murder_time else 21 * 60
+        self.crime_places = self._places(_fold(ev.get("location")))
+        stop = _STOPWORDS[self.lang]
+        words = sorted({w for w in _WORD.findall(_fold(ev.get("found_item"))) if w not in stop})
+        self.item_re = re.compile(r"\b(?:" + "|".join(words) + ")") if words else None
+        self.turns = 0
+        self.facts = {}
+        for who in ("suspect1", "suspect2"):
+            alibi = _fold(case["alibis"][who])
+            self.facts[who] = _Facts(self._window(alibi), self._places(alibi))
+
+    # --- extraction ---
+
+    def _times(self, text, ref):
+        out = []
+        for m in _TIME[self.lang].finditer(text):
+            g = m.groupdict()
+            if g["named"]:
+                out.append(_NAMED[g["named"]])
+                continue
+            ap = g["ap"] or g.get("ap2")
+            if g["h"] is not None:
+                h, mins = int(g["h"]), int(g["m"])
+            elif g.get("h2") is not None or g.get("h3") is not None:
+                h, mins = int(g.get("h2") or g["h3"]), 0
+            else:
+                word = g["w"] or g.get("w2")
+                h, mins = _NUMBERS[self.lang].index(word) + 1, 0
+            if ap:
+                h = h % 12 + (12 if ap == "p" else 0)
+            elif h < 12 and ref is not None and abs(h + 12 - ref // 60) < abs(h - ref // 60):
+                h += 12  # « vers neuf heures » un soir de crime : 21h
+            out.append(h * 60 + mins)
+        return out
+
+    def _window(self, alibi):
+        times = self._times(alibi, self.murder_time)
+        if len(times) >= 2:
+            start, end = times[0], times[-1]
+            if end < start:
+                end += 24 * 60  # « de 22h à 1h »
+            return start, end
+        if len(times) == 1:
+            if _UNTIL[self.lang].search(alibi) and not _FROM[self.lang].search(alibi):
+                return None, times[0]
+            if _FROM[self.lang].search(alibi):
+                return times[0], None
+        return None
+
+    def _places(self, text):
+        return {m.lastgroup for m in _PLACE_RE[self.lang].finditer(text)}
+
+    # --- mise à jour ---
+
+    def add(self, question, answers):
+        """Intègre un tour : question du détective, {suspect: réponse}."""
+        self.turns += 1
+        q = _fold(question)
+        for who, answer in answers.items():
+            if who in self.facts:
+                self._update(who, self.facts[who], q, _fold(answer))
+
+    def _update(self, who, f, question, answer):
+        negation = _NEGATION[self.lang]
+        claimed, times = set(), []
+        for clause in _CLAUSE.split(answer):
+            if not clause or negation.search(clause):
+                continue
+            claimed |= self._places(clause)
+            times += self._times(clause, self.murder_time)
+
+        if f.window is not None:
+            start, end = f.window
+            for t in times:
+                if end is not None and end >= 24 * 60 and t < 6 * 60:
+                    t += 24 * 60  # après minuit
+                if (start is not None and t < start - TOLERANCE_MIN) or (
+                    end is not None and t > end + TOLERANCE_MIN
+                ):
+                    window = f"{_hhmm(start) if start is not None else '…'}–{_hhmm(end) if end is not None else '…'}"
+                    self._flag(who, f, "alibi_time", _hhmm(t), time=_hhmm(t), window=window)
+        if f.alibi_places:
+            for place in claimed - f.alibi_places:
+                self._flag(who, f, "alibi_place", place, place=self._name(place))
+        if f.claimed and claimed and not (claimed & f.claimed):
+            before = ", ".join(sorted(self._name(p) for p in f.claimed))
+            now = ", ".join(sorted(self._name(p) for p in claimed))
+            self._flag(who, f, "changed_place", now, before=before, now=now)
+        for place in (claimed & self.crime_places) - f.alibi_places:
+            self._flag(who, f, "crime_scene", place, place=self._name(place))
+        if self.item_re is not None:
+            for word in set(self.item_re.findall(answer)):
+                if word not in question:
+                    self._flag(who, f, "found_item", word, word=word)
+        if f.evasive < MAX_EVASIVE and _EVASIVE[self.lang].search(answer):
+            f.evasive += 1
+            if f.evasive == 1:
+                self._flag(who, f, "evasive", None)
+            else:
+                f.weight += WEIGHTS["evasive"]  # même incohérence, affichée une fois
+                f.signals.add((SIGNALS["evasive"], self.turns))
+        f.claimed |= claimed
+
+    def _name(self, place):
+        return PLACE_NAMES[self.lang].get(place, place)
+
+    def _flag(self, who, f, rule, detail, **fields):
+        if (rule, detail) in f.seen:
+            return
+        f.seen.add((rule, detail))
+        f.weight += WEIGHTS[rule]
+        f.signals.add((SIGNALS[rule], self.turns))
+        label = "Suspect " + who[-1]
+        f.issues.append(ISSUES[self.lang][rule].format(who=label, **fields))
+
+    # --- résultat ---
+
+    def confidence(self):
+        f1, f2 = self.facts["suspect1"], self.facts["suspect2"]
+        lead = f1 if f1.weight >= f2.weight else f2
+        # un signal isolé ne suffit pas, quel que soit son poids
+        support = min(1.0, len(lead.signals) / MIN_SIGNALS)
+        margin = abs(f1.weight - f2.weight)
+        return support * (min(1.0, margin / self.min_margin) if self.min_margin > 0 else 1.0)
+
+    def analysis(self):
+        """Scores 0-100 et incohérences, au format de l'analyse LLM."""
+        reasons = "motifs" if self.lang == "fr" else "motives"
+        issues = "incoherences" if self.lang == "fr" else "inconsistencies"
+        w1, w2 = self.facts["suspect1"].weight, self.facts["suspect2"].weight
+        data = {
+            who: {"score": round(100 * (1 + f.weight) / (2 + w1 + w2)), reasons: list(f.issues)}
+            for who, f in self.facts.items()
+        }
+        data[issues] = self.facts["suspect1"].issues + self.facts["suspect2"].issues
+        data["source"] = "local"
+        data["confidence"] = round(self.confidence(), 2)
+        return data
+
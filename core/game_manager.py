@@ -1,12 +1,21 @@
 # core/game_manager.py
-import random
 from datetime import datetime
 
-from .case_manager import generate_case, build_suspect_prompt
-from .ai_agent import ask_agent, ask_agent_json, detective_analysis_prompt
+from .case_manager import build_suspect_prompt, generate_case, suspect_system_prompt
+from .case_pool import get_case_pool
+from .cancel import Cancelled
+from .ai_agent import ChatSession, ask_sessions_parallel, model_status, warm_up
+from .analysis import IncrementalAnalysis
 from .difficulty_manager import gen_opts_for_difficulty
+from .history import History
 from .cards_manager import use_card_prompt
+from . import tracing
+from .config import load_config
+from . import content
 from .logs_manager import save_game_log
+from .metrics import CallMetrics
+from .speculation import SPECULATIVE_CARDS, CardSpeculator, card_message
+from .contradictions import ContradictionDetector
 
 
 class GameManager:
@@ -17,24 +26,13 @@ class GameManager:
 
     def __init__(self):
         # Réglages courants
+        self.model = load_config()["model"]
         self.lang = "en"
         self.difficulty = "normal"
-        self.contexts = {
-            "fr": [
-                "Un meurtre a eu lieu dans une vieille bibliothèque. Le détective doit découvrir qui ment.",
-                "Un cambriolage a eu lieu dans un musée. Deux suspects sont interrogés.",
-                "Un empoisonnement a eu lieu lors d’un dîner mondain. Qui est le coupable ?",
-                "Un vol de bijoux a été signalé dans un hôtel de luxe. Deux suspects sont entendus.",
-                "Un incendie criminel a détruit une maison. Le détective enquête sur les deux survivants suspects."
-            ],
-            "en": [
-                "A murder has taken place in an old library. The detective must find out who is lying.",
-                "A burglary was committed in a museum. Two suspects are being questioned.",
-                "A poisoning occurred during a dinner party. Who is guilty?",
-                "A jewel theft has been reported in a luxury hotel. Two suspects are under interrogation.",
-                "An arson destroyed a house. The detective investigates the two surviving suspects."
-            ]
-        }
+        # Dossier du journal des parties (None : partie non journalisée)
+        self.log_folder = "logs"
+        # Affaires générées à l'avance (core/case_pool.py) ; None : affaire fixe de generate_case
+        self.case_pool = get_case_pool()
 
         # État de jeu
         self.state = "ask_lang"  # ask_lang → ask_difficulty → ask_role → (detective|suspect)
@@ -44,7 +42,7 @@ class GameManager:
 
         # Variables mode détective
         self.detective_asked = 0
-        self.detective_history = ""
+        self.detective_history = History(self.model, self.lang)  # répliques, voir core/history.py
         self.detective_cards = {"pression": 1, "piege": 1, "preuve": 1}
         self.criminal = None
         self.role1 = None
@@ -52,38 +50,150 @@ class GameManager:
 
         # Variables mode suspect
         self.suspect_is_criminal = False
-        self.suspect_history = ""
+        self.suspect_history = History(self.model, self.lang)
         self.suspect_asked = 0  # nombre de questions déjà posées par l'IA détective
+        self.suspect_last_question = ""
+
+        # Jetons et durées de chaque appel LLM de la partie (voir llm_metrics())
+        self.metrics = CallMetrics()
+
+        # Sessions LLM persistantes (un contexte par personnage IA)
+        self.suspect_sessions = {}
+        self.detective_session = None
+        # Analyse de suspicion incrémentale, calculée en arrière-plan
+        self.analysis = IncrementalAnalysis(
+            self.model, self.lang, on_stats=self.metrics.sink("analysis")
+        )
+        # Réponses aux cartes piege/preuve préparées en arrière-plan (core/speculation.py)
+        self.speculator = CardSpeculator(on_stats=self.metrics.sink("speculation"))
+        self.speculate_cards = load_config().get("speculate_cards", True)
+        # Incohérences détectées localement (core/contradictions.py) : l'analyse LLM
+        # n'est demandée que si elles ne suffisent pas à départager les suspects
+        self.contradictions = None
+        self.local_analysis = (load_config().get("local_analysis") or {}).get("enabled", True)
+        self.analysis_sources = {"local": 0, "llm": 0}
+
+        # Mode streaming : callback on_event(speaker, morceau) du tour en cours
+        self._on_event = None
+        # Journal de la dernière partie terminée (même contenu que dans logs/)
+        self.last_result = None
 
     # ------------------------------------------------------------------
     # API GUI
     def start_game(self, _user_input_ignored=None):
         """Retourne le premier message d’invite pour la GUI."""
         self.state = "ask_lang"
+        self.speculator.cancel()
+        # Le modèle se charge pendant que le joueur choisit langue, difficulté et rôle
+        warm_up(self.model)
         return "🌍 Choose your language / Choisis ta langue: (fr/en)"
 
-    def process_turn(self, user_input: str) -> str:
-        """Traite la saisie utilisateur selon l’état courant, et retourne la réponse IA / prochaine consigne."""
+    def process_turn(self, user_input: str, on_event=None) -> str:
+        """
+        Traite la saisie utilisateur selon l’état courant, et retourne la réponse IA / prochaine consigne.
+
+        Mode streaming : si on_event est fourni, les répliques des personnages sont envoyées
+        morceau par morceau via on_event(speaker, morceau), avec speaker parmi
+        "suspect1", "suspect2", "detective", "analysis". Un premier événement avec un
+        morceau vide annonce chaque réplique, dans l'ordre d'affichage. Le texte déjà
+        émis n'est pas répété dans la valeur de retour. on_event peut être appelé
+        depuis plusieurs threads.
+        """
+        self._on_event = on_event
+        self.metrics.next_turn()
         try:
-            if self.state == "ask_lang":
-                return self._handle_lang(user_input)
-            if self.state == "ask_difficulty":
-                return self._handle_difficulty(user_input)
-            if self.state == "ask_role":
-                return self._handle_role(user_input)
-            if self.state == "detective_wait_question":
-                return self._handle_detective_question(user_input)
-            if self.state == "detective_force_accuse":
-                return self._handle_detective_force_accuse(user_input)
-            if self.state == "suspect_choose_alignment":
-                return self._handle_suspect_choose_alignment(user_input)
-            if self.state == "suspect_wait_player_answer":
-                return self._handle_suspect_player_answer(user_input)
-
-            return "⚠️ Internal state error. Restart the game."
-
+            with tracing.span("turn." + self.state, "game", input_chars=len(user_input or "")):
+                return self._dispatch(user_input)
+        except Cancelled:
+            raise  # tour abandonné (core/turns.py) : pas de message d'erreur
         except Exception as e:
             return f"⚠️ Error: {e}"
+        finally:
+            self._on_event = None
+
+    def _dispatch(self, user_input):
+        if self.state == "ask_lang":
+            return self._handle_lang(user_input)
+        if self.state == "ask_difficulty":
+            return self._handle_difficulty(user_input)
+        if self.state == "ask_role":
+            return self._handle_role(user_input)
+        if self.state == "detective_wait_question":
+            return self._handle_detective_question(user_input)
+        if self.state == "detective_force_accuse":
+            return self._handle_detective_force_accuse(user_input)
+        if self.state == "suspect_choose_alignment":
+            return self._handle_suspect_choose_alignment(user_input)
+        if self.state == "suspect_wait_player_answer":
+            return self._handle_suspect_player_answer(user_input)
+
+        return "⚠️ Internal state error. Restart the game."
+
+    def close(self):
+        """Partie abandonnée : coupe les générations de fond (spéculation, analyse, résumés)."""
+        self.speculator.close()
+        self.analysis.cancel()
+        self.detective_history.cancel()
+        self.suspect_history.cancel()
+
+    def backend_status(self):
+        """"cold", "warming", "ready" ou "error" : le modèle est-il chargé côté Ollama ?"""
+        return model_status(self.model)
+
+    def llm_metrics(self):
+        """
+        Jetons, durées et débit des appels LLM : dernier tour ("turn") et partie en
+        cours ("game", détaillée par site d'appel et par tour), et taux de réussite des
+        réponses spéculées aux cartes ("speculation").
+        """
+        return {
+            "turn": self.metrics.turn_summary(),
+            "game": self.metrics.game_summary(),
+            "speculation": self.speculator.stats(),
+            "analysis_sources": dict(self.analysis_sources),
+        }
+
+    def _emit(self, speaker, chunk):
+        if self._on_event is not None:
+            self._on_event(speaker, chunk)
+
+    def _ask_detective(self, message):
+        """Question du détective IA (mode suspect), streamée si le tour est en mode streaming."""
+        if self._on_event is None:
+            return self.detective_session.ask(message)
+        self._emit("detective", "")
+        return self.detective_session.ask_streamed(
+            message, lambda c: self._emit("detective", c)
+        )
+
+    def _save_result(self, payload):
+        self.last_result = payload
+        if self.log_folder:
+            save_game_log(payload, self.log_folder)
+
+    def _suspect_reseed(self, role, who):
+        """Prompt complet d'un suspect dont la session repart de zéro (historique borné)."""
+        def reseed(message):
+            question = message.split(": ", 1)[1]  # message = "Detective: <question>"
+            return build_suspect_prompt(self.lang, role, self.case, self.detective_history, question, who)
+        return reseed
+
+    def _detective_reseed(self, message):
+        """
+        Prompt complet du détective IA dont la session repart de zéro : consignes et
+        contexte, historique borné (résumé + dernières répliques), puis la consigne du tour.
+        """
+        # message = "[Suspect: <réponse>\n]Detective: <consigne>" : la réponse est déjà
+        # la dernière réplique de suspect_history, on ne garde que la consigne
+        instruction = message.rsplit("Detective: ", 1)[-1]
+        return (
+            f"{self.detective_session.system_prompt}\n\n"
+            f"{self.suspect_history.for_prompt()}\n\nDetective: {instruction}"
+        )
+
+    def _reset_sessions(self):
+        self.suspect_sessions = {}
+        self.detective_session = None
 
     # ------------------------------------------------------------------
     # Handlers des états
@@ -91,6 +201,13 @@ class GameManager:
     def _handle_lang(self, txt: str) -> str:
         t = (txt or "").strip().lower()
         self.lang = "fr" if t == "fr" else "en"
+        # Nouvelle partie : on oublie les conversations de la précédente
+        self._reset_sessions()
+        self.analysis.reset(self.lang)
+        # Entre deux parties le modèle a pu être déchargé : on le recharge en fond
+        warm_up(self.model)
+        if self.case_pool is not None:
+            self.case_pool.prefetch(self.lang, content.contexts(self.lang))
         self.state = "ask_difficulty"
         return "🎚️ " + (
             "Choisis une difficulté (easy/normal/hard): "
@@ -102,8 +219,11 @@ class GameManager:
         t = (txt or "").strip().lower()
         self.difficulty = t if t in ["easy", "normal", "hard"] else "normal"
         self.opts = gen_opts_for_difficulty(self.difficulty)
-        self.context = random.choice(self.contexts[self.lang])
-        self.case = generate_case(self.lang)
+        # Affaire prête du pool (son contexte avec), sinon l'affaire fixe : jamais d'attente
+        self.case = self.case_pool.pop(self.lang, self.difficulty) if self.case_pool is not None else None
+        if self.case is None:
+            self.case = generate_case(self.lang)
+        self.context = self.case.get("context") or content.contexts(self.lang).sample()
 
         self.state = "ask_role"
         head = (
@@ -129,6 +249,10 @@ class GameManager:
                 if self.lang == "fr"
                 else "❓ Invalid role. Type 'detective' or 'suspect'."
             )
+        self.analysis.reset(self.lang)
+        self.metrics.reset()
+        self.speculator.reset()
+        self.analysis_sources = {"local": 0, "llm": 0}
 
         if t == "detective":
             self.criminal = self.case["culprit"]
@@ -139,9 +263,23 @@ class GameManager:
                 "suspect_criminal" if self.criminal == "suspect2" else "suspect_innocent"
             )
             self.detective_asked = 0
-            self.detective_history = ""
+            self.detective_history.reset(self.lang)
+            self.analysis.history = self.detective_history
             self.detective_cards = {"pression": 1, "piege": 1, "preuve": 1}
+            self.contradictions = ContradictionDetector(self.lang, self.case)
+            self.suspect_sessions = {
+                who: ChatSession(
+                    self.model,
+                    suspect_system_prompt(self.lang, role, self.case, who),
+                    self.opts,
+                    on_stats=self.metrics.sink(who),
+                    max_context=load_config()["session_max_context"],
+                    reseed=self._suspect_reseed(role, who),
+                )
+                for who, role in (("suspect1", self.role1), ("suspect2", self.role2))
+            }
             self.state = "detective_wait_question"
+            self._speculate_cards()
 
             return (
                 "🕵️ Tu es le détective. Interroge les deux suspects !\n"
@@ -153,8 +291,17 @@ class GameManager:
                 "👉 Ask your first question:"
             )
 
-        self.suspect_history = self.context
+        self.suspect_history.reset(self.lang, preamble=self.context)
         self.suspect_asked = 0
+        self.detective_session = ChatSession(
+            self.model,
+            # consigne du rôle (data/roles_<lang>.json) puis le contexte de l'affaire
+            "\n".join(filter(None, (content.roles(self.lang).get("detective"), self.context))),
+            self.opts,
+            on_stats=self.metrics.sink("detective_question"),
+            max_context=load_config()["session_max_context"],
+            reseed=self._detective_reseed,
+        )
         self.state = "suspect_choose_alignment"
         return (
             "🎭 Veux-tu être innocent ou coupable ?"
@@ -171,11 +318,12 @@ class GameManager:
             )
 
         lower = question.lower()
+        used_card = None
         if lower.startswith("pression:") or lower.startswith("pressure:"):
             if self.detective_cards["pression"] > 0:
                 question = question.split(":", 1)[1].strip()
                 question = use_card_prompt(self.lang, "pression", question, self.case)
-                self.detective_cards["pression"] = 0
+                used_card = "pression"
             else:
                 return "♻️ " + (
                     "Carte 'pression' déjà utilisée."
@@ -186,7 +334,7 @@ class GameManager:
             if self.detective_cards["piege"] > 0:
                 question = question.split(":", 1)[1].strip()
                 question = use_card_prompt(self.lang, "piege", question, self.case)
-                self.detective_cards["piege"] = 0
+                used_card = "piege"
             else:
                 return "♻️ " + (
                     "Carte 'piege' déjà utilisée."
@@ -197,7 +345,7 @@ class GameManager:
             if self.detective_cards["preuve"] > 0:
                 question = question.split(":", 1)[1].strip()
                 question = use_card_prompt(self.lang, "preuve", question, self.case)
-                self.detective_cards["preuve"] = 0
+                used_card = "preuve"
             else:
                 return "♻️ " + (
                     "Carte 'preuve' déjà utilisée."
@@ -205,49 +353,76 @@ class GameManager:
                     else "'evidence' card already used."
                 )
 
+        # Les deux suspects répondent en parallèle, chacun dans sa session : seule la
+        # nouvelle question est envoyée. En cas d'échec ni la question ni la carte ne
+        # sont comptées, et les sessions reviennent à leur état précédent.
+        # Cartes piege/preuve : un suspect dont la réponse spéculée est déjà lancée
+        # l'attend, les autres sont interrogés en même temps.
+        speakers = ("suspect1", "suspect2")
+        sessions = [self.suspect_sessions[sp] for sp in speakers]
+        message = f"Detective: {question}"
+        streaming = self._on_event is not None
+        ready = None
+        if used_card in SPECULATIVE_CARDS:
+            ready = self.speculator.take(used_card, dict(zip(speakers, sessions)), message)
+            ready = [ready.get(sp) for sp in speakers]
+        else:
+            self.speculator.cancel()  # calculé sur des sessions qui vont changer
+        on_chunk = None
+        if streaming:
+            for sp in speakers:
+                self._emit(sp, "")
+            on_chunk = lambda i, c: self._emit(speakers[i], c)
+        try:
+            answers = ask_sessions_parallel(sessions, message, on_chunk=on_chunk, ready=ready)
+        except Exception:
+            self._speculate_cards()
+            raise
+        a1, a2 = answers
         self.detective_asked += 1
+        if used_card:
+            self.detective_cards[used_card] = 0
 
-        p1 = build_suspect_prompt(
-            self.lang, self.role1, self.case, self.detective_history, question, "suspect1"
-        )
-        p2 = build_suspect_prompt(
-            self.lang, self.role2, self.case, self.detective_history, question, "suspect2"
-        )
-        a1 = ask_agent("gemma3:latest", p1, self.opts)
-        a2 = ask_agent("gemma3:latest", p2, self.opts)
-
-        self.detective_history += f"\nQ: {question}\nS1: {a1}\nS2: {a2}"
+        self.detective_history.add("detective", question)
+        self.detective_history.add("suspect1", a1)
+        self.detective_history.add("suspect2", a2)
+        self.analysis.add(f"Q: {question}\nS1: {a1}\nS2: {a2}")
+        self.contradictions.add(question, {"suspect1": a1, "suspect2": a2})
 
-        base = f"👤 Suspect 1: {a1}\n👤 Suspect 2: {a2}\n"
+        base = "" if streaming else f"👤 Suspect 1: {a1}\n👤 Suspect 2: {a2}\n"
         suffix = ""
 
         if self.detective_asked >= 3:
-            ap = detective_analysis_prompt(self.lang, self.detective_history)
-            analysis = ask_agent_json("gemma3:latest", ap)
-
-            if analysis:
+            local = self._local_analysis()
+            if streaming:
+                # L'analyse est calculée en arrière-plan et arrive plus tard en
+                # événement "analysis" ; la réponse des suspects part tout de suite.
+                on_event = self._on_event
+                if local is not None:
+                    self._emit_analysis(local, on_event)
+                else:
+                    self.analysis.refresh(lambda data: self._emit_analysis(data, on_event))
+                suffix += f"\n{self._accuse_hint()}"
+            else:
                 try:
-                    s1 = analysis["suspect1"]["score"]
-                    s2 = analysis["suspect2"]["score"]
-                    suggestion = "suspect1" if s1 >= s2 else "suspect2"
-                    if self.lang == "fr":
-                        suffix += f"\n📊 Analyse IA → S1:{s1} / S2:{s2} | Suggestion: {suggestion}\n"
-                        suffix += "👉 Pour accuser, écris: accuse suspect1 ou accuse suspect2. Sinon pose une autre question."
-                    else:
-                        suffix += f"\n📊 AI analysis → S1:{s1} / S2:{s2} | Suggestion: {suggestion}\n"
-                        suffix += "👉 To accuse, type: accuse suspect1 or accuse suspect2. Otherwise, ask another question."
-                except Exception:
+                    analysis = local or self.analysis.wait(self.analysis.refresh())
+                except Cancelled:
+                    analysis = None  # arrêté pendant l'analyse : les réponses restent acquises
+                line = self._analysis_line(analysis)
+                if line:
+                    suffix += f"\n{line}\n{self._accuse_hint()}"
+                elif analysis:
                     suffix += "\n👉 " + (
                         "Tu peux accuser ou poser une autre question."
                         if self.lang == "fr"
                         else "You can accuse or ask another question."
                     )
-            else:
-                suffix += "\n👉 " + (
-                    "Tu peux accuser: 'accuse suspect1' ou 'accuse suspect2'."
-                    if self.lang == "fr"
-                    else "You can accuse: 'accuse suspect1' or 'accuse suspect2'."
-                )
+                else:
+                    suffix += "\n👉 " + (
+                        "Tu peux accuser: 'accuse suspect1' ou 'accuse suspect2'."
+                        if self.lang == "fr"
+                        else "You can accuse: 'accuse suspect1' or 'accuse suspect2'."
+                    )
         else:
             suffix += "\n👉 " + (
                 "Pose une autre question." if self.lang == "fr" else "Ask another question."
@@ -260,13 +435,67 @@ class GameManager:
                 if self.lang == "fr"
                 else "10 questions reached. You must accuse now!"
             )
+        # Sessions avancées d'un tour : nouvelles réponses pour les cartes restantes
+        self._speculate_cards()
 
         cmd = lower.strip()
         if cmd.startswith("accuse"):
             parts = cmd.split()
             if len(parts) == 2 and parts[1] in ["suspect1", "suspect2"]:
                 return self._finalize_detective_verdict(parts[1])
-        return base + suffix
+        return base + suffix if base else suffix.lstrip("\n")
+
+    def _speculate_cards(self):
+        """Prépare en fond les réponses aux cartes piege/preuve encore en main."""
+        if not self.speculate_cards or self.state != "detective_wait_question":
+            self.speculator.cancel()
+            return
+        self.speculator.start(
+            self.suspect_sessions,
+            {
+                card: card_message(self.lang, card, self.case)
+                for card in SPECULATIVE_CARDS
+                if self.detective_cards.get(card, 0) > 0
+            },
+        )
+
+    def _local_analysis(self):
+        """
+        Analyse locale si elle départage assez nettement les suspects, sinon None
+        (l'appelant demande alors l'analyse au modèle).
+        """
+        if self.local_analysis and self.contradictions.confidence() >= 1.0:
+            self.analysis.cancel()  # une analyse LLM encore en route serait plus ancienne
+            self.analysis_sources["local"] += 1
+            return self.contradictions.analysis()
+        self.analysis_sources["llm"] += 1
+        return None
+
+    def _analysis_line(self, analysis):
+        try:
+            s1 = analysis["suspect1"]["score"]
+            s2 = analysis["suspect2"]["score"]
+        except Exception:
+            return None
+        suggestion = "suspect1" if s1 >= s2 else "suspect2"
+        local = analysis.get("source") == "local"
+        if self.lang == "fr":
+            label = "Analyse locale" if local else "Analyse IA"
+            return f"📊 {label} → S1:{s1} / S2:{s2} | Suggestion: {suggestion}"
+        label = "Local analysis" if local else "AI analysis"
+        return f"📊 {label} → S1:{s1} / S2:{s2} | Suggestion: {suggestion}"
+
+    def _accuse_hint(self):
+        return (
+            "👉 Pour accuser, écris: accuse suspect1 ou accuse suspect2. Sinon pose une autre question."
+            if self.lang == "fr"
+            else "👉 To accuse, type: accuse suspect1 or accuse suspect2. Otherwise, ask another question."
+        )
+
+    def _emit_analysis(self, analysis, on_event):
+        line = self._analysis_line(analysis)
+        if line:
+            on_event("analysis", line)
 
     def _handle_detective_force_accuse(self, txt: str) -> str:
         cmd = (txt or "").strip().lower()
@@ -281,6 +510,7 @@ class GameManager:
         )
 
     def _finalize_detective_verdict(self, guess: str) -> str:
+        self.speculator.cancel()
         good = guess == self.criminal
         msg = (
             "✅ Bravo ! Tu as trouvé le coupable !"
@@ -300,12 +530,17 @@ class GameManager:
             "context": self.context,
             "case": self.case,
             "questions": self.detective_asked,
-            "history": self.detective_history,
+            "cards_used": sorted(c for c, left in self.detective_cards.items() if left == 0),
+            "history": self.detective_history.render(),
+            "turns": self.detective_history.turns,
             "culprit": self.criminal,
             "player_guess": guess,
             "success": good,
+            "llm_metrics": self.metrics.game_summary(),
+            "speculation": self.speculator.stats(),
+            "analysis_sources": dict(self.analysis_sources),
         }
-        save_game_log(payload)
+        self._save_result(payload)
 
         self.state = "ask_lang"
         tail = "\n\n" + (
@@ -319,19 +554,29 @@ class GameManager:
     def _handle_suspect_choose_alignment(self, txt: str) -> str:
         t = (txt or "").strip().lower()
         self.suspect_is_criminal = ("coup" in t) or ("guilt" in t)
-        self.suspect_history = self.context
+        self.suspect_history.reset(self.lang, preamble=self.context)
         self.suspect_asked = 0
+        self.detective_session.reset()
+        self.analysis.reset(self.lang)
+        self.analysis.history = self.suspect_history
+        self.analysis.add(self.context)
 
         q_prompt = (
             "Pose une question au suspect."
             if self.lang == "fr"
             else "Ask a question to the suspect."
         )
-        q = ask_agent("gemma3:latest", f"{self.context}\nDetective: {q_prompt}", self.opts)
+        q = self._ask_detective(f"Detective: {q_prompt}")
         self.suspect_asked += 1
-        self.suspect_history += f"\nQ: {q}"
+        self.suspect_history.add("detective", q)
+        self.suspect_last_question = q
 
         self.state = "suspect_wait_player_answer"
+        return self._detective_question_reply(q)
+
+    def _detective_question_reply(self, q):
+        if self._on_event is not None:
+            return "👉 Ta réponse :" if self.lang == "fr" else "👉 Your answer:"
         return (
             f"🕵️ Détective: {q}\n👉 Ta réponse :"
             if self.lang == "fr"
@@ -346,11 +591,26 @@ class GameManager:
                 if self.lang == "fr"
                 else "✍️ Type your answer."
             )
-        self.suspect_history += f"\nSuspect: {answer}"
-
+        # La réponse est enregistrée avant l'appel (le reseed du détective la lit dans
+        # l'historique) ; si le tour est annulé, tout revient en arrière pour qu'elle
+        # ne compte pas deux fois quand le joueur la renvoie.
+        turn = self.suspect_history.add("suspect", answer)
+        exchange = f"Q: {self.suspect_last_question}\nSuspect: {answer}"
+        self.analysis.add(exchange)
+        snap = self.detective_session.snapshot()
+        try:
+            return self._after_player_answer(answer)
+        except Cancelled:
+            self.detective_session.restore(snap)
+            self.analysis.discard(exchange)
+            self.suspect_history.discard(turn)
+            raise
+
+    def _after_player_answer(self, answer):
         if self.suspect_asked >= 3 or self.suspect_asked >= 10:
-            dp = detective_analysis_prompt(self.lang, self.suspect_history)
-            analysis = ask_agent_json("gemma3:latest", dp)
+            # Seul le dernier échange reste à analyser : les précédents l'ont été
+            # en arrière-plan pendant que le joueur écrivait.
+            analysis = self.analysis.wait(self.analysis.refresh())
             verdict = "guilty"
             if analysis:
                 try:
@@ -376,13 +636,15 @@ class GameManager:
                 "difficulty": self.difficulty,
                 "context": self.context,
                 "case": self.case,
-                "history": self.suspect_history,
+                "history": self.suspect_history.render(),
+                "turns": self.suspect_history.turns,
                 "is_criminal": self.suspect_is_criminal,
                 "suspect_questions": self.suspect_asked,
                 "ai_verdict": verdict,
                 "ai_correct": good,
+                "llm_metrics": self.metrics.game_summary(),
             }
-            save_game_log(payload)
+            self._save_result(payload)
 
             self.state = "ask_lang"
             return head + tail + restart
@@ -392,15 +654,9 @@ class GameManager:
             if self.lang == "fr"
             else "Ask another question to the suspect."
         )
-        q = ask_agent(
-            "gemma3:latest",
-            f"{self.context}\nDialogue:\n{self.suspect_history}\nDetective: {q_prompt}",
-            self.opts,
-        )
+        self.analysis.refresh()
+        q = self._ask_detective(f"Suspect: {answer}\nDetective: {q_prompt}")
         self.suspect_asked += 1
-        self.suspect_history += f"\nQ: {q}"
-        return (
-            f"🕵️ Détective: {q}\n👉 Ta réponse :"
-            if self.lang == "fr"
-            else f"🕵️ Detective: {q}\n👉 Your answer:"
-        )
+        self.suspect_history.add("detective", q)
+        self.suspect_last_question = q
+        return self._detective_question_reply(q)
@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import cancel
+from .ai_agent import ask_agent
+from .config import load_config
+
+# Étiquettes des répliques dans les prompts et le journal (format historique "Q: ...\nS1: ...")
+LABELS = {"detective": "Q", "suspect1": "S1", "suspect2": "S2", "suspect": "Suspect"}
+# Résumé factuel, court et stable (peu de variété → mis en cache)
+SUMMARY_OPTIONS = {"temperature": 0.2, "num_predict": 160}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Un seul résumé à la fois suffit : ils sont rares (tous les quelques tours)
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary")
+        return _executor
+
+
+def estimate_tokens(text):
+    """Estimation grossière (≈ 4 caractères par jeton), suffisante pour tenir un budget."""
+    return len(text) // 4 + 1
+
+
+def summary_prompt(lang, previous, dialogue):
+    if lang == "fr":
+        return (
+            "Résume cet interrogatoire en quelques phrases factuelles : alibis, horaires, "
+            "lieux, contradictions. Garde ce qui compte pour trouver le coupable.\n"
+            + (f"Résumé précédent:\n{previous}\n" if previous else "")
+            + f"Nouveaux échanges:\n{dialogue}\nRésumé:"
+        )
+    return (
+        "Summarize this interrogation in a few factual sentences: alibis, times, places, "
+        "contradictions. Keep what matters to find the culprit.\n"
+        + (f"Previous summary:\n{previous}\n" if previous else "")
+        + f"New exchanges:\n{dialogue}\nSummary:"
+    )
+
+
+def as_prompt_text(history):
+    """Texte à coller dans un prompt : historique borné si History, la chaîne telle quelle sinon."""
+    return history.for_prompt() if isinstance(history, History) else history
+
+
+class History:
+    """
+    Historique d'une partie sous forme de répliques {speaker, text, tokens}.
+
+    for_prompt() garde les keep_last dernières répliques mot pour mot et remplace les
+    plus anciennes par un résumé glissant, calculé en arrière-plan (et mis en cache
+    comme tout appel LLM). Le texte produit tient toujours dans `budget` jetons :
+    la taille des prompts ne grandit plus avec la partie.
+    """
+
+    def __init__(self, model=None, lang="en", preamble="", keep_last=None, budget=None):
+        cfg = load_config()
+        self.model = model  # None : pas de résumé, les anciennes répliques sont seulement coupées
+        self.lang = lang
+        self.preamble = preamble
+        self.keep_last = keep_last or cfg["history_keep_turns"]
+        self.budget = budget or cfg["history_budget_tokens"]
+        self.turns = []
+        self.summary = ""
+        self.summaries = 0
+        self._folded = 0  # nombre de répliques déjà intégrées au résumé
+        self._running = False
+        self._generation = 0
+        self._token = cancel.CancelToken()  # coupe le résumé en cours (reset, cancel)
+        self._lock = threading.Lock()
+
+    def reset(self, lang=None, preamble=""):
+        with self._lock:
+            if lang is not None:
+                self.lang = lang
+            self.preamble = preamble
+            self.turns = []
+            self.summary = ""
+            self._folded = 0
+            self._supersede()
+
+    def cancel(self):
+        """Abandonne le résumé en cours sans toucher aux répliques."""
+        with self._lock:
+            self._supersede()
+
+    def _supersede(self):
+        # appelé sous self._lock
+        self._running = False
+        self._generation += 1
+        self._token.cancel()
+        self._token = cancel.CancelToken()
+
+    def add(self, speaker, text):
+        turn = {"speaker": speaker, "text": text, "tokens": estimate_tokens(text)}
+        with self._lock:
+            self.turns.append(turn)
+        self._maybe_summarize()
+        return turn
+
+    def discard(self, turn):
+        """Retire la dernière réplique si c'est `turn` (tour annulé, qui sera rejoué)."""
+        with self._lock:
+            # jamais résumée : le résumé s'arrête keep_last répliques avant la fin
+            if self.turns and self.turns[-1] is turn and len(self.turns) > self._folded:
+                self.turns.pop()
+
+    def __len__(self):
+        return len(self.turns)
+
+    @staticmethod
+    def _line(turn):
+        return f"{LABELS.get(turn['speaker'], turn['speaker'])}: {turn['text']}"
+
+    def render(self):
+        """Historique complet, au format des anciens journaux (préambule puis une ligne par réplique)."""
+        with self._lock:
+            turns = list(self.turns)
+        return self.preamble + "".join("\n" + self._line(t) for t in turns)
+
+    def for_prompt(self):
+        """Préambule + résumé + dernières répliques, dans la limite de self.budget jetons."""
+        with self._lock:
+            turns = list(self.turns)
+            summary = self.summary
+            folded = self._folded
+        recent_from = max(folded, len(turns) - self.keep_last)
+        head = [self.preamble] if self.preamble else []
+        used = sum(estimate_tokens(h) for h in head)
+
+        # Les répliques récentes d'abord (les plus proches de la question en cours)
+        recent = []
+        for t in reversed(turns[recent_from:]):
+            if used + t["tokens"] > self.budget and len(recent) >= 2:
+                break
+            recent.append(self._line(t))
+            used += t["tokens"]
+        recent.reverse()
+        dropped = len(turns) - recent_from - len(recent)
+
+        # Répliques anciennes pas encore résumées : on en garde ce qui tient encore
+        pending = []
+        for t in reversed(turns[folded:recent_from]):
+            if used + t["tokens"] > self.budget:
+                dropped += 1
+                continue
+            pending.append(self._line(t))
+            used += t["tokens"]
+        pending.reverse()
+
+        if summary:
+            room = max(0, self.budget - used) * 4
+            label = "Résumé" if self.lang == "fr" else "Summary"
+            head.append(f"{label}: {summary[:room]}")
+        if dropped:
+            head.append("…")
+        return "\n".join(head + pending + recent)
+
+    def prompt_tokens(self):
+        return estimate_tokens(self.for_prompt())
+
+    # -----------------------
+    # Résumé glissant
+    # -----------------------
+
+    def _maybe_summarize(self):
+        if self.model is None:
+            return
+        with self._lock:
+            cutoff = len(self.turns) - self.keep_last
+            # on attend d'avoir quelques répliques à replier : un appel pour plusieurs tours
+            if self._running or cutoff - self._folded < max(1, self.keep_last // 2):
+                return
+            self._running = True
+            job = (
+                self._generation,
+                self._token,
+                self.lang,
+                self.summary,
+                "\n".join(self._line(t) for t in self.turns[self._folded:cutoff]),
+                cutoff,
+            )
+        _get_executor().submit(self._summarize, job)
+
+    def _summarize(self, job):
+        gen, token, lang, previous, dialogue, upto = job
+        try:
+            with cancel.scope(token):
+                text = ask_agent(self.model, summary_prompt(lang, previous, dialogue), SUMMARY_OPTIONS)
+        except cancel.Cancelled:
+            return
+        except Exception as e:
+            print("Erreur résumé:", e)
+            text = None
+        with self._lock:
+            if gen != self._generation:
+                return
+            self._running = False
+            if text:
+                self.summary = text
+                self._folded = upto
+                self.summaries += 1
+        if text:
+            self._maybe_summarize()  # des répliques ont pu s'accumuler entre-temps
@@ -0,0 +1,70 @@
+import json
+
+
+class TopLevelObjectScanner:
+    """
+    Lit un objet JSON qui arrive par morceaux (génération streamée) et signale chaque
+    valeur objet de premier niveau dès que son accolade fermante arrive :
+    pour '{"suspect1": {...}, "suspect2": {...}, ...}', on_value("suspect1", {...})
+    est appelé sans attendre la fin de la réponse.
+    """
+
+    def __init__(self, on_value):
+        self.on_value = on_value
+        self._parts = []  # morceaux reçus : recollés seulement à la demande (text)
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._str = None  # morceaux de la chaîne de premier niveau en cours (clé possible)
+        self._last_str = None
+        self._key = None
+        self._value = None  # morceaux de l'objet de premier niveau en cours
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def feed(self, chunk):
+        # Chaque caractère n'est lu qu'une fois : seuls la clé et l'objet en cours sont
+        # gardés à part, jamais tout le texte déjà reçu (coût linéaire sur la réponse)
+        self._parts.append(chunk)
+        str_from = value_from = 0  # début, dans ce morceau, des parties à recopier
+        for pos, ch in enumerate(chunk):
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._str is not None:
+                        self._str.append(chunk[str_from:pos + 1])
+                        self._last_str = "".join(self._str)
+                        self._str = None
+                continue
+            if ch == '"':
+                self._in_str = True
+                if self._depth == 1:
+                    self._str, str_from = [], pos
+            elif ch == ":" and self._depth == 1 and self._last_str is not None:
+                self._key = json.loads(self._last_str)
+                self._last_str = None
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2 and ch == "{":
+                    self._value, value_from = [], pos
+            elif ch in "}]":
+                if self._depth == 2 and ch == "}" and self._value is not None:
+                    self._value.append(chunk[value_from:pos + 1])
+                    try:
+                        value = json.loads("".join(self._value))
+                    except ValueError:
+                        value = None
+                    if value is not None and self._key is not None:
+                        self.on_value(self._key, value)
+                    self._value = None
+                self._depth -= 1
+        if self._str is not None:
+            self._str.append(chunk[str_from:])
+        if self._value is not None:
+            self._value.append(chunk[value_from:])
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def cache_key(model, prompt, options=None, **extra):
+    """Clé stable (sha256) à partir du modèle, du prompt et des options de génération."""
+    raw = json.dumps(
+        {"model": model, "prompt": prompt, "options": options or {}, **extra},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache des réponses LLM : LRU borné en mémoire, plus un niveau SQLite optionnel
+    (data/llm_cache.sqlite) qui survit entre deux lancements.
+    Les appels à température élevée ne sont pas mis en cache (voir cacheable()).
+    """
+
+    def __init__(self, max_entries=256, path=None, max_temperature=0.8):
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def cacheable(self, options=None):
+        """Politique : au-delà de max_temperature, la variété compte plus que la vitesse."""
+        temp = (options or {}).get("temperature")
+        if temp is None or self.max_temperature is None:
+            return True
+        return temp <= self.max_temperature
+
+    def skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return self._mem[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False)),
+                )
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": len(self._mem),
+            }
@@ -0,0 +1,233 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import uuid
+from datetime import datetime
+
+SEGMENT_RE = re.compile(r"games-(\d{6})\.jsonl$")
+
+
+def new_game_id():
+    """Identifiant unique même pour deux parties finies dans la même seconde."""
+    return f"{datetime.now():%Y%m%d_%H%M%S}-{uuid.uuid4().hex[:10]}"
+
+
+class LogStore:
+    """
+    Journal des parties en ajout seul : segments JSONL compacts (logs/games-000001.jsonl...)
+    avec rotation par taille. append() ne touche jamais au disque : un thread d'écriture
+    regroupe les parties en attente et les écrit en une fois (un seul fsync par lot).
+    Tout ce qui est en attente est écrit à la sortie du programme.
+    """
+
+    def __init__(self, folder="logs", segment_max_bytes=4 * 1024 * 1024, batch_max=256):
+        self.folder = folder
+        self.segment_max_bytes = segment_max_bytes
+        self.batch_max = batch_max
+        self.written = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # -----------------------
+    # Écriture
+    # -----------------------
+
+    def append(self, payload):
+        """Met la partie en file d'écriture et renvoie son identifiant (non bloquant)."""
+        record = dict(payload)
+        record.setdefault("id", new_game_id())
+        with self._lock:
+            # sous le verrou : jamais derrière le None d'un close() concurrent
+            self._ensure_writer()
+            self._queue.put(record)
+        return record["id"]
+
+    def flush(self):
+        """Attend que tout ce qui a été ajouté soit sur disque (sans effet après close())."""
+        done = threading.Event()
+        with self._lock:
+            # sous le verrou : l'événement passe forcément avant le None de close()
+            if self._thread is None or self._closed:
+                return
+            self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """
+        Écrit ce qui est en attente et arrête le thread d'écriture ; peut être rappelé.
+        Un append() après close() relance un thread d'écriture.
+        """
+        with self._lock:
+            if self._closed or self._thread is None:
+                self._closed = True
+                return
+            self._closed = True
+            self._queue.put(None)
+            thread = self._thread  # un append() peut en relancer un autre entre-temps
+        thread.join()
+
+    def _ensure_writer(self):
+        # appelé sous self._lock
+        if self._thread is not None and not self._closed:
+            return
+        if self._thread is None:
+            atexit.register(self.close)
+        else:
+            # fermé : l'ancien thread finit sa file (il ne prend jamais le verrou)
+            # avant que le nouveau écrive dans les mêmes segments
+            self._thread.join()
+        self._closed = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._writer, args=(self._queue,), name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _writer(self, q):
+        os.makedirs(self.folder, exist_ok=True)
+        stop = False
+        while not stop:
+            batch, waiters = [], []
+            item = q.get()
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_max:
+                    break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:  # le thread doit survivre, sinon tout le reste est perdu
+                    print("Erreur log:", e)
+            for w in waiters:
+                w.set()
+
+    def _write_batch(self, batch):
+        lines = []
+        for r in batch:
+            try:
+                lines.append(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n")
+            except (TypeError, ValueError) as e:
+                print(f"Erreur log (partie {r.get('id')} ignorée):", e)
+        if not lines:
+            return
+        data = "".join(lines).encode("utf-8")
+        path = self._current_segment(len(data))
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.written += len(lines)
+        self.batches += 1
+
+    def _current_segment(self, incoming):
+        segments = self.segments()
+        if not segments:
+            return self._segment_path(1)
+        last = segments[-1]
+        if os.path.getsize(last) + incoming > self.segment_max_bytes and os.path.getsize(last) > 0:
+            return self._segment_path(int(SEGMENT_RE.search(last).group(1)) + 1)
+        return last
+
+    def _segment_path(self, n):
+        return os.path.join(self.folder, f"games-{n:06d}.jsonl")
+
+    # -----------------------
+    # Lecture
+    # -----------------------
+
+    def segments(self):
+        return sorted(p for p in glob.glob(os.path.join(self.folder, "games-*.jsonl")) if SEGMENT_RE.search(p))
+
+    def iter_records(self, start=None):
+        """
+        Parcourt les parties dans l'ordre d'écriture : (segment, début, fin, record).
+        start=(segment, offset) reprend là où un parcours précédent s'est arrêté.
+        """
+        for path in self.segments():
+            if start is not None and path < start[0]:
+                continue
+            offset = start[1] if start is not None and path == start[0] else 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # ligne en cours d'écriture
+                    begin, offset = offset, offset + len(line)
+                    try:
+                        yield path, begin, offset, json.loads(line)
+                    except ValueError:
+                        continue
+
+    def read_at(self, segment, offset):
+        """Relit une partie à partir de sa position (voir les index de core/analytics.py)."""
+        with open(os.path.join(self.folder, os.path.basename(segment)), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    # -----------------------
+    # Migration
+    # -----------------------
+
+    def import_legacy(self, pattern="game_*.json"):
+        """
+        Importe les anciens fichiers logs/game_<date>.json (un fichier par partie).
+        L'identifiant vient du nom de fichier : relancer l'import n'ajoute pas de doublons.
+        """
+        known = {r.get("id") for _, _, _, r in self.iter_records()}
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(self.folder, pattern))):
+            gid = os.path.splitext(os.path.basename(path))[0].replace("game_", "") + "-legacy"
+            if gid in known:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Erreur import {path}:", e)
+                continue
+            payload["id"] = gid
+            self.append(payload)
+            imported += 1
+        self.flush()
+        return imported
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(folder="logs"):
+    with _stores_lock:
+        if folder not in _stores:
+            _stores[folder] = LogStore(folder)
+        return _stores[folder]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Journal des parties")
+    ap.add_argument("--folder", default="logs")
+    ap.add_argument("--import-legacy", action="store_true", help="importer les anciens logs/game_*.json")
+    args = ap.parse_args()
+    store = get_store(args.folder)
+    if args.import_legacy:
+        print(f"{store.import_legacy()} partie(s) importée(s)")
+    total = sum(1 for _ in store.iter_records())
+    print(f"{total} partie(s) dans {len(store.segments())} segment(s)")
@@ -1,10 +1,12 @@
-import os, json
-from datetime import datetime
+from .config import load_config
+from .log_store import get_store
+
 
 def save_game_log(payload, folder="logs"):
-    os.makedirs(folder, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(folder, f"game_{ts}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
-    return path
+    """
+    Ajoute la partie au journal (core/log_store.py). Ne bloque pas : l'écriture se fait
+    en arrière-plan, par lots. Renvoie l'identifiant de la partie.
+    """
+    if not load_config()["enable_logging"]:
+        return None
+    return get_store(folder).append(payload)
@@ -0,0 +1,88 @@
+import threading
+
+# Compteurs renvoyés par Ollama à la fin de chaque génération (durées en nanosecondes)
+COUNTERS = ("prompt_eval_count", "eval_count", "prompt_eval_duration", "eval_duration", "load_duration")
+
+
+def call_stats(res, wall_s, cached=False):
+    """Compteurs d'un appel (dernier morceau de la réponse d'Ollama) + durée côté client."""
+    stats = {k: int(res.get(k) or 0) for k in COUNTERS}
+    stats["wall_s"] = wall_s
+    stats["cached"] = cached
+    return stats
+
+
+def aggregate(calls):
+    """Totaux d'une liste d'appels : jetons, durées, débit de génération."""
+    eval_tokens = sum(c["eval_count"] for c in calls)
+    eval_s = sum(c["eval_duration"] for c in calls) / 1e9
+    wall_s = sum(c["wall_s"] for c in calls)
+    if eval_s:
+        rate = eval_tokens / eval_s
+    else:
+        # backend sans durées (stub) : débit vu du client
+        rate = eval_tokens / wall_s if wall_s else 0.0
+    return {
+        "calls": len(calls),
+        "cached": sum(1 for c in calls if c["cached"]),
+        "prompt_tokens": sum(c["prompt_eval_count"] for c in calls),
+        "max_prompt_tokens": max((c["prompt_eval_count"] for c in calls), default=0),
+        "eval_tokens": eval_tokens,
+        "wall_s": round(wall_s, 4),
+        "prompt_eval_s": round(sum(c["prompt_eval_duration"] for c in calls) / 1e9, 4),
+        "eval_s": round(eval_s, 4),
+        "load_s": round(sum(c["load_duration"] for c in calls) / 1e9, 4),
+        "tokens_per_s": round(rate, 1),
+    }
+
+
+class CallMetrics:
+    """
+    Appels LLM d'une partie, étiquetés par site d'appel (suspect1, suspect2, analysis,
+    detective_question) et rangés par tour. Une analyse terminée en arrière-plan compte
+    dans le tour en cours au moment où elle finit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+        self.turn = 0
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+            self.turn = 0
+
+    def next_turn(self):
+        with self._lock:
+            self.turn += 1
+
+    def sink(self, label):
+        """Callback on_stats(stats) à passer aux appels LLM d'un site donné."""
+        return lambda stats: self.record(label, stats)
+
+    def record(self, label, stats):
+        with self._lock:
+            self.calls.append(dict(stats, label=label, turn=self.turn))
+
+    def turn_summary(self, turn=None):
+        """Totaux d'un tour (par défaut le dernier tour qui a appelé le modèle)."""
+        with self._lock:
+            calls = list(self.calls)
+        if turn is None:
+            if not calls:
+                return None
+            turn = calls[-1]["turn"]
+        return dict(aggregate([c for c in calls if c["turn"] == turn]), turn=turn)
+
+    def game_summary(self):
+        """Totaux de la partie, par site d'appel et par tour (ajoutés au journal)."""
+        with self._lock:
+            calls = list(self.calls)
+        labels = sorted({c["label"] for c in calls})
+        turns = sorted({c["turn"] for c in calls})
+        return {
+            "total": aggregate(calls),
+            "by_label": {lb: aggregate([c for c in calls if c["label"] == lb]) for lb in labels},
+            "turns": [dict(aggregate([c for c in calls if c["turn"] == t]), turn=t) for t in turns],
+        }
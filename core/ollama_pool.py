@@ -0,0 +1,226 @@
+"""
+Client HTTP des serveurs Ollama. Importé seulement quand le backend "ollama" est
+créé (core/backends.py) : le reste de core ne dépend d'aucun client réseau.
+"""
+import http.client
+import itertools
+import json
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+from .backends import BackendError
+from .cancel import Cancelled
+
+
+class _Host:
+    def __init__(self, url, max_idle, timeout):
+        u = urlparse(url if "://" in url else f"http://{url}")
+        self.url = url
+        self.https = u.scheme == "https"
+        self.hostname = u.hostname or "127.0.0.1"
+        self.port = u.port or (443 if self.https else 11434)
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.idle = []
+        self.outstanding = 0
+        self.healthy = True
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def connect(self, timeout=None):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.hostname, self.port, timeout=timeout or self.timeout)
+
+    def acquire(self):
+        with self.lock:
+            self.outstanding += 1
+            if self.idle:
+                return self.idle.pop(), True
+        return self.connect(), False
+
+    def release(self, conn, reusable):
+        with self.lock:
+            self.outstanding -= 1
+            if reusable and len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+
+def _abort(sock):
+    """Coupe la connexion depuis un autre thread : la lecture en cours échoue aussitôt."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _no_detach():
+    pass
+
+
+class OllamaPoolBackend:
+    """
+    Client HTTP Ollama (API REST) réparti sur plusieurs hôtes.
+    Connexions persistantes par hôte, choix de l'hôte le moins chargé (requêtes en cours),
+    vérification périodique de santé (/api/tags) et bascule sur un autre hôte si la
+    connexion échoue avant le début de la réponse.
+    """
+
+    def __init__(self, hosts, connections_per_host=4, timeout=120, health_interval=15):
+        if not hosts:
+            raise BackendError("no Ollama host configured")
+        self.hosts = [_Host(h, connections_per_host, timeout) for h in hosts]
+        self.health_interval = health_interval
+        self._rr = itertools.count()
+        self._health_thread = None
+
+    # --- choix de l'hôte ---
+
+    def _ordered_hosts(self):
+        self._start_health_checks()
+        tie = next(self._rr)
+        n = len(self.hosts)
+        ranked = sorted(
+            range(n), key=lambda i: (not self.hosts[i].healthy, self.hosts[i].outstanding, (i - tie) % n)
+        )
+        return [self.hosts[i] for i in ranked]
+
+    def _mark(self, host, ok):
+        with host.lock:
+            if ok:
+                host.failures = 0
+                host.healthy = True
+            else:
+                host.failures += 1
+                host.healthy = False
+
+    # --- requêtes ---
+
+    def _open(self, path, body, cancel=None):
+        """
+        Envoie la requête sur le premier hôte qui répond ; renvoie (hôte, connexion,
+        réponse, detach). Tant que detach() n'est pas appelée, annuler `cancel` coupe
+        la connexion.
+        """
+        payload = json.dumps(body).encode("utf-8")
+        last_error = None
+        for host in self._ordered_hosts():
+            # une connexion gardée ouverte a pu être fermée par le serveur : un
+            # second essai avec une connexion neuve avant de changer d'hôte
+            for _ in range(2):
+                if cancel is not None:
+                    cancel.check()
+                conn, reused = host.acquire()
+                detach = _no_detach
+                try:
+                    if cancel is not None:
+                        # socket gardée à part : http.client la détache de conn quand la
+                        # réponse se termine par la fermeture de la connexion
+                        if conn.sock is None:
+                            conn.connect()
+                        detach = cancel.on_cancel(lambda sock=conn.sock: _abort(sock))
+                    conn.request("POST", path, payload, {"Content-Type": "application/json"})
+                    resp = conn.getresponse()
+                except (OSError, http.client.HTTPException) as e:
+                    detach()
+                    host.release(conn, False)
+                    if cancel is not None:
+                        cancel.check()
+                    last_error = e
+                    if reused:
+                        continue
+                    self._mark(host, False)
+                    break
+                if resp.status != 200:
+                    detach()
+                    detail = resp.read().decode("utf-8", "replace")
+                    host.release(conn, True)
+                    raise BackendError(f"{host.url}: HTTP {resp.status} {detail}")
+                self._mark(host, True)
+                return host, conn, resp, detach
+        raise BackendError(f"no Ollama host reachable ({last_error})")
+
+    def generate(self, model, prompt, options=None, context=None, format=None,
+                 keep_alive=None, stream=False, cancel=None):
+        body = {"model": model, "prompt": prompt, "stream": stream, "options": options or {}}
+        if context:
+            body["context"] = context
+        if format:
+            body["format"] = format
+        if keep_alive is not None:
+            body["keep_alive"] = keep_alive
+        host, conn, resp, detach = self._open("/api/generate", body, cancel)
+        if not stream:
+            try:
+                data = json.loads(resp.read())
+                if cancel is not None:
+                    cancel.check()
+            except (OSError, ValueError, http.client.HTTPException, Cancelled) as e:
+                detach()
+                host.release(conn, False)
+                if cancel is not None:
+                    cancel.check()
+                raise BackendError(str(e))
+            detach()
+            host.release(conn, True)
+            return data
+        return self._stream(host, conn, resp, cancel, detach)
+
+    def _stream(self, host, conn, resp, cancel=None, detach=_no_detach):
+        complete = False
+        try:
+            for line in resp:
+                line = line.strip()
+                if line:
+                    part = json.loads(line)
+                    if "error" in part:
+                        raise BackendError(part["error"])
+                    yield part
+            if cancel is not None:
+                cancel.check()  # connexion coupée par l'annulation : fin de flux trompeuse
+            complete = True
+        except (OSError, ValueError, http.client.HTTPException):
+            if cancel is not None:
+                cancel.check()
+            raise
+        finally:
+            # Flux abandonné en cours de route (GeneratorExit, annulation) : on ferme la
+            # connexion, ce qui interrompt aussi la génération côté Ollama.
+            detach()
+            host.release(conn, complete)
+
+    # --- santé ---
+
+    def _start_health_checks(self):
+        if self._health_thread is not None or not self.health_interval:
+            return
+        self._health_thread = threading.Thread(
+            target=self._health_loop, name="ollama-health", daemon=True
+        )
+        self._health_thread.start()
+
+    def check_health(self):
+        for host in self.hosts:
+            conn = host.connect(timeout=min(5, host.timeout))
+            try:
+                conn.request("GET", "/api/tags")
+                ok = conn.getresponse().status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+            finally:
+                conn.close()
+            self._mark(host, ok)
+
+    def _health_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.check_health()
+
+    def health(self):
+        return [
+            {"host": h.url, "healthy": h.healthy, "outstanding": h.outstanding, "failures": h.failures}
+            for h in self.hosts
+        ]
@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import cancel, tracing
+from .ai_agent import optional, wait_idle
+from .cards_manager import use_card_prompt
+
+# Cartes dont la question ne dépend que des indices de l'affaire (pas de la saisie)
+SPECULATIVE_CARDS = ("piege", "preuve")
+# Un worker par suspect : les deux réponses à une carte sont calculées ensemble
+WORKERS = 2
+
+
+def card_message(lang, card, case):
+    """Message envoyé aux sessions des suspects quand la carte est jouée."""
+    return f"Detective: {use_card_prompt(lang, card, '', case)}"
+
+
+class CardSpeculator:
+    """
+    Réponses des suspects aux cartes piege/preuve, générées en arrière-plan dès que
+    la partie commence (et après chaque question, pour les cartes encore en main).
+
+    Chaque réponse est calculée sur une copie de la session (ChatSession.fork) prise à
+    un instant donné. Elle n'est servie que si la session n'a pas bougé depuis : même
+    contexte, même nombre de tours. Sinon elle est jetée et le tour génère normalement.
+
+    C'est du travail facultatif : une génération ne démarre que lorsque le backend n'a
+    plus d'appel en cours (ai_agent.wait_idle), sur l'exécuteur de la partie (une
+    partie n'attend jamais derrière celle d'un autre joueur). Quand la carte est
+    jouée, seules les réponses déjà en cours sont attendues ; les autres sont
+    annulées et le tour interroge ces suspects lui-même, en parallèle de cette
+    attente. Un nouveau lot annule le précédent (core/cancel.py).
+    """
+
+    def __init__(self, on_stats=None):
+        self.on_stats = on_stats  # compteurs des appels spéculatifs (core/metrics.py)
+        self.counts = {
+            "started": 0, "generated": 0, "hits": 0, "stale": 0,
+            "skipped": 0, "misses": 0, "failed": 0,
+        }
+        self.waited_s = 0.0  # temps passé par les tours à attendre une spéculation
+        # (carte, suspect) → {"token", "running", "future"} ; le Future donne
+        # {message, base, answer, context, turns}
+        self._entries = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._cancel_locked()
+            self.counts = dict.fromkeys(self.counts, 0)
+            self.waited_s = 0.0
+
+    def cancel(self):
+        """Abandonne le lot en cours (les sessions vont changer, il serait périmé)."""
+        with self._lock:
+            self._cancel_locked()
+
+    def close(self):
+        """Partie terminée : annule le lot et libère les threads de la partie."""
+        with self._lock:
+            self._cancel_locked()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _cancel_locked(self):
+        for job in self._entries.values():
+            job["token"].cancel()
+        self._entries = {}
+
+    def start(self, sessions, messages):
+        """
+        Lance un lot : sessions {suspect: ChatSession}, messages {carte: message} des
+        cartes encore en main. Les spéculations du lot précédent sont annulées.
+        """
+        with self._lock:
+            self._cancel_locked()
+            if not messages:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=WORKERS, thread_name_prefix="speculation"
+                )
+            for card, message in messages.items():
+                for who, session in sessions.items():
+                    fork = session.fork(on_stats=self.on_stats)
+                    base = (session.context, session.turns)
+                    job = {"token": cancel.CancelToken(), "running": False}
+                    job["future"] = self._executor.submit(
+                        tracing.propagate(self._run, "speculation.card", "llm"),
+                        job, fork, base, message,
+                    )
+                    self._entries[(card, who)] = job
+                    self.counts["started"] += 1
+
+    def _run(self, job, fork, base, message):
+        token = job["token"]
+        try:
+            wait_idle(token)
+        except cancel.Cancelled:
+            return None
+        with self._lock:
+            # take() ne prend que les réponses déjà lancées : décision sous le verrou
+            if token.cancelled:
+                return None
+            job["running"] = True
+            self.counts["generated"] += 1
+        try:
+            with cancel.scope(token), optional():
+                answer = fork.ask(message)
+        except cancel.Cancelled:
+            return None
+        except Exception as e:
+            print("Erreur spéculation:", e)
+            return None
+        return {"message": message, "base": base, "answer": answer,
+                "context": fork.context, "turns": fork.turns}
+
+    def take(self, card, sessions, message):
+        """
+        Carte jouée : {suspect: fonction} pour chaque réponse spéculée déjà lancée. La
+        fonction attend cette réponse et la renvoie si elle est encore valable pour la
+        session (qui avance alors comme si elle avait répondu), None sinon. Le reste du
+        lot est annulé : ces sessions vont changer.
+        """
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            ready = {}
+            for (c, who), job in entries.items():
+                if c == card and who in sessions and job["running"]:
+                    ready[who] = lambda job=job, session=sessions[who]: self._resolve(job, session, message)
+                    continue
+                job["token"].cancel()
+                if c == card:
+                    self.counts["skipped"] += 1  # pas encore lancée : le tour la génère
+            self.counts["misses"] += sum((card, who) not in entries for who in sessions)
+        return ready
+
+    def _resolve(self, job, session, message):
+        turn = cancel.current()
+        detach = turn.on_cancel(job["token"].cancel) if turn is not None else (lambda: None)
+        t0 = time.perf_counter()
+        try:
+            entry = job["future"].result()
+        finally:
+            detach()
+            with self._lock:
+                self.waited_s += time.perf_counter() - t0
+        cancel.check()
+        if entry is None:
+            self._count("failed")
+            return None
+        context, turns = entry["base"]
+        if entry["message"] != message or context is not session.context or turns != session.turns:
+            self._count("stale")
+            return None
+        session.context = entry["context"]
+        session.turns = entry["turns"]
+        self._count("hits")
+        return entry["answer"]
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def stats(self):
+        with self._lock:
+            c = dict(self.counts)
+            c["waited_s"] = self.waited_s
+        # réponses demandées (cartes jouées × suspects) ; hit_rate : part servie sans
+        # appel, waited_s : ce que les tours ont attendu pour ces réponses
+        c["served"] = served = c["hits"] + c["stale"] + c["skipped"] + c["misses"] + c["failed"]
+        c["hit_rate"] = c["hits"] / served if served else 0.0
+        return c
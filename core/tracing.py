@@ -0,0 +1,198 @@
+"""
+Traces d'exécution (opt-in) au format Chrome trace-event, lisible dans
+chrome://tracing ou https://ui.perfetto.dev.
+
+    DETECTIVE_TRACE=trace.json python detective.py
+
+Désactivé, span() renvoie un objet vide partagé et propagate() la fonction telle
+quelle : le coût se limite à un test de booléen.
+"""
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_EVENTS = 200_000  # au-delà, les plus anciens événements sont oubliés
+
+_enabled = False
+_events = deque(maxlen=MAX_EVENTS)
+_named_threads = set()
+_flow_ids = itertools.count(1)
+_current = contextvars.ContextVar("trace_span", default=None)
+_pid = os.getpid()
+_t0 = time.perf_counter()
+_lock = threading.Lock()
+
+
+def _now_us():
+    return (time.perf_counter() - _t0) * 1e6
+
+
+def _emit(event):
+    tid = threading.get_ident()
+    event["pid"] = _pid
+    event["tid"] = tid
+    with _lock:
+        if tid not in _named_threads:
+            _named_threads.add(tid)
+            _events.append({
+                "name": "thread_name", "ph": "M", "pid": _pid, "tid": tid,
+                "args": {"name": threading.current_thread().name},
+            })
+        _events.append(event)
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start", "token")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        self.token = _current.set(self)
+        return self
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self.token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _emit({
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": self.start, "dur": _now_us() - self.start, "args": self.args,
+        })
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enabled():
+    return _enabled
+
+
+def span(name, cat="game", **args):
+    """with span("nom", cat, clé=valeur): ... — une tranche de temps dans le thread courant."""
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(name, cat, args)
+
+
+def clock():
+    """Début d'une tranche terminée plus tard par complete() (None si désactivé)."""
+    return _now_us() if _enabled else None
+
+
+def complete(name, cat, start, **args):
+    """
+    Tranche [start, maintenant] : pour ce qui ne tient pas dans un bloc with (générateurs,
+    boucles qui ne méritent une trace que lorsqu'elles ont travaillé).
+    """
+    if _enabled and start is not None:
+        _emit({"name": name, "cat": cat, "ph": "X", "ts": start, "dur": _now_us() - start, "args": args})
+
+
+def instant(name, cat="game", **args):
+    """Événement ponctuel (ex: réponse mise en file pour la GUI)."""
+    if _enabled:
+        _emit({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(), "args": args})
+
+
+def traced(name=None, cat="game"):
+    """Décorateur : chaque appel de la fonction devient un span."""
+    def deco(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def propagate(fn, name=None, cat="thread"):
+    """
+    Prépare fn pour s'exécuter dans un autre thread (pool, Thread) : elle y retrouve le
+    span courant comme parent et une flèche relie les deux threads dans la trace. Le
+    temps passé en file d'attente est noté dans l'argument queued_ms.
+    """
+    if not _enabled:
+        return fn
+    ctx = contextvars.copy_context()
+    parent = _current.get()
+    flow = next(_flow_ids)
+    label = name or getattr(fn, "__qualname__", "task")
+    submitted = _now_us()
+    _emit({"name": label, "cat": "flow", "ph": "s", "id": flow, "ts": submitted})
+
+    def inner(*args, **kwargs):
+        s = _Span(label, cat, {
+            "parent": parent.name if parent is not None else None,
+            "queued_ms": round((_now_us() - submitted) / 1000, 3),
+        })
+        with s:
+            _emit({"name": label, "cat": "flow", "ph": "f", "bp": "e", "id": flow, "ts": s.start})
+            return fn(*args, **kwargs)
+
+    def run(*args, **kwargs):
+        return ctx.run(inner, *args, **kwargs)
+    return run
+
+
+def enable(path=None):
+    """Active les traces ; si path est donné, elles y sont écrites à la sortie du programme."""
+    global _enabled
+    _enabled = True
+    if path:
+        atexit.register(export, path)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _named_threads.clear()
+
+
+def export(path):
+    """Écrit les événements au format Chrome trace-event (JSON)."""
+    with _lock:
+        events = list(_events)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(events)
+
+
+if os.environ.get("DETECTIVE_TRACE"):
+    enable(os.environ["DETECTIVE_TRACE"])
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+
+from . import cancel, tracing
+
+
+class TurnExecutor:
+    """
+    Exécute les tours d'une partie un par un, dans un seul thread : les saisies
+    attendent dans une file au lieu de lancer des process_turn concurrents sur le
+    même GameManager.
+
+    Une saisie identique à la précédente, renvoyée moins de DEBOUNCE_S après elle
+    pendant qu'elle attend ou tourne encore, est ignorée (double Entrée). supersede()
+    remplace le tour en cours par une nouvelle saisie (le joueur n'attend pas la fin
+    de la réponse pour écrire la suite). cancel() abandonne le tour en cours (flux HTTP coupé, voir core/cancel.py) et ceux en
+    attente ; restart() fait de même puis relance la partie.
+
+    on_reply(reply) reçoit la réponse de chaque tour : None si le tour a été annulé
+    (Cancelled, rien n'a été joué), la réponse normale si l'annulation arrive après
+    que le tour a été joué. on_busy(occupé) reçoit chaque passage occupé/libre ; les
+    deux sont appelés depuis le thread des tours.
+    """
+
+    DEBOUNCE_S = 0.6
+
+    def __init__(self, game, on_reply, on_event=None, on_busy=None):
+        self.game = game
+        self.on_reply = on_reply
+        self.on_event = on_event
+        self.on_busy = on_busy
+        self.cancelled = 0
+        self.debounced = 0
+        self._queue = queue.Queue()
+        self._pending = 0  # tours en attente ou en cours
+        self._epoch = 0  # avancé par cancel() : les tours d'une époque passée sont sautés
+        self._token = None
+        self._last = (None, 0.0)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, text):
+        """Met la saisie en file ; False si c'est un doublon ignoré."""
+        with self._lock:
+            if self._duplicate(text):
+                return False
+            self._enqueue(text)
+        return True
+
+    def _duplicate(self, text):
+        # appelé sous self._lock ; retient la saisie si ce n'est pas un doublon
+        now = time.monotonic()
+        last_text, last_at = self._last
+        if self._pending and text == last_text and now - last_at < self.DEBOUNCE_S:
+            self.debounced += 1
+            return True
+        self._last = (text, now)
+        return False
+
+    def cancel(self):
+        """Abandonne le tour en cours et les saisies en attente."""
+        with self._lock:
+            self._epoch += 1
+            token = self._token
+            self._last = (None, 0.0)
+        if token is not None:
+            token.cancel()
+
+    def supersede(self, text):
+        """Remplace le tour en cours (et la file) par cette saisie ; False si c'est un doublon ignoré."""
+        with self._lock:
+            if self._duplicate(text):
+                return False
+            self._epoch += 1
+            token = self._token
+            self._enqueue(text)
+        if token is not None:
+            token.cancel()
+        return True
+
+    def restart(self):
+        """Abandonne tout et relance la partie ; le message d'accueil arrive par on_reply."""
+        self.cancel()
+        with self._lock:
+            self._enqueue(None)
+
+    def close(self):
+        self.cancel()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=2)
+
+    def _enqueue(self, text):
+        # appelé sous self._lock
+        self._pending += 1
+        became_busy = self._pending == 1
+        self._queue.put((self._epoch, text))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="turns", daemon=True)
+            self._thread.start()
+        if became_busy and self.on_busy is not None:
+            self.on_busy(True)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            epoch, text = item
+            with self._lock:
+                stale = epoch != self._epoch
+                token = None if stale else cancel.CancelToken()
+                self._token = token
+            try:
+                if not stale:
+                    self._run_turn(text, token)
+            finally:
+                with self._lock:
+                    self._token = None
+                    self._pending -= 1
+                    idle = self._pending == 0
+                if idle and self.on_busy is not None:
+                    self.on_busy(False)
+
+    def _run_turn(self, text, token):
+        try:
+            with cancel.scope(token), tracing.span("turn.run", "game"):
+                if text is None:
+                    reply = self.game.start_game()
+                else:
+                    reply = self.game.process_turn(text, on_event=self.on_event)
+        except cancel.Cancelled:
+            # défait par le jeu : seul ce cas est un tour annulé. Une annulation
+            # arrivée après coup ne doit pas cacher une réponse déjà jouée.
+            self.cancelled += 1
+            reply = None
+        except Exception as e:
+            reply = f"⚠️ Error: {e}"
+        try:
+            self.on_reply(reply)
+        except Exception as e:  # le thread des tours doit survivre
+            print("Erreur tour:", e)
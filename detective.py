@@ -1,6 +1,29 @@
-from gui.main_gui import DetectiveGUI
+"""
+Lance le jeu. La fenêtre vide est affichée avant tout import lourd (core, GUI) ;
+PIL et le son se chargent ensuite dans leurs threads (gui/assets.py, gui/audio.py).
+
+DETECTIVE_STARTUP_PROBE=1 : écrit "first_paint" puis "ready" sur la sortie et quitte
+(mesure de tools/startup.py).
+"""
+import os
 import tkinter as tk
 
+PROBE = bool(os.environ.get("DETECTIVE_STARTUP_PROBE"))
+
 root = tk.Tk()
+root.title("🕵️ AI Detective Game")
+root.geometry("1000x700")
+root.configure(bg="#0b0c10")
+root.update()  # premier affichage
+if PROBE:
+    print("first_paint", flush=True)
+
+from gui.main_gui import DetectiveGUI  # noqa: E402  (après le premier affichage, exprès)
+
 app = DetectiveGUI(root)
-root.mainloop()
+if PROBE:
+    root.update()
+    print("ready", flush=True)
+    root.destroy()
+else:
+    root.mainloop()
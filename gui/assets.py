@@ -0,0 +1,107 @@
+# gui/assets.py
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+THEMES_DIR = os.path.join("data", "themes")
+DEFAULT_THEME = "interrogation"
+CACHE_DIR = os.path.join("data", "cache", "assets")
+
+
+def available_themes():
+    """Noms des thèmes installés (sous-dossiers de data/themes), triés."""
+    try:
+        return sorted(d for d in os.listdir(THEMES_DIR) if os.path.isdir(os.path.join(THEMES_DIR, d)))
+    except OSError:
+        return [DEFAULT_THEME]
+
+
+def theme_path(name):
+    """Dossier data/themes/<name>, ou le thème par défaut s'il n'existe pas."""
+    path = os.path.join(THEMES_DIR, name or "")
+    if name and os.path.isdir(path):
+        return path
+    return os.path.join(THEMES_DIR, DEFAULT_THEME)
+
+
+class AssetCache:
+    """
+    Images d'un thème redimensionnées une fois pour toutes : chaque variante est gardée
+    sur disque (data/cache/assets/), sous une clé faite de l'empreinte du fichier source
+    et de la taille voulue. Décodage et redimensionnement se font dans un thread à part,
+    jamais dans le thread Tk (submit() renvoie un Future d'image PIL).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, workers=1):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}  # (chemin, mtime, taille) → empreinte du contenu
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+
+    def source_hash(self, path):
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+        digest = h.hexdigest()[:16]
+        with self._lock:
+            self._hashes[key] = digest
+        return digest
+
+    def variant_path(self, path, size, fit):
+        ext = ".jpg" if path.lower().endswith((".jpg", ".jpeg")) else ".png"
+        w, h = size
+        return os.path.join(self.cache_dir, f"{self.source_hash(path)}_{w}x{h}_{fit}{ext}")
+
+    def load(self, path, size, fit="stretch"):
+        """
+        Image PIL à la taille demandée, ou None si la source n'existe pas. Bloquant.
+        fit="cover" remplit la taille sans déformer (rogne les bords), "stretch" étire.
+        """
+        if not os.path.isfile(path):
+            return None
+        # PIL est importé ici, dans le thread des images : pas au lancement de la fenêtre.
+        # ImageTk aussi, pour que le thread Tk le trouve déjà chargé.
+        from PIL import Image, ImageOps, ImageTk  # noqa: F401
+
+        variant = self.variant_path(path, size, fit)
+        if os.path.isfile(variant):
+            try:
+                img = Image.open(variant)
+                img.load()
+                with self._lock:
+                    self.hits += 1
+                return img
+            except OSError:
+                pass  # variante abîmée : on la refait
+        with self._lock:
+            self.misses += 1
+        img = Image.open(path)
+        if variant.endswith(".jpg"):
+            img = img.convert("RGB")
+        if fit == "cover":
+            img = ImageOps.fit(img, size, Image.LANCZOS)
+        else:
+            img = img.resize(size, Image.LANCZOS)
+        self._save(img, variant)
+        return img
+
+    def _save(self, img, variant):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{variant}.{threading.get_ident()}.tmp"
+            img.save(tmp, "JPEG" if variant.endswith(".jpg") else "PNG", quality=90)
+            os.replace(tmp, variant)
+        except OSError as e:
+            print("Erreur cache image:", e)
+
+    def submit(self, path, size, fit="stretch"):
+        return self._executor.submit(self.load, path, size, fit)
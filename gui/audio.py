@@ -0,0 +1,176 @@
+# gui/audio.py
+import os
+import queue
+import threading
+import time
+
+from core import tracing
+from core.config import load_config
+
+# Événement sonore → fichier ; chargés une fois dans des buffers Sound
+SOUNDS = {
+    "message": os.path.join("data", "sounds", "ding.mp3"),
+}
+
+
+class NullDriver:
+    """Pas de son (tests, serveurs, machines sans carte audio) : on note seulement les lectures."""
+
+    name = "null"
+
+    def __init__(self):
+        self.played = []
+
+    def init(self):
+        return True
+
+    def load(self, path):
+        return path  # même sans fichier : les tests voient quels sons auraient été joués
+
+    def play(self, sound, volume):
+        self.played.append(sound)
+
+    def quit(self):
+        pass
+
+
+class PygameDriver:
+    """pygame.mixer ouvert une seule fois ; les sons sont décodés au chargement."""
+
+    name = "pygame"
+
+    def __init__(self):
+        self._mixer = None
+
+    def init(self):
+        import pygame  # import tardif : le module n'est pas requis avec le driver null
+
+        pygame.mixer.init()
+        self._mixer = pygame.mixer
+        return True
+
+    def load(self, path):
+        if not os.path.isfile(path):
+            return None
+        return self._mixer.Sound(path)
+
+    def play(self, sound, volume):
+        sound.set_volume(volume)
+        sound.play()
+
+    def quit(self):
+        if self._mixer is not None:
+            self._mixer.quit()
+            self._mixer = None
+
+
+DRIVERS = {"null": NullDriver, "pygame": PygameDriver}
+
+
+class AudioEngine:
+    """
+    Sons de la GUI joués par un thread dédié : play() ne fait que poser l'événement
+    dans une file bornée et ne bloque jamais le thread Tk. Le mixer est initialisé au
+    premier son ou à start(), dans ce thread. Un même événement n'est rejoué qu'après throttle_ms
+    (les messages en rafale ne donnent qu'un seul "ding"). Si le périphérique audio
+    ne s'ouvre pas, le moteur bascule sur le driver null.
+    """
+
+    QUEUE_SIZE = 8
+
+    def __init__(self, driver=None, sounds=None, volume=None, throttle_ms=None):
+        cfg = load_config().get("audio") or {}
+        if driver is None:
+            driver = os.environ.get("DETECTIVE_AUDIO") or cfg.get("driver", "pygame")
+        if isinstance(driver, str):
+            driver = DRIVERS.get(driver, NullDriver)()
+        self.driver = driver
+        self.sounds = dict(SOUNDS if sounds is None else sounds)
+        self.volume = cfg.get("volume", 1.0) if volume is None else volume
+        self.throttle = (cfg.get("throttle_ms", 250) if throttle_ms is None else throttle_ms) / 1000
+        self.dropped = 0
+        self._buffers = {}
+        self._last = {}
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Lance le thread audio, qui ouvre le mixer et précharge les sons sans attendre un play()."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+                self._thread.start()
+        return self
+
+    def play(self, event):
+        """Demande la lecture d'un son ; retourne False s'il est ignoré (limité ou file pleine)."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(event, float("-inf")) < self.throttle:
+                return False
+            self._last[event] = now
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def close(self):
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout=2)
+
+    def _start(self):
+        try:
+            self.driver.init()
+        except Exception as e:
+            print(f"Audio indisponible ({self.driver.name}):", e)
+            self.driver = NullDriver()
+        for event, path in self.sounds.items():
+            try:
+                self._buffers[event] = self.driver.load(path)
+            except Exception as e:
+                print(f"Erreur son {event}:", e)
+
+    def _run(self):
+        self._start()
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            sound = self._buffers.get(event)
+            if sound is None:
+                continue
+            try:
+                with tracing.span("audio.play", "gui", event=event):
+                    self.driver.play(sound, self.volume)
+            except Exception as e:
+                print(f"Erreur lecture {event}:", e)
+        self.driver.quit()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_audio():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AudioEngine()
+        return _engine
+
+
+def set_audio(engine):
+    """Remplace le moteur audio (ex: AudioEngine("null") dans les tests)."""
+    global _engine
+    with _engine_lock:
+        old, _engine = _engine, engine
+    if old is not None and old is not engine:
+        old.close()
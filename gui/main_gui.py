@@ -1,28 +1,33 @@
 # gui/main_gui.py
 import os
-import threading
+import queue
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 
+from core import tracing
+from core.config import load_config
 from core.game_manager import GameManager
-
-# --- Image & son ---
-from PIL import Image, ImageTk
-import pygame
-
-
-def playsound(path):
-    """Petite fonction pour jouer le son."""
-    try:
-        if os.path.isfile(path):
-            pygame.mixer.init()
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.play()
-    except Exception:
-        pass
+from core.turns import TurnExecutor
+from gui.assets import AssetCache, available_themes, theme_path
+from gui.audio import get_audio
+from gui.transcript import TranscriptView
 
 
 class DetectiveGUI:
+    STREAM_FLUSH_MS = 50
+    # Redimensionnement de la fenêtre : on attend qu'il se calme avant de refaire le fond
+    RESIZE_DEBOUNCE_MS = 150
+    ASSET_POLL_MS = 30
+    AVATAR_SIZE = (40, 40)
+    LOGO_SIZE = (70, 70)
+    SEND_LABELS = {False: "Envoyer", True: "⏹ Arrêter"}
+    STREAM_LABELS = {
+        "suspect1": "👤 Suspect 1: ",
+        "suspect2": "👤 Suspect 2: ",
+        "detective": "🕵️ Detective: ",
+        "analysis": "",
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("🕵️ AI Detective Game")
@@ -32,7 +37,15 @@ class DetectiveGUI:
         # -----------------------
         # Chemins et couleurs
         # -----------------------
-        self.theme_path = "data/themes/interrogation"
+        self.theme = load_config()["theme"]
+        self.theme_path = theme_path(self.theme)
+        # Images décodées et redimensionnées hors du thread Tk, variantes gardées sur disque
+        self.assets = AssetCache()
+        # Mixer ouvert et sons préchargés dans le thread audio, pas dans le thread Tk
+        get_audio().start()
+        self._asset_queue = queue.Queue()
+        self._bg_size = None
+        self._bg_after = None
         self.colors = {
             "bg": "#0b0c10",
             "panel": "#151821",
@@ -50,8 +63,10 @@ class DetectiveGUI:
         self.bg_label = tk.Label(self.root)
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
-        # Chargement du fond
+        # Chargement du fond (à la taille réelle de la fenêtre, voir _on_configure)
+        self.root.after(self.ASSET_POLL_MS, self._poll_assets)
         self._load_background()
+        self.root.bind("<Configure>", self._on_configure)
 
         # Barre du haut
         self.top_frame = tk.Frame(self.root, bg=self.colors["bg"])
@@ -69,6 +84,13 @@ class DetectiveGUI:
         )
         self.title_lbl.pack(side=tk.LEFT)
 
+        # État du modèle (chargé ou non côté Ollama)
+        self.status_lbl = tk.Label(
+            self.top_frame, text="", font=("Segoe UI", 10),
+            fg=self.colors["system"], bg=self.colors["bg"]
+        )
+        self.status_lbl.pack(side=tk.RIGHT)
+
         # Zone de texte
         self.text_frame = tk.Frame(self.root, bg=self.colors["bg"])
         self.text_frame.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 8))
@@ -89,6 +111,23 @@ class DetectiveGUI:
         self.text_area.tag_configure("ai", foreground=self.colors["ai"])
         self.text_area.tag_configure("system", foreground=self.colors["system"])
         self.text_area.tag_configure("bold", font=("JetBrains Mono", 11, "bold"))
+        # réponse coupée d'un tour annulé (voir gui/transcript.py) ; après les autres
+        # tags pour passer devant eux
+        self.text_area.tag_configure("interrupted", foreground=self.colors["system"], overstrike=True)
+        # Tout l'historique de la fenêtre reste en mémoire, seuls les derniers messages
+        # sont dans le widget (voir gui/transcript.py)
+        self.transcript = TranscriptView(self.text_area, self._avatar)
+
+        # Statistiques LLM (F2 pour afficher / masquer) : jetons/s et taille du prompt
+        self.stats_lbl = tk.Label(
+            self.text_frame, text="", font=("JetBrains Mono", 9), justify=tk.LEFT,
+            fg=self.colors["system"], bg=self.colors["bg"], padx=6, pady=4
+        )
+        self.stats_visible = False
+        if load_config()["show_stats"]:
+            self._toggle_stats()
+        self.root.bind("<F2>", self._toggle_stats)
+        self.root.bind("<F3>", self.next_theme)  # thème suivant de data/themes
 
         # Bas de page
         self.bottom = tk.Frame(self.root, bg=self.colors["bg"])
@@ -98,8 +137,12 @@ class DetectiveGUI:
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
         self.entry.bind("<Return>", self.send_message)
 
-        self.send_btn = ttk.Button(self.bottom, text="Envoyer", command=self.send_message)
+        # Pendant un tour, le bouton devient "Arrêter" (Échap aussi) ; Ctrl+N relance la partie
+        self.send_btn = ttk.Button(self.bottom, text=self.SEND_LABELS[False], command=self._on_send_button)
         self.send_btn.pack(side=tk.RIGHT)
+        self._shown_busy = False
+        self.root.bind("<Escape>", self.stop_turn)
+        self.root.bind("<Control-n>", self.restart_game)
 
         # Charger les avatars
         self.avatars = {}
@@ -108,9 +151,61 @@ class DetectiveGUI:
         # Style bouton
         self._style_ttk()
 
+        # Streaming : les morceaux arrivent des threads de génération et sont
+        # affichés par paquets toutes les STREAM_FLUSH_MS pour ne pas saturer Tk
+        self._stream_queue = queue.Queue()
+        self._stream_lines = {}  # speaker → id du message en cours dans le transcript
+        self.root.after(self.STREAM_FLUSH_MS, self._flush_stream)
+
         # Jeu
         self.game = GameManager()
+        # Un seul thread pour les tours : saisies en file, doublons ignorés, tours annulables
+        self.turns = TurnExecutor(self.game, self._on_turn_reply, on_event=self._on_stream_event)
         self.display_ai(self.game.start_game(), typewriter=False)
+        self._poll_backend()
+
+    # -----------------------
+    # État du modèle
+    # -----------------------
+
+    BACKEND_LABELS = {
+        "cold": ("○ IA en veille", "#94a3b8"),
+        "warming": ("◌ Chargement de l'IA…", "#fcd34d"),
+        "ready": ("● IA prête", "#4ade80"),
+        "error": ("✕ Ollama injoignable", "#f87171"),
+    }
+
+    def _poll_backend(self):
+        text, color = self.BACKEND_LABELS[self.game.backend_status()]
+        self.status_lbl.configure(text=text, fg=color)
+        if self.stats_visible:
+            self._refresh_stats()
+        self.root.after(500, self._poll_backend)
+
+    # -----------------------
+    # Statistiques LLM
+    # -----------------------
+
+    def _toggle_stats(self, event=None):
+        self.stats_visible = not self.stats_visible
+        if self.stats_visible:
+            self.stats_lbl.place(relx=1.0, x=-24, y=8, anchor="ne")
+        else:
+            self.stats_lbl.place_forget()
+
+    def _refresh_stats(self):
+        m = self.game.llm_metrics()
+        turn, game, spec = m["turn"], m["game"]["total"], m["speculation"]
+        if turn is None:
+            self.stats_lbl.configure(text="📈 aucun appel LLM pour l'instant")
+            return
+        self.stats_lbl.configure(text=(
+            f"📈 Tour {turn['turn']} · {turn['calls']} appel(s) · {turn['tokens_per_s']:.0f} tok/s"
+            f" · prompt {turn['max_prompt_tokens']} tok · {turn['wall_s'] * 1000:.0f} ms\n"
+            f"   Partie · {game['calls']} appel(s) · {game['eval_tokens']} tok générés"
+            f" · {game['prompt_tokens']} tok lus"
+            + (f" · cartes prêtes {spec['hit_rate']:.0%}" if spec["served"] else "")
+        ))
 
     # -----------------------
     # Chargement des assets
@@ -128,43 +223,85 @@ class DetectiveGUI:
         )
         self.send_btn.configure(style="Accent.TButton")
 
+    def _request_asset(self, kind, path, size, fit="stretch"):
+        """Décodage en arrière-plan ; l'image est posée par _poll_assets dans le thread Tk."""
+        fut = self.assets.submit(path, size, fit)
+        fut.add_done_callback(lambda f: self._asset_queue.put((kind, size, f)))
+
+    def _poll_assets(self):
+        try:
+            while True:
+                kind, size, fut = self._asset_queue.get_nowait()
+                try:
+                    img = fut.result()
+                except Exception as e:
+                    print(f"Erreur image {kind}:", e)
+                    continue
+                if img is not None:
+                    self._apply_asset(kind, size, img)
+        except queue.Empty:
+            pass
+        self.root.after(self.ASSET_POLL_MS, self._poll_assets)
+
+    def _apply_asset(self, kind, size, img):
+        from PIL import ImageTk  # déjà importé par le thread des images (gui/assets.py)
+
+        if kind == "background":
+            if size != self._bg_size:
+                return  # la fenêtre a encore changé de taille depuis
+            self.bg_img = ImageTk.PhotoImage(img)
+            self.bg_label.configure(image=self.bg_img)
+        elif kind == "logo":
+            self.logo_img = ImageTk.PhotoImage(img)
+            self.logo_label.configure(image=self.logo_img)
+        else:
+            self.avatars[kind] = ImageTk.PhotoImage(img)
+
+    def _on_configure(self, event):
+        if event.widget is not self.root:
+            return
+        if self._bg_after is not None:
+            self.root.after_cancel(self._bg_after)
+        self._bg_after = self.root.after(self.RESIZE_DEBOUNCE_MS, self._load_background)
+
     def _load_background(self):
-        bg_path = os.path.join(self.theme_path, "background.jpg")
-        if os.path.isfile(bg_path):
-            try:
-                img = Image.open(bg_path)
-                img = img.resize((1100, 750))
-                self.bg_img = ImageTk.PhotoImage(img)
-                self.bg_label.configure(image=self.bg_img)
-            except Exception as e:
-                print("Erreur background:", e)
+        self._bg_after = None
+        w = max(self.root.winfo_width(), 1000)
+        h = max(self.root.winfo_height(), 700)
+        # Tailles arrondies au multiple de 32 supérieur : moins de variantes en cache,
+        # le label rogne le surplus
+        size = (-(-w // 32) * 32, -(-h // 32) * 32)
+        if size == self._bg_size:
+            return
+        self._bg_size = size
+        self._request_asset("background", os.path.join(self.theme_path, "background.jpg"), size, "cover")
 
     def _load_logo(self):
-        logo_path = os.path.join(self.theme_path, "logo.png")
-        if os.path.isfile(logo_path):
-            try:
-                img = Image.open(logo_path).resize((70, 70))
-                self.logo_img = ImageTk.PhotoImage(img)
-                self.logo_label.configure(image=self.logo_img)
-            except Exception as e:
-                print("Erreur logo:", e)
+        self._request_asset("logo", os.path.join(self.theme_path, "logo.png"), self.LOGO_SIZE)
 
     def _load_avatars(self):
         avatars_dir = os.path.join(self.theme_path, "avatars")
-        files = {
-            "detective": "detective.png",
-            "suspect1": "suspect1.png",
-            "suspect2": "suspect2.png",
-            "player": "player.png",
-        }
-        for key, name in files.items():
-            path = os.path.join(avatars_dir, name)
-            if os.path.isfile(path):
-                try:
-                    img = Image.open(path).resize((40, 40))
-                    self.avatars[key] = ImageTk.PhotoImage(img)
-                except Exception as e:
-                    print(f"Erreur avatar {key}:", e)
+        for key in ("detective", "suspect1", "suspect2", "player"):
+            self._request_asset(key, os.path.join(avatars_dir, f"{key}.png"), self.AVATAR_SIZE)
+
+    def next_theme(self, event=None):
+        themes = available_themes()
+        if len(themes) < 2:
+            self.display_system(f"Thème : {self.theme} (aucun autre dans data/themes)")
+            return
+        i = themes.index(self.theme) if self.theme in themes else -1
+        self.set_theme(themes[(i + 1) % len(themes)])
+        self.display_system(f"Thème : {self.theme}")
+
+    def set_theme(self, name):
+        """Change de thème (dossier data/themes/<name>) sans redémarrer."""
+        self.theme = name
+        self.theme_path = theme_path(name)
+        self.avatars = {}
+        self._bg_size = None
+        self._load_background()
+        self._load_logo()
+        self._load_avatars()
 
     # -----------------------
     # Affichage messages
@@ -182,23 +319,23 @@ class DetectiveGUI:
             return "detective"
         return "detective"
 
-    def _insert_message(self, text: str, tag: str, role="detective"):
+    def _avatar(self, role):
+        # relu à chaque rendu : les avatars arrivent en différé et changent avec le thème
+        return self.avatars.get(role)
+
+    def _insert_message(self, text: str, tag: str, role="detective", follow=False):
         """Affiche un message avec avatar"""
-        avatar = self.avatars.get(role)
-        if avatar:
-            self.text_area.image_create(tk.END, image=avatar)
-            self.text_area.insert(tk.END, " ")
-        self.text_area.insert(tk.END, text + "\n", (tag,))
-        self.text_area.see(tk.END)
+        self.transcript.append(text, tag, role, follow=follow)
 
     def display_user(self, text: str):
         role = self._avatar_for_message(text, is_user=True)
-        self._insert_message(f"🧑 You: {text}", "user", role)
+        self._insert_message(f"🧑 You: {text}", "user", role, follow=True)
 
     def display_ai(self, text: str, typewriter=True):
-        role = self._avatar_for_message(text, is_user=False)
-        self._insert_message(f"🤖 {text}", "ai", role)
-        playsound("data/sounds/ding.mp3")
+        with tracing.span("gui.display_ai", "gui", chars=len(text)):
+            role = self._avatar_for_message(text, is_user=False)
+            self._insert_message(f"🤖 {text}", "ai", role)
+            get_audio().play("message")
 
     def display_system(self, text: str):
         self._insert_message(f"ℹ️ {text}", "system")
@@ -211,13 +348,100 @@ class DetectiveGUI:
         user_input = self.entry.get().strip()
         if not user_input:
             return
-        self.entry.delete(0, tk.END)
-        self.display_user(user_input)
-        threading.Thread(target=self._process_turn, args=(user_input,), daemon=True).start()
+        with tracing.span("gui.send_message", "gui"):
+            self.entry.delete(0, tk.END)
+            # Pendant un tour, la nouvelle saisie le remplace (la réponse en cours est coupée)
+            send = self.turns.supersede if self.turns.busy else self.turns.submit
+            if send(user_input):
+                self.display_user(user_input)
+
+    def _on_send_button(self):
+        if self.turns.busy and not self.entry.get().strip():
+            self.stop_turn()
+        else:
+            self.send_message()
+
+    def stop_turn(self, event=None):
+        """Abandonne le tour en cours : la génération est coupée côté Ollama."""
+        if self.turns.busy:
+            self.turns.cancel()
+
+    def restart_game(self, event=None):
+        self.turns.restart()
+
+    def _on_turn_reply(self, reply):
+        """Thread des tours : la réponse passe par la même file que les morceaux, pour l'ordre."""
+        tracing.instant("gui.reply_queued", "gui")
+        self._stream_queue.put((None, reply))
+
+    def _sync_busy(self):
+        busy = self.turns.busy
+        if busy != self._shown_busy:
+            self._shown_busy = busy
+            self.send_btn.configure(text=self.SEND_LABELS[busy])
+
+    # -----------------------
+    # Streaming
+    # -----------------------
 
-    def _process_turn(self, text: str):
-        reply = self.game.process_turn(text)
-        self.root.after(0, lambda: self.display_ai(reply))
+    def _on_stream_event(self, speaker, chunk):
+        """Appelé depuis les threads de génération : on ne touche pas à Tk ici."""
+        self._stream_queue.put((speaker, chunk))
+
+    def _start_stream_line(self, speaker):
+        label = self.STREAM_LABELS.get(speaker, "")
+        if speaker == "detective" and self.game.lang == "fr":
+            label = "🕵️ Détective: "
+        role = "detective" if speaker == "analysis" else speaker
+        self._stream_lines[speaker] = self.transcript.start_stream(f"🤖 {label}", "ai", role)
+
+    def _flush_stream(self):
+        """Vide la file de streaming : un seul passage de rendu par intervalle."""
+        started = tracing.clock()
+        pending = {}
+        order = []
+        dirty = False
+        handled = 0
+        try:
+            while True:
+                speaker, chunk = self._stream_queue.get_nowait()
+                handled += 1
+                if speaker is None:
+                    self._write_stream_chunks(pending, order)
+                    pending, order = {}, []
+                    lines, self._stream_lines = self._stream_lines, {}
+                    if chunk is None:
+                        # tour annulé et défait : ses répliques partielles sont barrées
+                        for msg_id in lines.values():
+                            self.transcript.interrupt(msg_id, " …")
+                        self.display_system("Tour interrompu." if self.game.lang == "fr" else "Turn stopped.")
+                    elif chunk:
+                        self.display_ai(chunk)
+                    else:
+                        get_audio().play("message")
+                    continue
+                if speaker not in pending:
+                    pending[speaker] = []
+                    order.append(speaker)
+                pending[speaker].append(chunk)
+                dirty = True
+        except queue.Empty:
+            pass
+        if dirty:
+            self._write_stream_chunks(pending, order)
+        if handled:
+            # seuls les passages qui ont affiché quelque chose apparaissent dans la trace
+            tracing.complete("gui.flush_stream", "gui", started, items=handled)
+        self._sync_busy()
+        self.root.after(self.STREAM_FLUSH_MS, self._flush_stream)
+
+    def _write_stream_chunks(self, pending, order):
+        for speaker in order:
+            if speaker not in self._stream_lines:
+                self._start_stream_line(speaker)
+            text = "".join(pending[speaker])
+            if text:
+                self.transcript.extend(self._stream_lines[speaker], text)
 
 
 if __name__ == "__main__":
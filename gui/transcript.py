@@ -0,0 +1,218 @@
+# gui/transcript.py
+import tkinter as tk
+
+
+class Transcript:
+    """Tous les messages de la fenêtre, toutes parties confondues : {role, tag, text}."""
+
+    def __init__(self):
+        self.messages = []
+
+    def __len__(self):
+        return len(self.messages)
+
+    def append(self, text, tag, role=None):
+        self.messages.append({"role": role, "tag": tag, "text": text})
+        return len(self.messages) - 1
+
+    def extend(self, msg_id, chunk):
+        self.messages[msg_id]["text"] += chunk
+
+    def interrupt(self, msg_id, note):
+        msg = self.messages[msg_id]
+        msg["text"] += note
+        msg["tag"] = "interrupted"
+
+
+class TranscriptView:
+    """
+    Affiche une fenêtre d'au plus MAX_RENDERED messages du Transcript dans un widget
+    Text : les plus anciens sont retirés du widget (pas du modèle) et reviennent par
+    pages quand on remonte en haut de la zone. Les ajouts sont regroupés et rendus une
+    fois par image (FRAME_MS). Les avatars sont les PhotoImage partagées de la GUI,
+    jamais copiées.
+
+    Chaque message rendu commence à la marque "m<id>" ; une ligne en streaming reçoit
+    ses morceaux à la marque "s<id>", juste avant son retour à la ligne.
+    """
+
+    MAX_RENDERED = 200
+    PAGE = 50
+    FRAME_MS = 16
+
+    def __init__(self, text, avatar_for, transcript=None):
+        self.text = text
+        self.avatar_for = avatar_for  # rôle → PhotoImage ou None
+        self.transcript = transcript or Transcript()
+        self.first = 0  # messages rendus : [first, last)
+        self.last = 0
+        self._chunks = {}  # id → morceaux pas encore affichés
+        self._jump = False
+        self._following = True  # le dernier message du modèle est rendu
+        self._frame = None
+        self._paging = None
+        self._scrollbar_set = text.vbar.set if hasattr(text, "vbar") else None
+        text.configure(yscrollcommand=self._on_scroll)
+
+    # -----------------------
+    # API (thread Tk)
+    # -----------------------
+
+    def append(self, text, tag, role=None, follow=False):
+        """Ajoute un message ; follow=True ramène la vue en bas (message du joueur)."""
+        msg_id = self.transcript.append(text, tag, role)
+        self._jump = self._jump or follow
+        self._schedule()
+        return msg_id
+
+    def start_stream(self, text, tag, role=None):
+        """Ligne complétée ensuite par extend() (réponse en cours de génération)."""
+        return self.append(text, tag, role)
+
+    def extend(self, msg_id, chunk):
+        self.transcript.extend(msg_id, chunk)
+        if self.first <= msg_id < self.last:
+            self._chunks.setdefault(msg_id, []).append(chunk)
+            self._schedule()
+
+    def interrupt(self, msg_id, note):
+        """
+        Ligne en streaming d'un tour annulé : elle ne fait pas partie de l'histoire, on
+        la grise (tag "interrupted") et on la termine par `note`.
+        """
+        self.flush()  # morceaux en attente d'abord, la note vient après
+        self.transcript.interrupt(msg_id, note)
+        if self.first <= msg_id < self.last:
+            self.text.insert(f"s{msg_id}", note, ("interrupted",))
+            self.text.tag_add("interrupted", f"m{msg_id}", f"s{msg_id}")
+
+    def flush(self):
+        """Rendu immédiat de ce qui attend (sinon fait à la prochaine image)."""
+        if self._frame is not None:
+            self.text.after_cancel(self._frame)
+        self._render_frame()
+
+    # -----------------------
+    # Rendu
+    # -----------------------
+
+    def _schedule(self):
+        if self._frame is None:
+            self._frame = self.text.after(self.FRAME_MS, self._render_frame)
+
+    def _render_frame(self):
+        self._frame = None
+        total = len(self.transcript)
+        at_bottom = self.text.yview()[1] >= 0.999
+        if self._jump and not self._following:
+            # la vue était remontée loin : on repart des derniers messages
+            self._rerender(max(0, total - self.MAX_RENDERED), total)
+        else:
+            for msg_id, chunks in self._chunks.items():
+                tag = self.transcript.messages[msg_id]["tag"]
+                self.text.insert(f"s{msg_id}", "".join(chunks), (tag,))
+            self._chunks = {}
+            if self._following:
+                # on suit la fin : les nouveaux messages s'ajoutent, les plus vieux sortent du widget
+                for msg_id in range(self.last, total):
+                    self._render_at_end(msg_id)
+                self.last = total
+                self._trim_top()
+        if self._jump or (self._following and at_bottom):
+            self.text.see(tk.END)
+        self._jump = False
+
+    def _draw(self, msg_id, index):
+        """Insère le message à la marque index (gravité droite : elle avance avec le texte)."""
+        msg = self.transcript.messages[msg_id]
+        self.text.mark_set(f"m{msg_id}", index)
+        self.text.mark_gravity(f"m{msg_id}", tk.LEFT)
+        avatar = self.avatar_for(msg["role"]) if msg["role"] else None
+        if avatar:
+            self.text.image_create(index, image=avatar)
+            self.text.insert(index, " ")
+        self.text.insert(index, msg["text"] + "\n", (msg["tag"],))
+        self.text.mark_set(f"s{msg_id}", f"{index} -1c")
+
+    def _render_at_end(self, msg_id):
+        self.text.mark_set("cursor", "end-1c")
+        self._draw(msg_id, "cursor")
+
+    def _rerender(self, first, last):
+        self._unset(self.first, self.last)
+        self.text.delete("1.0", tk.END)
+        self.first = self.last = first
+        self._chunks = {}
+        for msg_id in range(first, last):
+            self._render_at_end(msg_id)
+        self.last = last
+        self._following = True
+
+    def _unset(self, start, stop):
+        for msg_id in range(start, stop):
+            self.text.mark_unset(f"m{msg_id}", f"s{msg_id}")
+
+    def _trim_top(self):
+        if self.last - self.first <= self.MAX_RENDERED:
+            return
+        keep = self.last - self.MAX_RENDERED
+        self.text.delete("1.0", f"m{keep}")
+        self._unset(self.first, keep)
+        self.first = keep
+        self._drop_chunks()
+
+    def _trim_bottom(self):
+        if self.last - self.first <= self.MAX_RENDERED:
+            return
+        keep = self.first + self.MAX_RENDERED
+        self.text.delete(f"m{keep}", "end-1c")
+        self._unset(keep, self.last)
+        self.last = keep
+        self._following = False
+        self._drop_chunks()
+
+    def _drop_chunks(self):
+        # morceaux d'une ligne sortie du widget : le modèle les a déjà
+        self._chunks = {i: c for i, c in self._chunks.items() if self.first <= i < self.last}
+
+    # -----------------------
+    # Pagination au défilement
+    # -----------------------
+
+    def _on_scroll(self, top, bottom):
+        if self._scrollbar_set is not None:
+            self._scrollbar_set(top, bottom)
+        if self._paging is not None:
+            return
+        if float(top) <= 0.0 and self.first > 0:
+            self._paging = self.text.after_idle(self._page_up)
+        elif float(bottom) >= 1.0 and self.last < len(self.transcript):
+            self._paging = self.text.after_idle(self._page_down)
+
+    def _page_up(self):
+        self._paging = None
+        if self.first == 0:
+            return
+        start = max(0, self.first - self.PAGE)
+        anchor = self.first
+        self.text.mark_set("cursor", "1.0")
+        for msg_id in range(start, anchor):
+            self._draw(msg_id, "cursor")
+        # "m<anchor>" (gravité gauche) est resté en 1.0 : on la replace après la page
+        self.text.mark_set(f"m{anchor}", "cursor")
+        self.first = start
+        self._trim_bottom()
+        self.text.yview(f"m{anchor}")
+
+    def _page_down(self):
+        self._paging = None
+        total = len(self.transcript)
+        stop = min(total, self.last + self.PAGE)
+        anchor = self.last - 1
+        for msg_id in range(self.last, stop):
+            self._render_at_end(msg_id)
+        self.last = stop
+        self._following = stop == total
+        self._trim_top()
+        if anchor >= self.first:
+            self.text.see(f"m{anchor}")
@@ -0,0 +1,292 @@
+# server.py
+"""
+Serveur headless : héberge de nombreuses parties GameManager isolées derrière une API
+HTTP/JSON et WebSocket (asyncio, bibliothèque standard uniquement).
+
+    python server.py --port 8765            # Ollama local (OLLAMA_HOST)
+    python server.py --port 8765 --stub     # faux Ollama intégré, hors ligne
+
+HTTP :
+    POST   /sessions               → {"session", "reply"}
+    POST   /sessions/<id>/turn     {"text": "..."} → {"reply", "state"}
+    DELETE /sessions/<id>
+    GET    /health                 → statistiques
+WebSocket :
+    /sessions/<id>/ws  chaque message texte est un tour ; le serveur renvoie
+    {"speaker", "chunk"} pendant la génération puis {"reply", "state"}.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.ai_agent import set_concurrency
+from core.analysis import set_analysis_concurrency
+from core.game_manager import GameManager
+from tools.asynchttp import (
+    is_websocket,
+    read_request,
+    send_json,
+    ws_accept,
+    ws_close,
+    ws_recv,
+    ws_send,
+)
+
+MAX_INPUT_CHARS = 500  # une saisie ne peut pas faire grossir une session sans limite
+
+
+class Session:
+    def __init__(self, sid):
+        self.id = sid
+        self.game = GameManager()
+        self.lock = asyncio.Lock()  # un seul tour à la fois par partie
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+    @property
+    def busy(self):
+        return self.lock.locked()
+
+
+class SessionStore:
+    """
+    Parties en mémoire, les plus anciennes en tête. Une partie inactive depuis
+    idle_timeout secondes est libérée ; au-delà de max_sessions, la moins récemment
+    utilisée (et pas en plein tour) laisse sa place.
+    """
+
+    def __init__(self, max_sessions=5000, idle_timeout=900):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()
+        self.evicted = 0
+
+    def create(self):
+        while len(self.sessions) >= self.max_sessions:
+            if not self._evict_one():
+                return None
+        s = Session(uuid.uuid4().hex)
+        self.sessions[s.id] = s
+        return s
+
+    def get(self, sid):
+        s = self.sessions.get(sid)
+        if s is not None:
+            s.last_used = time.monotonic()
+            self.sessions.move_to_end(sid)
+        return s
+
+    def touch(self, session):
+        session.last_used = time.monotonic()
+        if session.id in self.sessions:
+            self.sessions.move_to_end(session.id)
+
+    def drop(self, sid):
+        s = self.sessions.pop(sid, None)
+        if s is None:
+            return False
+        s.game.close()
+        return True
+
+    def _evict_one(self):
+        for sid, s in self.sessions.items():
+            if not s.busy:
+                del self.sessions[sid]
+                s.game.close()
+                self.evicted += 1
+                return True
+        return False
+
+    def sweep(self):
+        limit = time.monotonic() - self.idle_timeout
+        # OrderedDict trié par dernière utilisation : on s'arrête au premier récent
+        for sid in list(self.sessions):
+            s = self.sessions[sid]
+            if s.last_used > limit:
+                break
+            if not s.busy:
+                del self.sessions[sid]
+                s.game.close()
+                self.evicted += 1
+
+
+class GameServer:
+    def __init__(self, store, turn_workers=64):
+        self.store = store
+        # Les tours (GameManager est synchrone) tournent dans un pool borné ;
+        # la boucle asyncio ne bloque jamais sur un appel LLM.
+        self.turn_pool = ThreadPoolExecutor(max_workers=turn_workers, thread_name_prefix="turn")
+        self.turns_done = 0
+        self.started = time.monotonic()
+
+    async def run_turn(self, session, text, on_event=None):
+        loop = asyncio.get_running_loop()
+        async with session.lock:
+            session.last_used = time.monotonic()
+            reply = await loop.run_in_executor(
+                self.turn_pool, session.game.process_turn, text[:MAX_INPUT_CHARS], on_event
+            )
+            session.turns += 1
+            self.store.touch(session)
+        self.turns_done += 1
+        return reply
+
+    async def start_session(self):
+        s = self.store.create()
+        if s is None:
+            return None, None
+        return s, s.game.start_game()
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    req = await read_request(reader)
+                except ValueError as e:
+                    await send_json(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                if req is None:
+                    break
+                if is_websocket(req):
+                    await self._websocket(reader, writer, req)
+                    break
+                await self._route(writer, req)
+                if not req.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, writer, req):
+        parts = [p for p in req.path.split("?")[0].split("/") if p]
+        if parts == ["health"]:
+            return await send_json(writer, 200, self.stats())
+        if parts == ["sessions"] and req.method == "POST":
+            s, reply = await self.start_session()
+            if s is None:
+                return await send_json(writer, 503, {"error": "server full"})
+            return await send_json(writer, 200, {"session": s.id, "reply": reply})
+        if len(parts) >= 2 and parts[0] == "sessions":
+            s = self.store.get(parts[1])
+            if s is None:
+                return await send_json(writer, 404, {"error": "unknown session"})
+            if len(parts) == 2 and req.method == "DELETE":
+                self.store.drop(s.id)
+                return await send_json(writer, 200, {"deleted": s.id})
+            if parts[2:] == ["turn"] and req.method == "POST":
+                try:
+                    text = str(req.json().get("text", ""))
+                except ValueError:
+                    return await send_json(writer, 400, {"error": "invalid json"})
+                reply = await self.run_turn(s, text)
+                return await send_json(writer, 200, {"reply": reply, "state": s.game.state})
+        return await send_json(writer, 404, {"error": "not found"})
+
+    async def _websocket(self, reader, writer, req):
+        parts = [p for p in req.path.split("?")[0].split("/") if p]
+        s = self.store.get(parts[1]) if len(parts) == 3 and parts[2] == "ws" else None
+        if s is None:
+            return await send_json(writer, 404, {"error": "unknown session"}, keep_alive=False)
+        await ws_accept(writer, req)
+        loop = asyncio.get_running_loop()
+        # Une seule file par connexion : morceaux, réponses et analyses arrivées
+        # après coup (en arrière-plan) partent dans l'ordre où elles sont produites.
+        outbox = asyncio.Queue()
+
+        def on_event(speaker, chunk):
+            # appelé depuis les threads de génération
+            loop.call_soon_threadsafe(outbox.put_nowait, {"speaker": speaker, "chunk": chunk})
+
+        async def pump():
+            while True:
+                msg = await outbox.get()
+                await ws_send(writer, json.dumps(msg, ensure_ascii=False))
+
+        sender = asyncio.ensure_future(pump())
+        try:
+            while True:
+                text = await ws_recv(reader)
+                if text is None:
+                    break
+                reply = await self.run_turn(s, text, on_event)
+                outbox.put_nowait({"reply": reply, "state": s.game.state})
+            while not outbox.empty() and not sender.done():
+                await asyncio.sleep(0.01)
+        finally:
+            sender.cancel()
+        await ws_close(writer)
+
+    def stats(self):
+        return {
+            "sessions": len(self.store.sessions),
+            "busy": sum(1 for s in self.store.sessions.values() if s.busy),
+            "evicted": self.store.evicted,
+            "turns": self.turns_done,
+            "cpu_s": round(time.process_time(), 3),
+            "uptime_s": round(time.monotonic() - self.started, 1),
+        }
+
+
+async def serve(host="127.0.0.1", port=8765, max_sessions=5000, idle_timeout=900,
+                turn_workers=64, sweep_every=30, ready=None):
+    store = SessionStore(max_sessions, idle_timeout)
+    game_server = GameServer(store, turn_workers)
+    server = await asyncio.start_server(game_server.handle, host, port)
+    if ready is not None:
+        ready(game_server, server.sockets[0].getsockname()[1])
+
+    async def sweeper():
+        while True:
+            await asyncio.sleep(sweep_every)
+            store.sweep()
+
+    task = asyncio.ensure_future(sweeper())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        task.cancel()
+        game_server.turn_pool.shutdown(wait=False)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serveur multi-parties du jeu du détective")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-sessions", type=int, default=5000)
+    ap.add_argument("--idle-timeout", type=float, default=900)
+    ap.add_argument("--turn-workers", type=int, default=64)
+    ap.add_argument("--llm-concurrency", type=int, default=8)
+    ap.add_argument("--analysis-concurrency", type=int, default=8)
+    ap.add_argument("--stub", action="store_true", help="utiliser le faux Ollama intégré")
+    args = ap.parse_args()
+
+    set_concurrency(args.llm_concurrency)
+    set_analysis_concurrency(args.analysis_concurrency)
+
+    async def run():
+        if args.stub:
+            from tools.stub_ollama import start_stub
+            _stub, url = await start_stub()
+            os.environ["OLLAMA_HOST"] = url
+            print(f"Faux Ollama sur {url}")
+        await serve(
+            args.host, args.port, args.max_sessions, args.idle_timeout, args.turn_workers,
+            ready=lambda _gs, port: print(f"Serveur prêt sur http://{args.host}:{port}"),
+        )
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Tests hors ligne : backend stub (réponses déterministes, voir core/backends.py) et
+cache des réponses en mémoire seule. À lancer depuis la racine : python -m pytest -q
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("DETECTIVE_BACKEND", "stub")
+os.environ.setdefault("DETECTIVE_AUDIO", "null")
+
+from core import ai_agent  # noqa: E402
+from core.backends import StubBackend  # noqa: E402
+from core.llm_cache import ResponseCache  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    """StubBackend partagé, remis à l'état précédent après le test."""
+    old_backend, old_cache = ai_agent._backend, ai_agent._cache
+    stub = StubBackend()
+    ai_agent.set_backend(stub)
+    ai_agent.set_cache(ResponseCache(max_entries=64, path=None))
+    yield stub
+    ai_agent.set_backend(old_backend)
+    ai_agent.set_cache(old_cache)
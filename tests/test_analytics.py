@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from core.analytics import Analytics, main
+from core.log_store import get_store
+
+GAMES = [
+    {"mode": "detective", "difficulty": "easy", "lang": "en", "success": True, "questions": 3},
+    {"mode": "detective", "difficulty": "easy", "lang": "fr", "success": False, "questions": 5},
+    {"mode": "detective", "difficulty": "hard", "lang": "en", "success": True, "questions": 4},
+    {"mode": "suspect", "difficulty": "easy", "lang": "en", "ai_correct": False, "suspect_questions": 3},
+]
+
+
+@pytest.fixture
+def folder(tmp_path):
+    store = get_store(str(tmp_path))
+    for g in GAMES:
+        store.append(g)
+    store.flush()
+    return tmp_path
+
+
+def test_rate_and_breakdown(folder):
+    an = Analytics(str(folder))
+    assert an.refresh() == 4
+    assert an.rate() == {"games": 4, "wins": 3, "rate": 0.75}
+    assert an.rate(mode="detective", difficulty="easy")["wins"] == 1
+    assert an.rate(mode="suspect", lang="fr")["rate"] is None
+    by = an.breakdown("difficulty", mode="detective")
+    assert {k: (v["games"], v["wins"]) for k, v in by.items()} == {"easy": (2, 1), "hard": (1, 1)}
+    assert an.questions(mode="detective") == {3: 1, 4: 1, 5: 1}
+
+
+def test_refresh_is_incremental_and_persisted(folder):
+    an = Analytics(str(folder))
+    an.refresh()
+    get_store(str(folder)).append({"mode": "suspect", "difficulty": "hard", "ai_correct": True})
+    reloaded = Analytics(str(folder))
+    assert reloaded.refresh() == 1
+    assert reloaded.total == 5
+
+
+def test_refresh_does_not_import_legacy_logs(folder):
+    (folder / "game_20240101_120000.json").write_text(json.dumps(GAMES[0]), encoding="utf-8")
+    an = Analytics(str(folder))
+    an.refresh()
+    assert an.total == 4
+    assert get_store(str(folder)).import_legacy() == 1
+    assert an.refresh() == 1
+
+
+def test_cli_summary_with_mode_filter(folder, capsys):
+    main(["summary", "--mode", "detective", "--folder", str(folder), "--score", str(folder / "score.json")])
+    out = capsys.readouterr().out
+    assert "[detective] victoires du joueur : 2/3" in out
+    assert "[suspect]" not in out
+    assert json.loads((folder / "score.json").read_text()) == {"player": 3, "ai": 1}
+
+
+def test_cli_breakdown_and_import(folder, capsys):
+    (folder / "game_20240101_120000.json").write_text(json.dumps(GAMES[3]), encoding="utf-8")
+    score = str(folder / "score.json")
+    main(["import-legacy", "--folder", str(folder), "--score", score])
+    assert "1 partie(s) importée(s)" in capsys.readouterr().out
+    main(["breakdown", "--by", "lang", "--folder", str(folder), "--score", score])
+    lines = capsys.readouterr().out.splitlines()
+    assert any(line.startswith("en") and "4/4" in line for line in lines)
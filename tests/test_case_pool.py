@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from core import ai_agent
+from core.case_pool import CasePool
+from core.content import ListPack
+
+pytest.importorskip("jsonschema")  # chaque affaire générée est validée
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_producer_waits_for_idle_backend(backend):
+    pool = CasePool(model="m", path=None, low_watermark=1, high_watermark=1)
+    ai_agent._track(1)  # un tour de jeu en cours
+    try:
+        pool.prefetch("en", ListPack(["A theft at the museum."]))
+        time.sleep(0.1)
+        assert backend.calls == 0
+    finally:
+        ai_agent._track(-1)
+    assert _wait(lambda: pool.size("en") == 3)
+    case = pool.pop("en", "normal")
+    assert case["context"] == "A theft at the museum." and case["culprit"] in ("suspect1", "suspect2")
+    pool.close()
+
+
+def test_close_interrupts_waiting_producer(backend):
+    pool = CasePool(model="m", path=None)
+    ai_agent._track(1)
+    try:
+        pool.prefetch("en", ListPack(["A theft at the museum."]))
+        started = time.perf_counter()
+        pool.close()
+        assert time.perf_counter() - started < 1.0
+    finally:
+        ai_agent._track(-1)
+    assert backend.calls == 0
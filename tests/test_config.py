@@ -0,0 +1,31 @@
+import json
+
+from core.config import DEFAULTS, load_config
+
+
+def _load(tmp_path, data):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return load_config(str(path))
+
+
+def test_partial_section_keeps_other_defaults(tmp_path):
+    cfg = _load(tmp_path, {"backend": {"type": "stub"}, "audio": {"volume": 0.5}, "model": "m"})
+    assert cfg["model"] == "m"
+    assert cfg["backend"] == dict(DEFAULTS["backend"], type="stub")
+    assert cfg["audio"] == dict(DEFAULTS["audio"], volume=0.5)
+    assert cfg["case_pool"] == DEFAULTS["case_pool"]
+
+
+def test_defaults_are_not_shared(tmp_path):
+    cfg = _load(tmp_path, {"local_analysis": {"min_margin": 5.0}})
+    cfg["case_pool"]["enabled"] = False
+    assert DEFAULTS["case_pool"]["enabled"] is True
+    assert DEFAULTS["local_analysis"]["min_margin"] == 3.0
+
+
+def test_missing_or_invalid_file_gives_defaults(tmp_path):
+    assert load_config(str(tmp_path / "absent.json")) == DEFAULTS
+    bad = tmp_path / "bad.json"
+    bad.write_text("{", encoding="utf-8")
+    assert load_config(str(bad)) == DEFAULTS
@@ -0,0 +1,82 @@
+import json
+import os
+import random
+
+import pytest
+
+from core import content
+from core.content import LinePack
+
+
+def _write(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def test_index_built_once_and_persisted(tmp_path):
+    path = tmp_path / "context_en.txt"
+    _write(path, ["first", "", "  second  ", "troisième", ""])
+    pack = LinePack(str(path))
+    assert len(pack) == 3
+    assert [pack[0], pack[1], pack[2], pack[-1]] == ["first", "second", "troisième", "troisième"]
+    assert pack.builds == 1 and os.path.isfile(pack.index_path)
+
+    reopened = LinePack(str(path))
+    assert reopened[1] == "second"
+    assert reopened.builds == 0  # index relu depuis <fichier>.idx
+
+
+def test_out_of_range_and_sample(tmp_path):
+    path = tmp_path / "context_en.txt"
+    _write(path, ["a", "b"])
+    pack = LinePack(str(path))
+    with pytest.raises(IndexError):
+        pack[2]
+    with pytest.raises(IndexError):
+        pack[-3]
+    assert pack.sample(random.Random(0)) in ("a", "b")
+
+
+def test_jsonl_parse(tmp_path):
+    path = tmp_path / "cases_en.jsonl"
+    _write(path, [json.dumps({"n": 1}), json.dumps({"n": 2})])
+    assert LinePack(str(path), json.loads)[1] == {"n": 2}
+
+
+def test_index_rebuilt_when_file_changes(tmp_path):
+    path = tmp_path / "context_en.txt"
+    _write(path, ["a", "b"])
+    pack = LinePack(str(path))
+    assert len(pack) == 2
+    _write(path, ["a", "b", "c"])
+    assert len(pack) == 3 and pack[2] == "c"
+    assert pack.builds == 2
+
+    # même taille, autre contenu : la date de modification suffit
+    _write(path, ["x", "y", "z"])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert pack[0] == "x"
+    assert LinePack(str(path)).builds == 0  # le nouvel index a été gardé
+
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    path = tmp_path / "context_en.txt"
+    _write(path, ["a", "b"])
+    pack = LinePack(str(path))
+    len(pack)
+    with open(pack.index_path, "r+b") as f:
+        f.truncate(20)
+    fresh = LinePack(str(path))
+    assert fresh[1] == "b" and fresh.builds == 1
+
+
+def test_missing_file(tmp_path):
+    pack = LinePack(str(tmp_path / "absent.txt"))
+    assert len(pack) == 0 and pack.sample() is None
+
+
+def test_contexts_fall_back_without_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(content, "DATA_DIR", str(tmp_path))
+    assert content.contexts("fr").sample() in content.FALLBACK_CONTEXTS["fr"]
+    _write(tmp_path / "context_fr.txt", ["Un vol au musée."])
+    assert content.contexts("fr")[0] == "Un vol au musée."
@@ -0,0 +1,122 @@
+import pytest
+
+from core.contradictions import ContradictionDetector
+
+CASES = {
+    "en": {
+        "alibis": {
+            "suspect1": "At home watching TV from 20:00 to 23:00",
+            "suspect2": "At the library from 20:30 to 22:00",
+        },
+        "evidence": {"murder_time": "21:15", "location": "Old library", "found_item": "A glove with traces of ink"},
+    },
+    "fr": {
+        "alibis": {
+            "suspect1": "Chez moi à regarder la TV de 20h00 à 23h00",
+            "suspect2": "À la bibliothèque de 20h30 à 22h00",
+        },
+        "evidence": {"murder_time": "21:15", "location": "vieille bibliothèque", "found_item": "Un gant avec des traces d’encre"},
+    },
+}
+
+
+def _detector(lang):
+    return ContradictionDetector(lang, CASES[lang], min_margin=3.0)
+
+
+def _rules(det, who):
+    return {rule for rule, _ in det.facts[who].seen}
+
+
+@pytest.mark.parametrize("lang, answer", [
+    ("en", "I went out for a walk around 23:45."),
+    ("en", "I left at 7 pm."),
+    ("fr", "Je suis sorti vers 23h45."),
+    ("fr", "Je suis parti à sept heures."),
+])
+def test_time_outside_alibi(lang, answer):
+    det = _detector(lang)
+    det.add("?", {"suspect1": answer})
+    assert _rules(det, "suspect1") == {"alibi_time"}
+
+
+@pytest.mark.parametrize("lang, answer", [
+    ("en", "I was home by 21:30, then I went to bed."),
+    ("fr", "J'étais chez moi à 21h30."),
+])
+def test_time_inside_alibi(lang, answer):
+    det = _detector(lang)
+    det.add("?", {"suspect1": answer})
+    assert not det.facts["suspect1"].seen
+
+
+@pytest.mark.parametrize("lang, first, second", [
+    ("en", "I was at home all evening.", "I was at the bar."),
+    ("fr", "J'étais chez moi toute la soirée.", "J'étais au bar."),
+])
+def test_place_change_is_one_signal(lang, first, second):
+    det = _detector(lang)
+    det.add("?", {"suspect1": first})
+    det.add("?", {"suspect1": second})
+    assert _rules(det, "suspect1") == {"alibi_place", "changed_place"}
+    assert det.facts["suspect1"].weight >= det.min_margin
+    assert det.confidence() == 0.5  # un seul signal : on demande quand même au modèle
+
+
+@pytest.mark.parametrize("lang, answer", [
+    ("en", "I was at the library, near the reading room."),
+    ("fr", "J'étais à la bibliothèque."),
+])
+def test_crime_scene_outside_alibi(lang, answer):
+    det = _detector(lang)
+    det.add("?", {"suspect1": answer})
+    assert _rules(det, "suspect1") == {"alibi_place", "crime_scene"}
+
+
+@pytest.mark.parametrize("lang, answer", [
+    ("en", "I was not at the library."),
+    ("fr", "Je n'étais pas à la bibliothèque."),
+])
+def test_negated_place_is_ignored(lang, answer):
+    det = _detector(lang)
+    det.add("?", {"suspect1": answer})
+    assert not det.facts["suspect1"].seen
+
+
+@pytest.mark.parametrize("lang, question, answer, flagged", [
+    ("en", "Where were you?", "I never touched any glove!", True),
+    ("en", "Is this your glove?", "That glove is not mine.", False),
+    ("fr", "Où étiez-vous ?", "Je n'ai jamais vu ce gant !", True),
+    ("fr", "Ce gant est à vous ?", "Ce gant n'est pas à moi.", False),
+])
+def test_found_item_unprompted(lang, question, answer, flagged):
+    det = _detector(lang)
+    det.add(question, {"suspect2": answer})
+    assert ("found_item" in _rules(det, "suspect2")) == flagged
+
+
+@pytest.mark.parametrize("lang, answer", [
+    ("en", "I don't remember, why would I lie?"),
+    ("fr", "Je ne me souviens plus, je n'ai rien à cacher."),
+])
+def test_evasive_answers_are_capped(lang, answer):
+    det = _detector(lang)
+    for _ in range(5):
+        det.add("?", {"suspect2": answer})
+    f = det.facts["suspect2"]
+    assert _rules(det, "suspect2") == {"evasive"}
+    assert len(f.issues) == 1
+    assert f.weight == pytest.approx(1.5)  # MAX_EVASIVE esquives de 0.5
+
+
+def test_two_independent_signals_skip_the_llm():
+    det = _detector("en")
+    det.add("?", {"suspect1": "I was at home.", "suspect2": "At the library, reading."})
+    det.add("?", {"suspect1": "I was at the bar.", "suspect2": "Still at the library."})
+    assert det.confidence() < 1.0
+    det.add("?", {"suspect1": "I don't remember.", "suspect2": "Reading, as I said."})
+    assert det.confidence() == 1.0
+    data = det.analysis()
+    assert data["source"] == "local" and data["confidence"] == 1.0
+    assert data["suspect1"]["score"] > data["suspect2"]["score"]
+    assert data["inconsistencies"] == data["suspect1"]["motives"]
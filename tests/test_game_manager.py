@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from core import cancel
+from core.game_manager import GameManager
+
+pytest.importorskip("jsonschema")  # affaire fixe validée par core/case_manager.py
+
+
+def _suspect_game():
+    game = GameManager()
+    game.log_folder = None
+    game.case_pool = None
+    for text in ("en", "normal", "suspect", "innocent"):
+        game.process_turn(text)
+    assert game.state == "suspect_wait_player_answer"
+    return game
+
+
+def _cancelled_turn(game, text, after_s=0.1):
+    token = cancel.CancelToken()
+    timer = threading.Timer(after_s, token.cancel)
+    timer.start()
+    try:
+        with cancel.scope(token), pytest.raises(cancel.Cancelled):
+            game.process_turn(text)
+    finally:
+        timer.cancel()
+
+
+def test_cancelled_answer_rolls_back(backend):
+    game = _suspect_game()
+    turns = list(game.suspect_history.turns)
+    pairs = list(game.analysis._pairs)
+    snap = game.detective_session.snapshot()
+    asked = game.suspect_asked
+
+    backend.first_token_ms = 5000  # le détective répond trop tard : le tour est annulé
+    _cancelled_turn(game, "I was at home.")
+
+    assert game.suspect_history.turns == turns
+    assert game.analysis._pairs == pairs
+    assert game.detective_session.snapshot() == snap
+    assert (game.state, game.suspect_asked) == ("suspect_wait_player_answer", asked)
+
+    # renvoyée, la réponse ne compte qu'une fois
+    backend.first_token_ms = 0
+    game.process_turn("I was at home.")
+    answers = [t for t in game.suspect_history.turns if t["speaker"] == "suspect"]
+    assert [t["text"] for t in answers] == ["I was at home."]
+    game.close()
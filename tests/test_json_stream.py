@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from core import ai_agent
+from core.json_stream import TopLevelObjectScanner
+
+ANSWER = json.dumps({
+    "suspect1": {"score": 72, "motives": ["says \"nine\" {then} ten", "a\\\\b"]},
+    "suspect2": {"score": 30, "motives": [], "extra": {"nested": [1, {"x": "}"}]}},
+    "inconsistencies": ["{not an object}"],
+    "note": "ignored",
+})
+
+
+def _scan(chunks):
+    seen = []
+    scanner = TopLevelObjectScanner(lambda k, v: seen.append((k, v)))
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return seen, scanner.text
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(ANSWER)])
+def test_objects_reported_whatever_the_chunking(size):
+    seen, text = _scan([ANSWER[i:i + size] for i in range(0, len(ANSWER), size)])
+    expected = json.loads(ANSWER)
+    assert seen == [("suspect1", expected["suspect1"]), ("suspect2", expected["suspect2"])]
+    assert text == ANSWER
+
+
+def test_object_reported_before_the_end():
+    seen = []
+    scanner = TopLevelObjectScanner(lambda k, v: seen.append(k))
+    scanner.feed('{"suspect1": {"score": 1, "motives": []}, "suspect2": {"sco')
+    assert seen == ["suspect1"]
+
+
+def test_truncated_object_is_not_reported():
+    seen, _ = _scan(['{"suspect1": {"score": 1,, }, "suspect2": {"score": 2}}'])
+    assert seen == [("suspect2", {"score": 2})]
+
+
+def test_partials_are_validated_against_their_sub_schema(backend):
+    pytest.importorskip("jsonschema")
+    backend.answers = lambda prompt, fmt, context: json.dumps({
+        "suspect1": {"score": "very high", "motives": []},
+        "suspect2": {"score": 40, "motives": ["alibi"]},
+        "inconsistencies": [],
+    })
+    seen = []
+    ai_agent.ask_agent_json(
+        "m", "Réponds en JSON.", retries=0, cache=False,
+        schema=ai_agent.analysis_schema("en"), on_partial=lambda k, v: seen.append(k),
+    )
+    assert seen == ["suspect2"]
@@ -0,0 +1,41 @@
+from core import ai_agent
+from core.llm_cache import ResponseCache, cache_key
+
+
+def test_cacheable_follows_temperature_threshold():
+    cache = ResponseCache(max_entries=4, path=None, max_temperature=0.8)
+    assert cache.cacheable(None)
+    assert cache.cacheable({"temperature": 0.8})
+    assert not cache.cacheable({"temperature": 0.9})
+    assert ResponseCache(path=None, max_temperature=None).cacheable({"temperature": 2.0})
+
+
+def test_cache_key_depends_on_options_and_extra():
+    base = cache_key("m", "p", {"temperature": 0.2})
+    assert base == cache_key("m", "p", {"temperature": 0.2})
+    assert base != cache_key("m", "p", {"temperature": 0.3})
+    assert base != cache_key("m", "p", {"temperature": 0.2}, kind="json")
+
+
+def test_json_key_includes_options(backend):
+    prompt = "Réponds en JSON."
+    ai_agent.ask_agent_json("m", prompt, options={"temperature": 0.2})
+    ai_agent.ask_agent_json("m", prompt, options={"temperature": 0.2})
+    assert backend.calls == 1  # deuxième appel servi par le cache
+    ai_agent.ask_agent_json("m", prompt, options={"temperature": 0.3})
+    assert backend.calls == 2  # autres options : autre clé
+
+
+def test_json_not_cached_at_high_temperature(backend):
+    prompt = "Réponds en JSON."
+    for _ in range(2):
+        ai_agent.ask_agent_json("m", prompt, options={"temperature": 1.2})
+    assert backend.calls == 2
+    assert ai_agent.get_cache().stats()["skipped"] == 2
+
+
+def test_json_and_text_keys_are_separate(backend):
+    prompt = "Réponds en JSON."
+    ai_agent.ask_agent_json("m", prompt)
+    ai_agent._generate("m", prompt)
+    assert backend.calls == 2
@@ -0,0 +1,67 @@
+import time
+
+from core.log_store import LogStore
+
+
+def test_rotation_by_segment_size(tmp_path):
+    store = LogStore(str(tmp_path), segment_max_bytes=400)  # ~150 octets par partie
+    ids = []
+    for _ in range(6):  # une partie par lot : la rotation se décide lot par lot
+        ids.append(store.append({"mode": "detective", "history": "x" * 80}))
+        store.flush()
+    assert len(store.segments()) == 3
+    assert [r["id"] for _, _, _, r in store.iter_records()] == ids
+    store.close()
+
+
+def test_read_at_returns_indexed_record(tmp_path):
+    store = LogStore(str(tmp_path))
+    gid = store.append({"mode": "suspect"})
+    store.flush()
+    segment, begin, _, record = next(store.iter_records())
+    assert store.read_at(segment, begin) == record
+    assert record["id"] == gid
+    store.close()
+
+
+def test_flush_and_close_are_idempotent(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.flush()  # pas encore de thread d'écriture : rien à attendre
+    store.append({"mode": "detective"})
+    store.close()
+    store.close()
+    started = time.perf_counter()
+    store.flush()
+    assert time.perf_counter() - started < 1.0
+    assert store.written == 1
+
+
+def test_append_after_close_restarts_writer(tmp_path):
+    store = LogStore(str(tmp_path))
+    first = store.append({"mode": "detective"})
+    store.close()
+    second = store.append({"mode": "suspect"})
+    store.flush()
+    assert [r["id"] for _, _, _, r in store.iter_records()] == [first, second]
+    store.close()
+    assert store.written == 2
+
+
+def test_bad_record_does_not_stop_writer(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append({"mode": "detective", "bad": object()})
+    good = store.append({"mode": "suspect"})
+    store.flush()
+    store.append({"mode": "detective"})
+    store.flush()
+    ids = [r["id"] for _, _, _, r in store.iter_records()]
+    assert good in ids and len(ids) == 2
+    store.close()
+
+
+def test_import_legacy_once(tmp_path):
+    (tmp_path / "game_20240101_120000.json").write_text('{"mode": "detective"}', encoding="utf-8")
+    store = LogStore(str(tmp_path))
+    assert store.import_legacy() == 1
+    assert store.import_legacy() == 0
+    store.close()
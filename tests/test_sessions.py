@@ -0,0 +1,36 @@
+from core.ai_agent import ChatSession
+from core.game_manager import GameManager
+
+
+def _game(backend):
+    game = GameManager()
+    game.log_folder = None
+    game.case_pool = None
+    return game
+
+
+def test_detective_reseed_keeps_instructions_without_repeating_answer(backend):
+    prompts = []
+
+    def answers(prompt, fmt, context):
+        prompts.append(prompt)
+        return "Where were you at nine?"
+
+    backend.answers = answers
+    game = _game(backend)
+    game.suspect_history.reset("en", preamble="A theft at the museum.")
+    game.detective_session = ChatSession(
+        "m", "You are the detective.", max_context=1, reseed=game._detective_reseed
+    )
+    game.detective_session.ask("Detective: Ask a question to the suspect.")
+    game.suspect_history.add("detective", "Where were you?")
+    game.suspect_history.add("suspect", "At home, alone.")
+
+    game.detective_session.ask("Suspect: At home, alone.\nDetective: Ask another question.")
+
+    assert game.detective_session.reseeds == 1
+    prompt = prompts[-1]
+    assert prompt.startswith("You are the detective.")
+    assert "A theft at the museum." in prompt
+    assert prompt.count("At home, alone.") == 1
+    assert prompt.endswith("Detective: Ask another question.")
@@ -0,0 +1,93 @@
+import time
+
+from core import ai_agent
+from core.ai_agent import ChatSession
+from core.speculation import CardSpeculator
+
+TRAP = "Detective: trap"
+
+
+def _sessions():
+    return {who: ChatSession("m", f"You are {who}.") for who in ("suspect1", "suspect2")}
+
+
+def _take(speculator, card, sessions, message):
+    ready = speculator.take(card, sessions, message)
+    return {who: ready[who]() if who in ready else None for who in sessions}
+
+
+def _settle(speculator):
+    """Attend la fin des spéculations lancées (le backend stub est au repos)."""
+    for job in list(speculator._entries.values()):
+        job["future"].result()
+
+
+def test_speculated_answers_are_served_when_sessions_unchanged(backend):
+    sessions = _sessions()
+    speculator = CardSpeculator()
+    speculator.start(sessions, {"piege": TRAP})
+    _settle(speculator)
+    calls = backend.calls
+
+    answers = _take(speculator, "piege", sessions, TRAP)
+
+    assert all(answers.values())
+    assert backend.calls == calls
+    assert all(s.turns == 1 and s.context is not None for s in sessions.values())
+    assert speculator.stats()["hits"] == 2
+    speculator.close()
+
+
+def test_speculated_answer_is_stale_after_session_moves(backend):
+    sessions = _sessions()
+    speculator = CardSpeculator()
+    speculator.start(sessions, {"piege": TRAP})
+    _settle(speculator)
+    sessions["suspect1"].ask("Detective: Where were you?")
+
+    answers = _take(speculator, "piege", sessions, TRAP)
+
+    assert answers["suspect1"] is None and answers["suspect2"]
+    assert sessions["suspect1"].turns == 1
+    assert speculator.stats()["stale"] == 1
+    speculator.close()
+
+
+def test_unknown_card_is_a_miss_and_cancels_the_batch(backend):
+    sessions = _sessions()
+    speculator = CardSpeculator()
+    speculator.start(sessions, {"piege": TRAP})
+    _settle(speculator)
+
+    assert speculator.take("preuve", sessions, "Detective: proof") == {}
+    assert speculator.take("piege", sessions, TRAP) == {}
+    assert speculator.stats()["misses"] == 4
+    speculator.close()
+
+
+def test_speculation_waits_for_idle_backend_and_never_blocks_the_turn(backend):
+    sessions = _sessions()
+    speculator = CardSpeculator()
+    ai_agent._track(1)  # un vrai appel en cours
+    try:
+        speculator.start(sessions, {"piege": TRAP})
+        time.sleep(0.1)
+        assert backend.calls == 0  # rien ne part tant que le backend est occupé
+        ready = speculator.take("piege", sessions, TRAP)
+    finally:
+        ai_agent._track(-1)
+    assert ready == {}  # pas lancées : le tour génère lui-même
+    stats = speculator.stats()
+    assert (stats["skipped"], stats["generated"]) == (2, 0)
+    speculator.close()
+    assert backend.calls == 0
+
+
+def test_optional_calls_do_not_count_as_pending(backend):
+    seen = []
+    backend.answers = lambda prompt, fmt, context: seen.append(ai_agent.pending_calls()) or "No."
+    session = ChatSession("m", "You are suspect1.")
+    session.ask(TRAP)
+    with ai_agent.optional():
+        session.ask(TRAP)
+    assert seen == [1, 0]
@@ -0,0 +1,9 @@
+from gui.transcript import Transcript
+
+
+def test_interrupted_stream_line_is_marked():
+    t = Transcript()
+    line = t.append("🤖 Suspect 1: ", "ai", "suspect1")
+    t.extend(line, "I was at")
+    t.interrupt(line, " …")
+    assert t.messages[line] == {"role": "suspect1", "tag": "interrupted", "text": "🤖 Suspect 1: I was at …"}
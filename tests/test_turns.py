@@ -0,0 +1,79 @@
+import queue
+import threading
+
+from core import cancel
+from core.turns import TurnExecutor
+
+
+class FakeGame:
+    """process_turn scripté : "slow" attend l'annulation, "late" se termine malgré elle."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def start_game(self):
+        return "welcome"
+
+    def process_turn(self, text, on_event=None):
+        self.started.set()
+        if text == "slow":
+            cancel.current().wait(5)
+        if text == "late":
+            self.release.wait(5)  # l'annulation arrive, le tour est déjà joué
+        return f"reply to {text}"
+
+
+def _executor(game, on_reply=None):
+    replies = queue.Queue()
+    turns = TurnExecutor(game, on_reply or replies.put)
+    return turns, replies
+
+
+def test_cancelled_turn_replies_none():
+    game = FakeGame()
+    turns, replies = _executor(game)
+    turns.submit("slow")
+    game.started.wait(1)
+    turns.cancel()
+    assert replies.get(timeout=1) is None
+    assert turns.cancelled == 1
+    turns.close()
+
+
+def test_cancel_after_commit_keeps_the_reply():
+    game = FakeGame()
+    turns, replies = _executor(game)
+    turns.submit("late")
+    game.started.wait(1)
+    turns.cancel()
+    game.release.set()
+    assert replies.get(timeout=1) == "reply to late"
+    assert turns.cancelled == 0
+    turns.close()
+
+
+def test_supersede_replaces_running_turn():
+    game = FakeGame()
+    turns, replies = _executor(game)
+    turns.submit("slow")
+    game.started.wait(1)
+    assert turns.supersede("next")
+    assert replies.get(timeout=1) is None
+    assert replies.get(timeout=1) == "reply to next"
+    turns.close()
+
+
+def test_failing_on_reply_does_not_stop_the_worker():
+    seen = queue.Queue()
+
+    def on_reply(reply):
+        seen.put(reply)
+        raise RuntimeError("widget détruit")
+
+    turns, _ = _executor(FakeGame(), on_reply)
+    turns.submit("a")
+    turns.submit("b")
+    assert [seen.get(timeout=1), seen.get(timeout=1)] == ["reply to a", "reply to b"]
+    turns.close()
+    assert not turns.busy
@@ -0,0 +1,179 @@
+# tools/asynchttp.py
+"""
+Petit HTTP/1.1 + WebSocket au-dessus d'asyncio (bibliothèque standard uniquement),
+partagé par server.py et le faux Ollama de tools/stub_ollama.py.
+"""
+import base64
+import hashlib
+import json
+import struct
+
+MAX_BODY = 64 * 1024
+REASONS = {
+    101: "Switching Protocols",
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class Request:
+    def __init__(self, method, path, headers, body):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else {}
+
+    @property
+    def keep_alive(self):
+        return self.headers.get("connection", "").lower() != "close"
+
+
+async def read_request(reader):
+    """Lit une requête ; None si la connexion est fermée. ValueError si elle est invalide."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _version = line.decode("latin-1").split()
+    except ValueError:
+        raise ValueError("bad request line")
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), path, headers, body)
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer, status, obj, keep_alive=True):
+    body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, {
+        "Content-Type": "application/json; charset=utf-8",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }) + body)
+    await writer.drain()
+
+
+async def start_chunked(writer, content_type="application/x-ndjson"):
+    writer.write(_head(200, {
+        "Content-Type": content_type,
+        "Transfer-Encoding": "chunked",
+        "Connection": "keep-alive",
+    }))
+    await writer.drain()
+
+
+async def send_chunk(writer, data):
+    if data:
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+        await writer.drain()
+
+
+async def end_chunked(writer):
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def request_json(reader, writer, method, path, obj=None, host="localhost"):
+    """Côté client : envoie une requête sur une connexion keep-alive et lit la réponse JSON."""
+    body = json.dumps(obj).encode("utf-8") if obj is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, json.loads(data.decode("utf-8")) if data else None
+
+
+# -----------------------
+# WebSocket (RFC 6455, messages texte uniquement)
+# -----------------------
+
+async def ws_accept(writer, request):
+    key = request.headers.get("sec-websocket-key", "")
+    accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+    writer.write(_head(101, {
+        "Upgrade": "websocket",
+        "Connection": "Upgrade",
+        "Sec-WebSocket-Accept": accept,
+    }))
+    await writer.drain()
+
+
+def is_websocket(request):
+    return request.headers.get("upgrade", "").lower() == "websocket"
+
+
+async def ws_recv(reader):
+    """Renvoie le texte du prochain message, ou None à la fermeture (les pings sont ignorés)."""
+    while True:
+        head = await reader.readexactly(2)
+        opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", await reader.readexactly(8))
+        if length > MAX_BODY:
+            return None
+        mask = await reader.readexactly(4) if masked else b"\0\0\0\0"
+        data = bytearray(await reader.readexactly(length))
+        for i in range(length):
+            data[i] ^= mask[i % 4]
+        if opcode == 0x8:
+            return None
+        if opcode == 0x1:
+            return data.decode("utf-8")
+
+
+async def ws_send(writer, text):
+    payload = text.encode("utf-8")
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x81, n)
+    elif n < 65536:
+        head = struct.pack("!BBH", 0x81, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x81, 127, n)
+    writer.write(head + payload)
+    await writer.drain()
+
+
+async def ws_close(writer):
+    try:
+        writer.write(b"\x88\x00")
+        await writer.drain()
+    except ConnectionError:
+        pass
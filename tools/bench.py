@@ -0,0 +1,457 @@
+# tools/bench.py
+"""
+Banc de mesure des tours de jeu : parties scriptées rejouées dans GameManager.process_turn
+contre un faux LLM (latence par mot réglable, pannes et JSON invalide injectés).
+
+Pour chaque scénario (détective, cartes, suspect, analyse) : latence p50/p95/p99 par
+type de tour, temps par étape (construction des prompts, LLM, JSON, analyse, moteur),
+allocations mémoire par tour (tracemalloc). Les résultats s'enregistrent en JSON pour
+comparer deux commits.
+
+    python -m tools.bench --games 30 --save bench/base.json
+    python -m tools.bench --games 30 --compare bench/base.json
+    python -m tools.bench --token-ms 2 --fail-rate 0.05 --bad-json-rate 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from core import ai_agent, analysis, case_manager, game_manager
+from core.backends import BackendError, StubBackend, stub_done
+from core.llm_cache import ResponseCache
+from tools.loadtest import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "Where were you at nine?",
+    "Who can confirm that?",
+    "Why were your shoes wet?",
+    "Did you know the victim well?",
+    "What did you do after dinner?",
+    "Why did you lie about the time?",
+    "Who else was in the house?",
+    "When did you last see the victim?",
+    "Why is your car in the garage?",
+    "What were you hiding?",
+]
+ANSWERS = [
+    "I was at home, alone, reading.",
+    "Nobody, I live by myself.",
+    "I went out for a walk around ten.",
+]
+
+# (type de tour, saisie) ; "setup" = choix de langue, difficulté, rôle
+SETUP = [("setup", "en"), ("setup", "normal")]
+SCENARIOS = {
+    "detective": SETUP + [("setup", "detective")]
+    + [("question", q) for q in QUESTIONS[:5]] + [("accuse", "accuse suspect1")],
+    "cards": SETUP + [("setup", "detective")]
+    + [("card", "pressure: " + QUESTIONS[0]), ("card", "trap: " + QUESTIONS[1]),
+       ("card", "evidence: " + QUESTIONS[2]), ("question", QUESTIONS[3])]
+    + [("accuse", "accuse suspect2")],
+    "suspect": SETUP + [("setup", "suspect"), ("setup", "guilty")]
+    + [("answer", a) for a in ANSWERS[:2]] + [("verdict", ANSWERS[2])],
+    # 10 questions : l'analyse est relancée à chaque tour à partir du 3e
+    "analysis": SETUP + [("setup", "detective")]
+    + [("question", q) for q in QUESTIONS] + [("accuse", "accuse suspect1")],
+}
+
+
+# -----------------------
+# Faux LLM
+# -----------------------
+
+class FaultyBackend(StubBackend):
+    """StubBackend qui échoue parfois (BackendError) et renvoie parfois un JSON tronqué."""
+
+    def __init__(self, first_token_ms=0, token_ms=0, fail_rate=0.0, bad_json_rate=0.0, seed=0):
+        super().__init__(first_token_ms, token_ms)
+        self.fail_rate = fail_rate
+        self.bad_json_rate = bad_json_rate
+        self.rng = random.Random(seed)
+        self.failures = 0
+        self.bad_json = 0
+        self._rng_lock = threading.Lock()
+
+    def _roll(self):
+        with self._rng_lock:
+            return self.rng.random()
+
+    def generate(self, model, prompt, options=None, context=None, format=None,
+                 keep_alive=None, stream=False, cancel=None):
+        if prompt and self._roll() < self.fail_rate:
+            self.failures += 1
+            raise BackendError("injected failure")
+        if prompt and format and self._roll() < self.bad_json_rate:
+            self.bad_json += 1
+            self.calls += 1
+            text = '{"suspect1": {"score": 4'
+            done = stub_done(model, prompt, context, text)
+            if stream:
+                return self._stream(text, done, cancel)
+            time.sleep((self.first_token_ms + self.token_ms * done["eval_count"]) / 1000)
+            return dict(done, response=text)
+        return super().generate(model, prompt, options, context, format, keep_alive, stream, cancel)
+
+
+# -----------------------
+# Mesure par étape
+# -----------------------
+
+class StageTimer:
+    """
+    Temps passé dans chaque étape, inclusif et "propre" (hors sous-étapes mesurées
+    dans le même thread). Les analyses en arrière-plan sont comptées dans le tour en
+    cours au moment où elles se terminent.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def reset(self):
+        with self._lock:
+            totals, self.totals = self.totals, {}
+        return totals
+
+    def _add(self, stage, inclusive, own):
+        with self._lock:
+            t = self.totals.setdefault(stage, {"calls": 0, "total_s": 0.0, "self_s": 0.0})
+            t["calls"] += 1
+            t["total_s"] += inclusive
+            t["self_s"] += own
+
+    def _enter(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # temps des sous-étapes
+        return stack
+
+    def _leave(self, stack, stage, t0):
+        elapsed = time.perf_counter() - t0
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        self._add(stage, elapsed, elapsed - children)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            stack = self._enter()
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._leave(stack, stage, t0)
+        return timed
+
+    def wrap_stream(self, stage, fn):
+        """Pour generate(stream=True) : la génération se poursuit pendant l'itération."""
+        def timed(*args, **kwargs):
+            stack = self._enter()
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                self._leave(stack, stage, t0)
+                raise
+            if not kwargs.get("stream"):
+                self._leave(stack, stage, t0)
+                return result
+            stack.pop()
+            return self._iterate(stage, result, t0)
+        return timed
+
+    def _iterate(self, stage, parts, t0):
+        try:
+            for part in parts:
+                yield part
+        finally:
+            elapsed = time.perf_counter() - t0
+            stack = getattr(self._local, "stack", None)
+            if stack:
+                stack[-1] += elapsed  # flux consommé dans l'étape en cours
+            self._add(stage, elapsed, elapsed)
+
+
+def instrument(timer, backend):
+    """Remplace les fonctions mesurées par des versions chronométrées ; renvoie de quoi défaire."""
+    patches = [
+        (game_manager, "suspect_system_prompt", "prompt"),
+        (analysis, "detective_incremental_prompt", "prompt"),
+        (case_manager, "build_suspect_prompt", "prompt"),
+        (ai_agent.ChatSession, "_prompt", "prompt"),
+        (ai_agent, "ask_agent_json", "json"),
+        (analysis, "ask_agent_json", "json"),
+        (ai_agent, "_parse_json", "json"),
+        (analysis.IncrementalAnalysis, "_run", "analysis"),
+    ]
+    saved = []
+    for owner, name, stage in patches:
+        original = getattr(owner, name)
+        saved.append((owner, name, original))
+        setattr(owner, name, timer.wrap(stage, original))
+    saved.append((backend, "generate", backend.generate))
+    backend.generate = timer.wrap_stream("llm", backend.generate)
+
+    def undo():
+        for owner, name, original in reversed(saved):
+            setattr(owner, name, original)
+    return undo
+
+
+# -----------------------
+# Parties scriptées
+# -----------------------
+
+def play(script, seed, stream, on_turn, totals=None, think_s=0.0):
+    random.seed(seed)  # même affaire et même contexte d'une exécution à l'autre
+    game = game_manager.GameManager()
+    game.log_folder = None
+    game.case_pool = None  # affaire fixe : parties reproductibles, pas de génération en fond
+    on_event = (lambda speaker, chunk: None) if stream else None
+    errors = 0
+    for kind, text in script:
+        if think_s:
+            time.sleep(think_s)  # le joueur lit et tape : le travail de fond avance
+        reply = on_turn(kind, lambda: game.process_turn(text, on_event))
+        if reply.startswith("⚠️"):
+            errors += 1
+    game.analysis.reset()  # les analyses encore en file n'ont plus d'effet
+    if totals is not None:
+        # compteurs de la partie, additionnés sur toutes les parties du scénario
+        for group, counts in (
+            ("speculation", game.speculator.stats()), ("analysis_sources", game.analysis_sources)
+        ):
+            agg = totals.setdefault(group, {})
+            for k, v in counts.items():
+                if k not in ("hit_rate", "served"):
+                    agg[k] = agg.get(k, 0) + v
+    game.speculator.reset()
+    return errors
+
+
+def run_scenario(name, args, backend, timer):
+    script = SCENARIOS[name]
+    latencies, stages, engine_cpu = {}, {}, []
+
+    def on_turn(kind, call):
+        timer.reset()
+        c0 = time.thread_time()
+        t0 = time.perf_counter()
+        reply = call()
+        latencies.setdefault(kind, []).append(time.perf_counter() - t0)
+        engine_cpu.append(time.thread_time() - c0)
+        for stage, t in timer.reset().items():
+            agg = stages.setdefault(stage, {"calls": 0, "total_s": 0.0, "self_s": 0.0})
+            for k in agg:
+                agg[k] += t[k]
+        return reply
+
+    json_before = ai_agent.json_stats()
+    fail0, bad0 = backend.failures, backend.bad_json
+    totals = {}
+    errors = sum(
+        play(script, args.seed + g, args.stream, on_turn, totals, args.think_ms / 1000)
+        for g in range(args.games)
+    )
+    json_after = ai_agent.json_stats()
+
+    turns = sum(len(v) for v in latencies.values())
+    result = {
+        "games": args.games,
+        "turns": {
+            kind: {
+                "n": len(v),
+                "mean_ms": sum(v) / len(v) * 1000,
+                "p50_ms": percentile(v, 50) * 1000,
+                "p95_ms": percentile(v, 95) * 1000,
+                "p99_ms": percentile(v, 99) * 1000,
+            }
+            for kind, v in latencies.items()
+        },
+        "stages": {
+            stage: {
+                "calls": int(t["calls"]),
+                "ms_per_turn": t["total_s"] / turns * 1000,
+                "self_ms_per_turn": t["self_s"] / turns * 1000,
+            }
+            for stage, t in sorted(stages.items())
+        },
+        "engine_cpu_ms_per_turn": sum(engine_cpu) / turns * 1000,
+        "errors": errors,
+        "speculation": totals.get("speculation", {}),
+        "analysis_sources": totals.get("analysis_sources", {}),
+        "injected": {"failures": backend.failures - fail0, "bad_json": backend.bad_json - bad0},
+        "json": {
+            k: json_after[k] - json_before[k]
+            for k in ("calls", "attempts", "parse_failures", "schema_failures", "failed_calls")
+        },
+    }
+    if args.alloc_games:
+        result["alloc"] = measure_alloc(script, args)
+    return result
+
+
+def measure_alloc(script, args):
+    """Deuxième passe sous tracemalloc (lente) : pic et solde d'allocation par tour."""
+    per_kind = {}
+
+    def on_turn(kind, call):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        reply = call()
+        current, peak = tracemalloc.get_traced_memory()
+        agg = per_kind.setdefault(kind, {"n": 0, "peak": 0, "net": 0})
+        agg["n"] += 1
+        agg["peak"] += peak - before
+        agg["net"] += current - before
+        return reply
+
+    tracemalloc.start()
+    try:
+        for g in range(args.alloc_games):
+            play(script, args.seed + g, args.stream, on_turn)
+    finally:
+        tracemalloc.stop()
+    return {
+        kind: {"peak_kb": a["peak"] / a["n"] / 1024, "net_kb": a["net"] / a["n"] / 1024}
+        for kind, a in per_kind.items()
+    }
+
+
+# -----------------------
+# Baselines
+# -----------------------
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(baseline, current, threshold, floor_ms=0.5):
+    """Liste des régressions : latences et temps par étape plus lents de plus de threshold."""
+    regressions = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        checks = [
+            (f"{name} {kind} {p}", base["turns"][kind][p], t[p])
+            for kind, t in cur["turns"].items() if kind in base["turns"]
+            for p in ("p50_ms", "p95_ms")
+        ]
+        checks += [
+            (f"{name} stage {stage}", base["stages"][stage]["self_ms_per_turn"], s["self_ms_per_turn"])
+            for stage, s in cur["stages"].items() if stage in base["stages"]
+        ]
+        checks.append((f"{name} engine cpu", base["engine_cpu_ms_per_turn"], cur["engine_cpu_ms_per_turn"]))
+        for label, old, new in checks:
+            if new > old * (1 + threshold) and new - old > floor_ms:
+                regressions.append((label, old, new))
+    return regressions
+
+
+def print_report(results):
+    for name, r in results["scenarios"].items():
+        print(f"\n== {name} ({r['games']} parties, {r['errors']} tour(s) en erreur) ==")
+        print(f"  {'tour':<10}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for kind, t in r["turns"].items():
+            print(f"  {kind:<10}{t['n']:>5}{t['p50_ms']:>10.2f}{t['p95_ms']:>10.2f}{t['p99_ms']:>10.2f}")
+        print(f"  {'étape':<10}{'appels':>7}{'ms/tour':>10}{'propre':>10}")
+        for stage, s in r["stages"].items():
+            print(f"  {stage:<10}{s['calls']:>7}{s['ms_per_turn']:>10.3f}{s['self_ms_per_turn']:>10.3f}")
+        print(f"  moteur (CPU du thread du tour) : {r['engine_cpu_ms_per_turn']:.3f} ms/tour")
+        j = r["json"]
+        sp = r.get("speculation") or {}
+        served = sum(sp.get(k, 0) for k in ("hits", "stale", "skipped", "misses", "failed"))
+        if served:
+            print(
+                f"  cartes spéculées : {sp['hits']}/{served} servies sans appel ({sp['hits'] / served:.0%}),"
+                f" {sp['stale']} périmée(s), {sp['skipped']} pas encore lancée(s),"
+                f" {sp['generated']}/{sp['started']} générée(s), {sp['waited_s'] * 1000:.0f} ms attendues"
+            )
+        src = r.get("analysis_sources") or {}
+        if src.get("local", 0) + src.get("llm", 0):
+            print(f"  analyses : {src['local']} locale(s), {src['llm']} demandée(s) au modèle")
+        if j["calls"]:
+            print(f"  JSON : {j['calls']} appel(s), {j['attempts']} tentative(s), {j['failed_calls']} échec(s)")
+        if "alloc" in r:
+            for kind, a in r["alloc"].items():
+                print(f"  alloc {kind:<10} pic {a['peak_kb']:8.1f} Ko  solde {a['net_kb']:8.1f} Ko")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Banc de mesure des tours de jeu (faux LLM)")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--games", type=int, default=20, help="parties par scénario")
+    ap.add_argument("--alloc-games", type=int, default=3, help="parties sous tracemalloc (0 = pas de mesure)")
+    ap.add_argument("--first-token-ms", type=float, default=0)
+    ap.add_argument("--token-ms", type=float, default=0)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="proportion d'appels LLM en échec")
+    ap.add_argument("--bad-json-rate", type=float, default=0.0, help="proportion de réponses JSON tronquées")
+    ap.add_argument("--think-ms", type=float, default=0, help="pause du joueur avant chaque tour (hors mesure)")
+    ap.add_argument("--stream", action="store_true", help="tours en mode streaming (comme la GUI)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save", help="écrire les résultats (baseline) dans ce fichier JSON")
+    ap.add_argument("--compare", help="comparer à une baseline JSON")
+    ap.add_argument("--threshold", type=float, default=0.2, help="régression tolérée (0.2 = +20%%)")
+    args = ap.parse_args()
+
+    backend = FaultyBackend(args.first_token_ms, args.token_ms, args.fail_rate, args.bad_json_rate, args.seed)
+    ai_agent.set_backend(backend)
+    ai_agent.set_cache(ResponseCache(max_entries=0, path=None))  # chaque appel va au faux LLM
+    timer = StageTimer()
+    undo = instrument(timer, backend)
+    try:
+        scenarios = {
+            name: run_scenario(name, args, backend, timer)
+            for name in args.scenarios.split(",")
+        }
+    finally:
+        undo()
+
+    results = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+        },
+        "scenarios": scenarios,
+    }
+    print_report(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nbaseline écrite : {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        print(f"\ncomparaison avec {args.compare} (commit {baseline['meta'].get('commit')}) :")
+        for label, old, new in regressions:
+            print(f"  RÉGRESSION {label}: {old:.3f} → {new:.3f} ms")
+        if not regressions:
+            print("  aucune régression")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# tools/loadtest.py
+"""
+Test de charge de server.py contre le faux Ollama (tout en local, hors ligne).
+
+Lance le faux Ollama et le serveur dans deux processus séparés, puis fait jouer
+--sessions parties de détective en parallèle via l'API HTTP. Affiche la latence
+p50/p99 des tours, le débit et le nombre de parties par cœur CPU du serveur.
+
+    python -m tools.loadtest --sessions 200 --questions 4
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from tools.asynchttp import request_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+async def wait_port(port, timeout=15):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            _r, w = await asyncio.open_connection("127.0.0.1", port)
+            w.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"port {port} injoignable")
+
+
+async def play(port, questions, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        status, data = await request_json(reader, writer, "POST", "/sessions")
+        if status != 200:
+            errors.append(status)
+            return
+        sid = data["session"]
+        script = ["en", "normal", "detective"]
+        script += [f"Where were you at nine? ({i})" for i in range(questions)]
+        script += ["accuse suspect1"]
+        for i, text in enumerate(script):
+            t0 = time.perf_counter()
+            status, _ = await request_json(reader, writer, "POST", f"/sessions/{sid}/turn", {"text": text})
+            if status != 200:
+                errors.append(status)
+                return
+            if i >= 3:  # seuls les tours avec appels LLM comptent
+                latencies.append(time.perf_counter() - t0)
+        await request_json(reader, writer, "DELETE", f"/sessions/{sid}")
+    finally:
+        writer.close()
+
+
+async def run(args):
+    stub_port, server_port = free_port(), free_port()
+    pythonpath = os.pathsep.join(p for p in (ROOT, os.environ.get("PYTHONPATH")) if p)
+    env = dict(os.environ, OLLAMA_HOST=f"http://127.0.0.1:{stub_port}", PYTHONPATH=pythonpath)
+    # Dossier de travail jetable : les parties de test n'atterrissent pas dans logs/
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "tools.stub_ollama", "--port", str(stub_port),
+         "--first-token-ms", str(args.first_token_ms), "--token-ms", str(args.token_ms)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(server_port),
+         "--llm-concurrency", str(args.llm_concurrency),
+         "--analysis-concurrency", str(args.llm_concurrency),
+         "--turn-workers", str(args.turn_workers)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        await wait_port(stub_port)
+        await wait_port(server_port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server_port)
+        _, before = await request_json(reader, writer, "GET", "/health")
+
+        latencies, errors = [], []
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            play(server_port, args.questions, latencies, errors) for _ in range(args.sessions)
+        ))
+        wall = time.perf_counter() - t0
+
+        _, after = await request_json(reader, writer, "GET", "/health")
+        writer.close()
+    finally:
+        server.terminate()
+        stub.terminate()
+
+    cpu = after["cpu_s"] - before["cpu_s"]
+    cores = cpu / wall if wall else 0.0
+    done = args.sessions - len(errors)
+    print(f"parties       : {done}/{args.sessions} en {wall:.2f}s ({done / wall:.1f}/s)")
+    print(f"tours LLM     : {len(latencies)}")
+    print(f"latence p50   : {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latence p99   : {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"CPU serveur   : {cpu:.2f}s ({cores:.2f} cœur)")
+    print(f"parties/cœur  : {args.sessions / cores if cores else float('inf'):.0f} simultanées")
+    if errors:
+        print(f"erreurs       : {len(errors)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Test de charge du serveur de jeu")
+    ap.add_argument("--sessions", type=int, default=100)
+    ap.add_argument("--questions", type=int, default=4)
+    ap.add_argument("--first-token-ms", type=float, default=50)
+    ap.add_argument("--token-ms", type=float, default=5)
+    ap.add_argument("--llm-concurrency", type=int, default=64)
+    ap.add_argument("--turn-workers", type=int, default=256)
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# tools/selfplay.py
+"""
+Simulation de parties sans interface : un joueur IA fait tourner GameManager.process_turn
+en mode détective et en mode suspect, sur un pool de processus.
+
+Chaque processus joue plusieurs parties à la fois (--games-per-worker) avec un nombre
+borné d'appels LLM simultanés (--llm-concurrency). Par défaut le backend est le stub
+hors ligne (core/backends.py) : on mesure alors le moteur de jeu lui-même.
+Les parties sont écrites au format du journal (par défaut dans logs/selfplay/,
+lisible avec python -m core.analytics --folder logs/selfplay).
+
+    python -m tools.selfplay --games 300 --workers 4
+    python -m tools.selfplay --games 60 --mode detective --ollama
+"""
+import argparse
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core import ai_agent
+from core.analysis import set_analysis_concurrency
+from core.backends import StubBackend
+from core.game_manager import GameManager
+from core.llm_cache import ResponseCache
+from core.log_store import get_store
+
+DIFFICULTIES = ("easy", "normal", "hard")
+ANALYSIS_RE = re.compile(r"S1:(\d+) / S2:(\d+)")
+QUESTIONS = {
+    "fr": [
+        "Où étais-tu au moment des faits ?",
+        "Quelqu'un peut-il confirmer ton alibi ?",
+        "Que faisais-tu juste avant ?",
+        "Connaissais-tu la victime ?",
+        "Pourquoi es-tu parti si vite ?",
+    ],
+    "en": [
+        "Where were you when it happened?",
+        "Can anyone confirm your alibi?",
+        "What were you doing just before?",
+        "Did you know the victim?",
+        "Why did you leave so quickly?",
+    ],
+}
+CARDS = {"fr": ("pression", "piege", "preuve"), "en": ("pressure", "trap", "evidence")}
+
+
+# -----------------------
+# Joueur IA
+# -----------------------
+
+class AIPlayer:
+    """
+    Joue à la place de l'humain, à partir des seuls textes renvoyés par process_turn.
+    Détective : pose des questions (cartes comprises) puis accuse le suspect que
+    l'analyse désigne, dès que l'écart de score dépasse `margin`.
+    Suspect : répond au détective IA avec le modèle, dans son rôle.
+    """
+
+    def __init__(self, rng, min_questions=3, max_questions=10, margin=20, card_rate=0.3):
+        self.rng = rng
+        self.min_questions = min_questions
+        self.max_questions = max_questions
+        self.margin = margin
+        self.card_rate = card_rate
+
+    def question(self, game):
+        q = self.rng.choice(QUESTIONS[game.lang])
+        free = [
+            label for card, label in zip(("pression", "piege", "preuve"), CARDS[game.lang])
+            if game.detective_cards[card] > 0
+        ]
+        if free and self.rng.random() < self.card_rate:
+            q = f"{self.rng.choice(free)}: {q}"
+        return q
+
+    def accusation(self, reply, asked):
+        """Accusé choisi d'après la dernière analyse affichée, ou None pour continuer."""
+        m = ANALYSIS_RE.search(reply)
+        if m is None:
+            return None
+        s1, s2 = int(m.group(1)), int(m.group(2))
+        if asked >= self.max_questions or (asked >= self.min_questions and abs(s1 - s2) >= self.margin):
+            return "suspect1" if s1 >= s2 else "suspect2"
+        return None
+
+    def answer(self, game):
+        role = (
+            ("coupable" if game.suspect_is_criminal else "innocent")
+            if game.lang == "fr"
+            else ("guilty" if game.suspect_is_criminal else "innocent")
+        )
+        if game.lang == "fr":
+            prompt = (
+                f"{game.context}\nTu es le suspect ({role}). Réponds au détective en une phrase, "
+                f"sans avouer.\nDétective: {game.suspect_last_question}"
+            )
+        else:
+            prompt = (
+                f"{game.context}\nYou are the suspect ({role}). Answer the detective in one "
+                f"sentence, without confessing.\nDetective: {game.suspect_last_question}"
+            )
+        return ai_agent.ask_agent(game.model, prompt, game.opts) or "..."
+
+
+def _turn(game, text):
+    reply = game.process_turn(text)
+    if reply.startswith("⚠️"):
+        raise RuntimeError(reply)
+    return reply
+
+
+def play_game(spec):
+    """Joue une partie complète ; renvoie le journal de la partie, enrichi pour le rapport."""
+    rng = random.Random(spec["seed"])
+    player = AIPlayer(rng, max_questions=spec["max_questions"], margin=spec["margin"])
+    game = GameManager()
+    game.log_folder = None  # le processus principal écrit le journal
+    game.case_pool = None  # affaire fixe : parties reproductibles, pas de génération en fond
+    t0 = time.perf_counter()
+    _turn(game, spec["lang"])
+    _turn(game, spec["difficulty"])
+    _turn(game, spec["mode"])
+    suggestion = None
+
+    if spec["mode"] == "detective":
+        asked = 0
+        while game.state == "detective_wait_question":
+            reply = _turn(game, player.question(game))
+            asked = game.detective_asked
+            m = ANALYSIS_RE.search(reply)
+            if m:
+                suggestion = "suspect1" if int(m.group(1)) >= int(m.group(2)) else "suspect2"
+            guess = player.accusation(reply, asked)
+            if guess is None and asked >= player.max_questions:
+                guess = suggestion or rng.choice(("suspect1", "suspect2"))
+            if guess is not None:
+                _turn(game, f"accuse {guess}")
+        if game.state == "detective_force_accuse":
+            _turn(game, f"accuse {suggestion or rng.choice(('suspect1', 'suspect2'))}")
+    else:
+        _turn(game, "guilty" if rng.random() < 0.5 else "innocent")
+        while game.state == "suspect_wait_player_answer":
+            _turn(game, player.answer(game))
+
+    record = dict(game.last_result or {})
+    record["player"] = "selfplay"
+    record["seed"] = spec["seed"]
+    record["duration_s"] = round(time.perf_counter() - t0, 4)
+    if spec["mode"] == "detective":
+        record["analysis_suggestion"] = suggestion
+    return record
+
+
+# -----------------------
+# Pool de processus
+# -----------------------
+
+def _init_worker(backend, llm_concurrency, analysis_concurrency, first_token_ms, token_ms, cache_size):
+    if backend == "stub":
+        ai_agent.set_backend(StubBackend(first_token_ms, token_ms))
+    ai_agent.set_concurrency(llm_concurrency)
+    set_analysis_concurrency(analysis_concurrency)
+    # Cache en mémoire seule : une simulation ne remplit pas data/llm_cache.sqlite
+    ai_agent.set_cache(ResponseCache(max_entries=cache_size, path=None))
+
+
+def play_batch(specs, games_per_worker):
+    """Joue un lot de parties dans un processus, games_per_worker à la fois."""
+    results = []
+    with ThreadPoolExecutor(max_workers=games_per_worker, thread_name_prefix="game") as pool:
+        futures = [pool.submit(play_game, spec) for spec in specs]
+        for spec, fut in zip(specs, futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append({"error": str(e), "mode": spec["mode"], "difficulty": spec["difficulty"]})
+    # compteur d'appels du stub, cumulé depuis le démarrage du processus
+    return results, os.getpid(), getattr(ai_agent.get_backend(), "calls", None)
+
+
+def make_specs(args):
+    rng = random.Random(args.seed)
+    modes = ("detective", "suspect") if args.mode == "both" else (args.mode,)
+    langs = args.langs.split(",")
+    return [
+        {
+            "seed": rng.randrange(2 ** 32),
+            "mode": modes[i % len(modes)],
+            "difficulty": DIFFICULTIES[(i // len(modes)) % len(DIFFICULTIES)],
+            "lang": rng.choice(langs),
+            "max_questions": args.max_questions,
+            "margin": args.margin,
+        }
+        for i in range(args.games)
+    ]
+
+
+# -----------------------
+# Rapport
+# -----------------------
+
+def _pct(ok, n):
+    return f"{ok}/{n} ({ok / n * 100:.1f}%)" if n else "-"
+
+
+def report(records, wall, llm_calls):
+    games = [r for r in records if "error" not in r]
+    errors = len(records) - len(games)
+    print(f"parties          : {len(games)} en {wall:.2f}s ({len(games) / wall * 60:.0f}/min)")
+    if llm_calls is not None:
+        print(f"appels LLM       : {llm_calls} ({llm_calls / wall:.0f}/s)")
+    if errors:
+        print(f"erreurs          : {errors}")
+
+    det = [r for r in games if r.get("mode") == "detective"]
+    sus = [r for r in games if r.get("mode") == "suspect"]
+    if det:
+        print("\n[détective IA joueur]  réussite  | questions moy. | analyse juste")
+        for level in DIFFICULTIES:
+            rows = [r for r in det if r.get("difficulty") == level]
+            if not rows:
+                continue
+            wins = sum(1 for r in rows if r.get("success"))
+            hinted = [r for r in rows if r.get("analysis_suggestion")]
+            right = sum(1 for r in hinted if r["analysis_suggestion"] == r.get("culprit"))
+            avg_q = sum(r.get("questions", 0) for r in rows) / len(rows)
+            print(f"  {level:<8} {_pct(wins, len(rows)):>18} | {avg_q:>14.1f} | {_pct(right, len(hinted))}")
+    if sus:
+        print("\n[détective IA du jeu face au joueur IA]  verdict juste")
+        for level in DIFFICULTIES:
+            rows = [r for r in sus if r.get("difficulty") == level]
+            if rows:
+                right = sum(1 for r in rows if r.get("ai_correct"))
+                print(f"  {level:<8} {_pct(right, len(rows))}")
+    hinted = [r for r in det if r.get("analysis_suggestion")]
+    right = sum(1 for r in hinted if r["analysis_suggestion"] == r.get("culprit"))
+    right += sum(1 for r in sus if r.get("ai_correct"))
+    print(f"\nheuristique d'analyse (global) : {_pct(right, len(hinted) + len(sus))}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parties simulées, sans interface, pour équilibrer les difficultés")
+    ap.add_argument("--games", type=int, default=120)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="processus")
+    ap.add_argument("--games-per-worker", type=int, default=8, help="parties simultanées par processus")
+    ap.add_argument("--llm-concurrency", type=int, default=8, help="appels LLM simultanés par processus")
+    ap.add_argument("--batch", type=int, default=24, help="parties par lot envoyé à un processus")
+    ap.add_argument("--mode", choices=["both", "detective", "suspect"], default="both")
+    ap.add_argument("--langs", default="en,fr")
+    ap.add_argument("--max-questions", type=int, default=10)
+    ap.add_argument("--margin", type=int, default=20, help="écart de score pour accuser avant la fin")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--ollama", action="store_true", help="vrai backend (data/config.json) au lieu du stub")
+    ap.add_argument("--first-token-ms", type=float, default=0)
+    ap.add_argument("--token-ms", type=float, default=0)
+    ap.add_argument("--cache-size", type=int, default=0, help="LRU des réponses par processus (0 = sans cache)")
+    ap.add_argument("--logs", default=os.path.join("logs", "selfplay"), help="dossier du journal ('' = aucun)")
+    args = ap.parse_args()
+
+    specs = make_specs(args)
+    batches = [specs[i:i + args.batch] for i in range(0, len(specs), args.batch)]
+    init = (
+        "ollama" if args.ollama else "stub",
+        args.llm_concurrency,
+        args.llm_concurrency,
+        args.first_token_ms,
+        args.token_ms,
+        args.cache_size,
+    )
+    store = get_store(args.logs) if args.logs else None
+    records, calls = [], {}
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=init) as pool:
+        futures = [pool.submit(play_batch, b, args.games_per_worker) for b in batches]
+        for fut in futures:
+            batch, pid, worker_calls = fut.result()
+            records.extend(batch)
+            if store is not None:
+                for r in batch:
+                    if "error" not in r:
+                        store.append(r)
+            if worker_calls is not None:
+                calls[pid] = max(calls.get(pid, 0), worker_calls)
+    wall = time.perf_counter() - t0
+    if store is not None:
+        store.flush()
+
+    report(records, wall, sum(calls.values()) if calls else None)
+    if store is not None:
+        print(f"\njournal : {args.logs}/ (python -m core.analytics --folder {args.logs})")
+
+
+if __name__ == "__main__":
+    main()
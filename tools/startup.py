@@ -0,0 +1,152 @@
+# tools/startup.py
+"""
+Budget de démarrage, vérifié à chaque lancement (code de sortie 1 en cas de dépassement).
+
+- import de core.game_manager (mesuré avec python -X importtime, meilleur de N runs),
+  avec la liste des modules les plus coûteux ;
+- core ne doit charger ni GUI, ni son, ni client réseau, ni jsonschema ;
+- time-to-first-paint de detective.py (fenêtre affichée) puis fenêtre prête, processus
+  compris (sauté sans affichage, ex: serveur sans X).
+
+    python -m tools.startup
+    python -m tools.startup --runs 10 --core-budget-ms 120 --paint-budget-ms 300
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules que "import core.game_manager" ne doit pas charger
+FORBIDDEN = ("tkinter", "PIL", "pygame", "ollama", "requests", "http.client", "jsonschema")
+
+
+def parse_importtime(stderr):
+    """Lignes de -X importtime → [(module, self_us, cumulé_us, profondeur)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((name.strip(), int(self_us), int(cum_us), depth))
+        except ValueError:
+            continue  # ligne d'en-tête
+    return rows
+
+
+def import_time(module, runs):
+    """Meilleur temps (ms) d'import de module dans un interpréteur neuf, et son détail."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"import {module} a échoué :\n{proc.stderr[-2000:]}")
+        rows = parse_importtime(proc.stderr)
+        total = next((cum for name, _, cum, _ in reversed(rows) if name == module), None)
+        if total is not None and (best is None or total < best[0]):
+            best = (total, rows)
+    return best[0] / 1000, best[1]
+
+
+def loaded_modules(module, names):
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {list(names)!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} a échoué :\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def first_paint(runs, timeout=30):
+    """(first_paint_ms, ready_ms) du meilleur run, ou None s'il n'y a pas d'affichage."""
+    env = dict(os.environ, DETECTIVE_STARTUP_PROBE="1", DETECTIVE_BACKEND="stub", DETECTIVE_AUDIO="null")
+    best = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "detective.py"], cwd=ROOT, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        marks = {}
+        for line in proc.stdout:
+            marks[line.strip()] = (time.perf_counter() - t0) * 1000
+            if line.strip() == "ready":
+                break
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if "first_paint" not in marks:
+            err = proc.stderr.read()
+            if "TclError" in err:
+                return None  # pas d'affichage disponible
+            raise SystemExit(f"detective.py n'a pas affiché de fenêtre :\n{err[-2000:]}")
+        run = (marks["first_paint"], marks.get("ready"))
+        if best is None or run[0] < best[0]:
+            best = run
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Mesure et budget du temps de démarrage")
+    ap.add_argument("--runs", type=int, default=5, help="runs par mesure (on garde le meilleur)")
+    ap.add_argument("--module", default="core.game_manager")
+    ap.add_argument("--core-budget-ms", type=float, default=150.0)
+    ap.add_argument("--paint-budget-ms", type=float, default=400.0)
+    ap.add_argument("--ready-budget-ms", type=float, default=2000.0)
+    ap.add_argument("--top", type=int, default=10, help="modules les plus lents à afficher")
+    ap.add_argument("--json", metavar="FICHIER", help="écrit les mesures en JSON")
+    args = ap.parse_args(argv)
+
+    failures = []
+    core_ms, rows = import_time(args.module, args.runs)
+    print(f"import {args.module} : {core_ms:.1f} ms (budget {args.core_budget_ms:.0f} ms)")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: -r[1])[: args.top]:
+        print(f"  {self_us / 1000:7.2f} ms  (cumulé {cum_us / 1000:7.2f})  {name}")
+    if core_ms > args.core_budget_ms:
+        failures.append(f"import {args.module} : {core_ms:.1f} ms > {args.core_budget_ms:.0f} ms")
+
+    heavy = loaded_modules(args.module, FORBIDDEN)
+    if heavy:
+        failures.append(f"{args.module} charge {', '.join(heavy)}")
+    print(f"modules interdits chargés : {', '.join(heavy) or 'aucun'}")
+
+    paint = first_paint(args.runs)
+    if paint is None:
+        print("premier affichage : sauté (pas d'affichage)")
+    else:
+        paint_ms, ready_ms = paint
+        print(f"premier affichage : {paint_ms:.0f} ms (budget {args.paint_budget_ms:.0f} ms)")
+        print(f"fenêtre prête     : {ready_ms:.0f} ms (budget {args.ready_budget_ms:.0f} ms)")
+        if paint_ms > args.paint_budget_ms:
+            failures.append(f"premier affichage : {paint_ms:.0f} ms > {args.paint_budget_ms:.0f} ms")
+        if ready_ms is not None and ready_ms > args.ready_budget_ms:
+            failures.append(f"fenêtre prête : {ready_ms:.0f} ms > {args.ready_budget_ms:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "core_import_ms": core_ms,
+                "forbidden_loaded": heavy,
+                "first_paint_ms": paint[0] if paint else None,
+                "ready_ms": paint[1] if paint else None,
+            }, f, indent=2)
+
+    for msg in failures:
+        print("DÉPASSEMENT :", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
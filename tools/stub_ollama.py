@@ -0,0 +1,95 @@
+# tools/stub_ollama.py
+"""
+Faux serveur Ollama pour tester le jeu et server.py hors ligne.
+
+Répond à /api/generate (streamé ou non, avec `format` JSON), /api/tags et /api/version
+avec les réponses déterministes de core.backends.stub_reply et une latence configurable.
+
+    python -m tools.stub_ollama --port 11435 --first-token-ms 200 --token-ms 20
+    OLLAMA_HOST=http://127.0.0.1:11435 python server.py
+"""
+import argparse
+import asyncio
+import json
+
+from core.backends import stub_done, stub_reply
+from tools.asynchttp import end_chunked, read_request, send_chunk, send_json, start_chunked
+
+
+class StubOllama:
+    def __init__(self, first_token_ms=100, token_ms=10):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                req = await read_request(reader)
+                if req is None:
+                    break
+                self.requests += 1
+                if req.path == "/api/generate" and req.method == "POST":
+                    await self._generate(writer, req.json())
+                elif req.path == "/api/tags":
+                    await send_json(writer, 200, {"models": [{"name": "gemma3:latest"}]})
+                elif req.path == "/api/version":
+                    await send_json(writer, 200, {"version": "stub"})
+                else:
+                    await send_json(writer, 404, {"error": "not found"})
+                if not req.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _generate(self, writer, body):
+        prompt = body.get("prompt", "")
+        text = stub_reply(prompt, body.get("format"), body.get("context")) if prompt else ""
+        tokens = text.split(" ") if text else []
+        done = stub_done(body.get("model", ""), prompt, body.get("context"), text)
+        done["eval_duration"] = int(self.token_ms * len(tokens) * 1e6)
+        await asyncio.sleep(self.first_token_ms / 1000)
+        if body.get("stream", True):
+            await start_chunked(writer)
+            for i, tok in enumerate(tokens):
+                piece = tok if i == len(tokens) - 1 else tok + " "
+                line = {"model": done["model"], "response": piece, "done": False}
+                await send_chunk(writer, (json.dumps(line) + "\n").encode())
+                await asyncio.sleep(self.token_ms / 1000)
+            await send_chunk(writer, (json.dumps(done) + "\n").encode())
+            await end_chunked(writer)
+        else:
+            await asyncio.sleep(self.token_ms * len(tokens) / 1000)
+            done["response"] = text
+            await send_json(writer, 200, done)
+
+
+async def start_stub(host="127.0.0.1", port=0, first_token_ms=100, token_ms=10):
+    """Démarre le faux Ollama dans la boucle courante ; renvoie (serveur, url)."""
+    stub = StubOllama(first_token_ms, token_ms)
+    server = await asyncio.start_server(stub.handle, host, port)
+    real_port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{real_port}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Faux serveur Ollama")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--first-token-ms", type=float, default=100)
+    ap.add_argument("--token-ms", type=float, default=10)
+    args = ap.parse_args()
+
+    async def run():
+        server, url = await start_stub(args.host, args.port, args.first_token_ms, args.token_ms)
+        print(f"Stub Ollama sur {url}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()